@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Análise do desempenho de algoritmos de aprendizagem por reforço na solução do problema de roteamento de veículos capacitados
+
+Base de dados: CVRPLIB
+http://vrp.atd-lab.inf.puc-rio.br/index.php/en/
+
+A importação não executa experimentos nem importa o matplotlib, o Numba ou o serviço (asyncio), carregados apenas no
+primeiro uso.
+Execução dos experimentos: python -m Algoritmos_TD_Murilo_Alves
+
+@author: Murilo Alves
+"""
+
+from .nucleo import (Recompensa, ValidaAcoes, Politica, MaxQ, MaxQDouble, TaxaAprendizagem, TaxaPolinomial, EpsilonLinear,
+                     EpsilonExponencial, EpsilonEpoca, CriaMatriz, AtualizaQ, EscolheRota, DespachoMenorDemanda,
+                     DespachoMenorCusto, DespachoCircular, CriaRotas, BufferRotas, Amostrador,
+                     Episodio, AtualizaRota, RetornoDeposito, RetornoDepositoDouble, PodaEpisodio)
+from .metodos import (NucleoCompilado, RotasDaSequencia, EpocasCompiladasVeiculosFixos, Q_Learning_VeiculosFixos,
+                      DoubleQ_Learning_VeiculosFixos, RotasDinamicasDaSequencia, AtualizaQLote, EpocasLoteVeiculosDinamicos,
+                      Q_Learning_VeiculosDinamicos, DoubleQ_Learning_VeiculosDinamicos, Metodos)
+from .resultados import EstatisticasOnline, VetorResultados, RegistroBinario, ChamadaPorEpoca
+from .ambiente import (MatrizDistancias, MatrizExplicita, LerInstancia, CriaAmbiente, VERSAO_CACHE, CarregaInstancia,
+                       AmbienteCenario, Vizinhos, LerArquivo, Biblioteca, Otimos)
+from .parada import CriterioParada
+from .continuacao import GravaEstado, CarregaEstado, IniciaTabelas, PontoControle
+from .buscalocal import BuscaLocal, BuscaLocalBuffer, PolimentoRotas
+from .candidatos import EpisodioCandidatos, Q_Learning_Candidatos, RotasGulosasCandidatos
+from .inferencia import TabelaQ, RotasGulosas, RotasGulosasCenarios
+from .graficos import GraficoCustoEpisodio, GraficoRotas
+from .experimento import SementeTarefa, ExecutaTarefa, ExecutaExperimento, ExibeResultados
+from .varredura import EspacoBusca, Parametros, Varredura, ExibeVarredura
+from .perfil import Perfil
+from .compartilhado import ParadaCompartilhada, TreinamentoCompartilhado
+from .experiencias import AtualizaQReproducao, BufferExperiencias
+from .cenarios import ExecutaCenario, IteraCenarios, ResolveCenarios
+
+# Nomes do serviço (servico.py), importado com o asyncio somente no primeiro acesso a um deles
+_SERVICO = ("AmbienteTrabalho", "ParadaServico", "ExecutaTrabalho", "Trabalho", "ServicoRotas", "IniciaServidor")
+
+def __getattr__(nome):
+    if nome in _SERVICO:
+        from . import servico
+        return getattr(servico, nome)
+    raise AttributeError("module %r has no attribute %r" % (__name__, nome))
+
+def __dir__():
+    return sorted(list(globals()) + list(_SERVICO))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Execução dos experimentos sobre as instâncias da Biblioteca
+
+Uso:
+    python -m Algoritmos_TD_Murilo_Alves --metodo 1 --repeticoes 10
+    python -m Algoritmos_TD_Murilo_Alves --metodo 3 --repeticoes 2 --varredura resultados/varredura
+
+@author: Murilo Alves
+"""
+
+import argparse
+import functools
+import sys
+
+from .ambiente import Biblioteca, LerArquivo
+from .experimento import ExecutaExperimento, ExibeResultados
+from .parada import CriterioParada
+from .varredura import EspacoBusca, ExibeVarredura, Varredura
+
+def Principal(argumentos = None):
+    parser = argparse.ArgumentParser(description="Experimentos dos métodos de aprendizagem por reforço para o CVRP")
+    parser.add_argument("--metodo", type=int, choices=[1, 2, 3, 4], default=1,
+                        help="1: Q-Learning com veículos fixos, 2: Double Q-Learning com veículos fixos, "
+                             "3: Q-Learning com veículos dinâmicos, 4: Double Q-Learning com veículos dinâmicos")
+    parser.add_argument("--instancias", nargs="+", default=None, help="Arquivos .vrp (padrão: Biblioteca)")
+    parser.add_argument("--repeticoes", type=int, default=10, help="Execuções independentes por taxa de desconto")
+    parser.add_argument("--processos", type=int, default=None, help="Quantidade de processos (padrão: núcleos)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--paciencia", type=int, default=None, help="Para após N épocas sem melhora da menor distância")
+    parser.add_argument("--limiar-q", type=float, default=None, help="Para quando a variação máxima de Q(s,a) fica abaixo do limiar")
+    parser.add_argument("--tempo-maximo", type=float, default=None, help="Tempo máximo de cada execução, em segundos")
+    parser.add_argument("--gap-alvo", type=float, default=None, help="Para ao atingir o gap (%%) em relação ao ótimo conhecido")
+    parser.add_argument("--varredura", default=None, metavar="DIRETORIO",
+                        help="Varredura de hiperparâmetros (successive halving), com pontos de controle e resultados no diretório")
+    parser.add_argument("--epocas-minimas", type=int, default=100, help="Épocas do primeiro nível da varredura")
+    parser.add_argument("--epocas-maximas", type=int, default=1000, help="Épocas do último nível da varredura")
+    argumentos = parser.parse_args(argumentos)
+    
+    # Carrega arquivos
+    cpvlib = argumentos.instancias if argumentos.instancias else Biblioteca()
+    
+    # Escolher algoritmo
+    opcao = argumentos.metodo - 1
+    
+    # Critérios de parada antecipada (opcionais)
+    parada = None
+    if (argumentos.paciencia is not None or argumentos.limiar_q is not None or argumentos.tempo_maximo is not None or argumentos.gap_alvo is not None):
+        parada = functools.partial(CriterioParada, paciencia=argumentos.paciencia, limiarQ=argumentos.limiar_q,
+                                   tempoMaximo=argumentos.tempo_maximo, gapAlvo=argumentos.gap_alvo)
+    
+    # Carrega informações do ambiente de um arquivo
+    ambientes = [LerArquivo(arquivo) for arquivo in cpvlib]
+    
+    # Varredura de hiperparâmetros
+    if (argumentos.varredura is not None):
+        configuracoes = EspacoBusca([opcao], descontos=(0.1, 0.01), epsilons=(0.9, ["linear", 0.5, 0.95, 500], ["exponencial", 0.5, 0.95, 100]),
+                                    expoentes=(1.0, 0.8))
+        classificacao = Varredura(ambientes, configuracoes, argumentos.epocas_minimas, argumentos.epocas_maximas,
+                                  repeticoes=argumentos.repeticoes, processos=argumentos.processos, diretorio=argumentos.varredura,
+                                  sementeBase=argumentos.semente)
+        ExibeVarredura(classificacao)
+        return 0
+    
+    # Execução dos algoritmos, em paralelo para todas as instâncias
+    execucoes = ExecutaExperimento(ambientes, [opcao], repeticoes=argumentos.repeticoes, processos=argumentos.processos,
+                                   sementeBase=argumentos.semente, parada=parada)
+    
+    for ambiente in ambientes:
+        print("Ambiente: ", ambiente["Nome"])
+        ExibeResultados(opcao, ambiente, execucoes)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Principal())
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura das instâncias da CVRPLIB e criação do ambiente
+
+Base de dados: CVRPLIB
+http://vrp.atd-lab.inf.puc-rio.br/index.php/en/
+
+@author: Murilo Alves
+"""
+
+import hashlib
+import os
+import zipfile
+
+import numpy
+
+def MatrizDistancias(coordenadas):
+    """
+    Cálcula a matriz densa (float64) de distâncias euclidianas entre todos os estados
+    
+    Entrada:
+        coordenadas: Matriz estados x 2 com as coordenadas
+        
+    Retorno:
+        Matriz estados x estados com as distâncias
+    """
+    coordenadas = numpy.asarray(coordenadas, dtype=numpy.float64)
+    x = coordenadas[:, 0]
+    y = coordenadas[:, 1]
+    distanciaX = x[:, numpy.newaxis] - x[numpy.newaxis, :]
+    distanciaY = y[:, numpy.newaxis] - y[numpy.newaxis, :]
+    distanciaX *= distanciaX
+    distanciaY *= distanciaY
+    distanciaX += distanciaY
+    
+    return numpy.sqrt(distanciaX, out=distanciaX)
+
+def MatrizExplicita(pesos, dimensao, formato):
+    """
+    Monta a matriz densa de distâncias a partir dos pesos da EDGE_WEIGHT_SECTION
+    
+    Entrada:
+        pesos: Vetor com os pesos na ordem do arquivo
+        dimensao: Quantidade de estados
+        formato: EDGE_WEIGHT_FORMAT (FULL_MATRIX, LOWER_ROW, LOWER_DIAG_ROW, UPPER_ROW ou UPPER_DIAG_ROW)
+        
+    Retorno:
+        Matriz estados x estados com as distâncias
+    """
+    if formato == "FULL_MATRIX":
+        indices = tuple(numpy.indices((dimensao, dimensao)).reshape(2, -1))
+    elif formato in ("LOWER_ROW", "LOWER_DIAG_ROW", "UPPER_COL", "UPPER_DIAG_COL"):
+        indices = numpy.tril_indices(dimensao, 0 if "DIAG" in formato else -1)
+    elif formato in ("UPPER_ROW", "UPPER_DIAG_ROW", "LOWER_COL", "LOWER_DIAG_COL"):
+        indices = numpy.triu_indices(dimensao, 0 if "DIAG" in formato else 1)
+    else:
+        raise ValueError("EDGE_WEIGHT_FORMAT não suportado: " + formato)
+    
+    if len(pesos) != len(indices[0]):
+        raise ValueError("EDGE_WEIGHT_SECTION com %d pesos, esperado %d para %s" % (len(pesos), len(indices[0]), formato))
+    
+    distancias = numpy.zeros((dimensao, dimensao))
+    distancias[indices] = pesos
+    if formato != "FULL_MATRIX":
+        distancias[(indices[1], indices[0])] = pesos
+    
+    return distancias
+
+def _Secao(linhas, colunas, secao):
+    """
+    Converte as linhas numéricas de uma seção em uma matriz com a quantidade de colunas esperada
+    """
+    valores = numpy.array(" ".join(linhas).split(), dtype=numpy.float64)
+    if len(valores) % colunas != 0:
+        raise ValueError("%s com linhas incompletas" % secao)
+    
+    return valores.reshape(-1, colunas)
+
+def _OrdenaPorId(valores, dimensao, secao):
+    """
+    Ordena as linhas de uma seção pelo id (primeira coluna), validando que os ids são 1..dimensão sem repetições
+    """
+    ids = valores[:, 0].astype(numpy.int64)
+    if len(ids) != dimensao or not numpy.array_equal(numpy.sort(ids), numpy.arange(1, dimensao + 1)):
+        raise ValueError("%s deve conter os ids 1..%d exatamente uma vez" % (secao, dimensao))
+    
+    return valores[numpy.argsort(ids)]
+
+def LerInstancia(cpvlib):
+    """
+    Lê uma instância TSPLIB/CVRPLIB linha a linha, por seções, com validação dos dados
+    (EDGE_WEIGHT_TYPE EUC_2D ou EXPLICIT com EDGE_WEIGHT_SECTION)
+    
+    Entrada:
+        cpvlib: Caminho do arquivo da instância
+        
+    Retorno:
+        Dicionário colunar com Nome, Capacidade, Veiculos (None se não informado), Coordenadas (None se não houver),
+        Demandas, Depositos (posições) e Distancias
+    """
+    cabecalho = {}
+    secoes = {"NODE_COORD_SECTION": [], "DEMAND_SECTION": [], "DEPOT_SECTION": [], "EDGE_WEIGHT_SECTION": []}
+    secao = None
+    
+    with open(cpvlib, 'r') as fh:
+        for linha in fh:
+            linha = linha.strip()
+            if not linha:
+                continue
+            
+            palavra = linha.split(None, 1)[0].rstrip(":")
+            if palavra == "EOF":
+                break
+            if palavra in secoes:
+                secao = palavra
+            elif ":" in linha and not (palavra[0].isdigit() or palavra[0] == "-"):
+                chave, valor = linha.split(":", 1)
+                cabecalho[chave.strip()] = valor.strip()
+                secao = None
+            elif secao is not None:
+                secoes[secao].append(linha)
+            else:
+                raise ValueError("Linha inesperada em %s: %s" % (cpvlib, linha))
+    
+    for chave in ("DIMENSION", "CAPACITY"):
+        if chave not in cabecalho:
+            raise ValueError("%s sem o campo %s" % (cpvlib, chave))
+    dimensao = int(cabecalho["DIMENSION"])
+    capacidade = int(float(cabecalho["CAPACITY"]))
+    nome = cabecalho.get("NAME", os.path.splitext(os.path.basename(cpvlib))[0])
+    
+    demandas = _OrdenaPorId(_Secao(secoes["DEMAND_SECTION"], 2, "DEMAND_SECTION"), dimensao, "DEMAND_SECTION")[:, 1].astype(numpy.int64)
+    
+    # Depósitos (lista terminada por -1), o primeiro estado se a seção não existir
+    ids = [int(valor) for valor in " ".join(secoes["DEPOT_SECTION"]).split()]
+    depositos = [identificador - 1 for identificador in ids[:ids.index(-1)]] if -1 in ids else [identificador - 1 for identificador in ids]
+    if not depositos:
+        depositos = [0]
+    if min(depositos) < 0 or max(depositos) >= dimensao:
+        raise ValueError("%s com depósito fora de 1..%d" % (cpvlib, dimensao))
+    
+    # Coordenadas e distâncias
+    tipoAresta = cabecalho.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+    coordenadas = None
+    if secoes["NODE_COORD_SECTION"]:
+        coordenadas = _OrdenaPorId(_Secao(secoes["NODE_COORD_SECTION"], 3, "NODE_COORD_SECTION"), dimensao, "NODE_COORD_SECTION")[:, 1:]
+    
+    if tipoAresta == "EXPLICIT":
+        pesos = numpy.array(" ".join(secoes["EDGE_WEIGHT_SECTION"]).split(), dtype=numpy.float64)
+        distancias = MatrizExplicita(pesos, dimensao, cabecalho.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"))
+    elif tipoAresta == "EUC_2D":
+        if coordenadas is None:
+            raise ValueError("%s sem NODE_COORD_SECTION para EUC_2D" % cpvlib)
+        distancias = MatrizDistancias(coordenadas)
+    else:
+        raise ValueError("EDGE_WEIGHT_TYPE não suportado: " + tipoAresta)
+    
+    # Quantidade de veículos: campo VEHICLES, comentário "trucks: K" ou sufixo "-kK" do nome
+    veiculos = None
+    if "VEHICLES" in cabecalho:
+        veiculos = int(cabecalho["VEHICLES"])
+    else:
+        comentario = cabecalho.get("COMMENT", "").replace(",", " ").replace(")", " ").split()
+        if "trucks:" in comentario:
+            veiculos = int(comentario[comentario.index("trucks:") + 1])
+        elif "-k" in nome and nome.rsplit("-k", 1)[1].isdigit():
+            veiculos = int(nome.rsplit("-k", 1)[1])
+    
+    return {"Nome": nome, "Capacidade": capacidade, "Veiculos": veiculos, "Coordenadas": coordenadas,
+            "Demandas": demandas, "Depositos": depositos, "Distancias": distancias}
+
+def CriaAmbiente(instancia):
+    """
+    Monta o ambiente dos métodos a partir de uma instância colunar, com o depósito na posição 0
+    
+    Entrada:
+        instancia: Dicionário retornado por LerInstancia
+        
+    Retorno:
+        Informações sobre o ambiente
+    """
+    if len(instancia["Depositos"]) != 1:
+        raise ValueError("%s possui %d depósitos, os métodos consideram um único depósito" % (instancia["Nome"], len(instancia["Depositos"])))
+    
+    # Depósito(0) + consumidores (1..N), mantendo a ordem do arquivo
+    deposito = instancia["Depositos"][0]
+    quantidadeEstados = len(instancia["Demandas"])
+    ordem = numpy.concatenate(([deposito], numpy.delete(numpy.arange(quantidadeEstados), deposito)))
+    
+    demandas = instancia["Demandas"]
+    distancias = instancia["Distancias"]
+    coordenadas = instancia["Coordenadas"]
+    if deposito != 0:
+        demandas = demandas[ordem]
+        distancias = distancias[numpy.ix_(ordem, ordem)]
+        coordenadas = coordenadas[ordem] if coordenadas is not None else None
+    
+    # Sem a quantidade de veículos, usa o limite inferior pela capacidade
+    veiculos = instancia["Veiculos"]
+    if veiculos is None:
+        veiculos = int(-(-demandas.sum()//instancia["Capacidade"]))
+    
+    if coordenadas is not None:
+        estados = [{"CoordX": x, "CoordY": y, "Demanda": demanda} for (x, y), demanda in zip(coordenadas.tolist(), demandas.tolist())]
+    else:
+        estados = [{"Demanda": demanda} for demanda in demandas.tolist()]
+    
+    ordemDemanda = numpy.argsort(-demandas[1:], kind="stable") + 1 # Consumidores por demanda decrescente
+    
+    ambiente = {"Estados":estados, "Nome": instancia["Nome"], "Capacidade": instancia["Capacidade"], "Veiculos": veiculos, "Distancias": distancias,
+                "Demandas": demandas, "OrdemDemanda": ordemDemanda, "Coordenadas": coordenadas, "Ids": ordem + 1}
+    
+    return ambiente
+
+def AmbienteCenario(ambiente, demandas):
+    """
+    Ambiente com os mesmos pontos (distâncias, coordenadas, capacidade e veículos) e outro vetor de demandas
+    
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        demandas: Demanda de cada estado, na ordem do ambiente (depósito na posição 0)
+        
+    Retorno:
+        Informações sobre o ambiente do cenário, compartilhando a matriz de distâncias
+    """
+    demandas = numpy.asarray(demandas)
+    if demandas.shape != ambiente["Demandas"].shape:
+        raise ValueError("Vetor de demandas com forma %s, esperada %s" % (demandas.shape, ambiente["Demandas"].shape))
+    
+    estados = [dict(estado, Demanda=demanda) for estado, demanda in zip(ambiente["Estados"], demandas.tolist())]
+    ordemDemanda = numpy.argsort(-demandas[1:], kind="stable") + 1 # Consumidores por demanda decrescente
+    
+    return dict(ambiente, Estados=estados, Demandas=demandas, OrdemDemanda=ordemDemanda)
+
+def Vizinhos(ambiente, quantidade):
+    """
+    Lista dos consumidores mais próximos de cada estado, pela matriz de distâncias. Vizinhos já calculados no ambiente
+    ("Vizinhos", ex.: pelos cenários de ResolveCenarios) são reutilizados quando bastam.
+    
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        quantidade: Quantidade de vizinhos por estado (limitada à quantidade de consumidores - 1)
+        
+    Retorno:
+        Matriz estados x vizinhos com as posições dos consumidores em ordem crescente de distância
+    """
+    quantidade = min(quantidade, len(ambiente["Distancias"]) - 2)
+    if ("Vizinhos" in ambiente and ambiente["Vizinhos"].shape[1] >= quantidade):
+        return ambiente["Vizinhos"][:, :quantidade]
+    
+    distancias = numpy.array(ambiente["Distancias"][:, 1:], dtype=numpy.float64)
+    consumidores = distancias.shape[1]
+    quantidade = min(quantidade, consumidores - 1)
+    distancias[numpy.arange(1, consumidores + 1), numpy.arange(consumidores)] = float('inf') # O próprio estado não é vizinho
+    
+    return numpy.argsort(distancias, axis=1, kind="stable")[:, :quantidade] + 1
+
+# Versão do formato do cache binário das instâncias
+VERSAO_CACHE = 1
+
+def CarregaInstancia(cpvlib, arquivoCache):
+    """
+    Carrega a instância do cache binário (.npz) se ele corresponder ao arquivo (hash SHA-1), senão lê o arquivo e grava o cache.
+    O cache é gravado em um arquivo temporário e renomeado, então processos lendo a mesma instância ao mesmo tempo não
+    veem um cache pela metade; um cache ilegível (ex.: corrompido) é tratado como ausente.
+    
+    Entrada:
+        cpvlib: Caminho do arquivo da instância
+        arquivoCache: Caminho do cache binário
+        
+    Retorno:
+        Dicionário colunar da instância (LerInstancia)
+    """
+    with open(cpvlib, 'rb') as fh:
+        chave = hashlib.sha1(fh.read()).hexdigest()
+    
+    if os.path.exists(arquivoCache):
+        try:
+            with numpy.load(arquivoCache) as dados:
+                if int(dados["Versao"]) == VERSAO_CACHE and str(dados["Hash"]) == chave:
+                    return {"Nome": str(dados["Nome"]), "Capacidade": int(dados["Capacidade"]),
+                            "Veiculos": int(dados["Veiculos"]) if int(dados["Veiculos"]) >= 0 else None,
+                            "Coordenadas": dados["Coordenadas"] if len(dados["Coordenadas"]) else None,
+                            "Demandas": dados["Demandas"], "Depositos": dados["Depositos"].tolist(), "Distancias": dados["Distancias"]}
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            pass # Cache ilegível: lido de novo e regravado
+    
+    instancia = LerInstancia(cpvlib)
+    diretorio = os.path.dirname(arquivoCache)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    
+    # Temporário por processo no mesmo diretório, renomeado somente depois de completo
+    temporario = "%s.%d.tmp" % (arquivoCache, os.getpid())
+    try:
+        with open(temporario, 'wb') as fh:
+            numpy.savez(fh, Versao=VERSAO_CACHE, Hash=chave, Nome=instancia["Nome"], Capacidade=instancia["Capacidade"],
+                        Veiculos=instancia["Veiculos"] if instancia["Veiculos"] is not None else -1,
+                        Coordenadas=instancia["Coordenadas"] if instancia["Coordenadas"] is not None else numpy.zeros((0, 2)),
+                        Demandas=instancia["Demandas"], Depositos=numpy.array(instancia["Depositos"]), Distancias=instancia["Distancias"])
+        os.replace(temporario, arquivoCache)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    
+    return instancia
+
+def LerArquivo (cpvlib, cache = False, diretorioCache = None):
+    """
+    Carrega informações de instâncias da biblioteca CVRPLIB. Somente instâncias com um único depósito são suportadas:
+    os métodos partem sempre do depósito na posição 0, e uma instância com vários depósitos (DEPOT_SECTION) gera
+    ValueError (CriaAmbiente).
+    
+    Entrada:
+        cpvlib: Dados do arquivo que contém as informações sobre a instância do problema
+        cache: Usa o cache binário (.npz) da instância, com a matriz de distâncias, ao lado do arquivo
+        diretorioCache: Diretório alternativo para o cache binário (nomeado pelo hash do arquivo)
+        
+    Retorno:
+        Informações sobre o ambiente
+    """
+    if diretorioCache is not None:
+        with open(cpvlib, 'rb') as fh:
+            arquivoCache = os.path.join(diretorioCache, hashlib.sha1(fh.read()).hexdigest() + ".npz")
+        instancia = CarregaInstancia(cpvlib, arquivoCache)
+    elif cache:
+        instancia = CarregaInstancia(cpvlib, os.path.splitext(cpvlib)[0] + ".npz")
+    else:
+        instancia = LerInstancia(cpvlib)
+    
+    return CriaAmbiente(instancia)
+
+def Biblioteca ():
+    """
+    Carrega todas as instâncias escolhidas da biblioteca CVRPLIB
+    
+    Entrada:
+        
+    Retorno:
+        Lista com os dados do arquivo das instâncias
+    """
+    cpvlib = []
+    cpvlib.append("Benchmark/A-n32-k5.vrp")     # 0 - Ideal é 784
+    cpvlib.append("Benchmark/A-n63-k10.vrp")    # 1 - Ideal é 1314 
+    cpvlib.append("Benchmark/A-n64-k9.vrp")     # 2 - Ideal é 1401
+    cpvlib.append("Benchmark/B-n31-k5.vrp")     # 3 - Ideal é 672
+    cpvlib.append("Benchmark/E-n22-k4.vrp")     # 4 - Ideal é 375
+    cpvlib.append("Benchmark/E-n51-k5.vrp")     # 5 - Ideal é 521
+    cpvlib.append("Benchmark/P-n16-k8.vrp")     # 6 - Ideal é 450
+    cpvlib.append("Benchmark/X-n106-k14.vrp")   # 7 - Ideal é 26362
+    
+    return cpvlib
+
+def Otimos ():
+    """
+    Valores ótimos conhecidos das instâncias da Biblioteca
+    
+    Entrada:
+        
+    Retorno:
+        Dicionário com o nome da instância e o valor ótimo
+    """
+    return {"A-n32-k5": 784, "A-n63-k10": 1314, "A-n64-k9": 1401, "B-n31-k5": 672,
+            "E-n22-k4": 375, "E-n51-k5": 521, "P-n16-k8": 450, "X-n106-k14": 26362}
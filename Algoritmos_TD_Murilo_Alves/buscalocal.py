@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Busca local sobre as rotas geradas: 2-opt dentro da rota e realocação/troca de consumidores entre rotas, respeitando a
+capacidade, guiada pelas listas de vizinhos mais próximos e por bits "don't look" (fila de consumidores ativos)
+
+As distâncias são consideradas simétricas, como nas instâncias da CVRPLIB.
+
+@author: Murilo Alves
+"""
+
+from collections import deque
+
+from .ambiente import Vizinhos
+from .nucleo import AtualizaRota, BufferRotas
+
+# Quantidade de vizinhos avaliados por consumidor
+QUANTIDADE_VIZINHOS = 10
+
+# Melhora mínima para aceitar um movimento, evita ciclos por erros de arredondamento
+TOLERANCIA = 1e-9
+
+def BuscaLocal(rotas, ambiente, vizinhos = None):
+    """
+    Melhora as rotas até que nenhum movimento 2-opt, de realocação ou de troca entre um consumidor e seus vizinhos
+    reduza a distância (primeira melhora). Cada passada avalia O(consumidores x vizinhos) movimentos, e somente os
+    consumidores próximos de um movimento aplicado voltam a ser avaliados. Rotas que ficarem vazias são descartadas.
+
+    Entrada:
+        rotas: Lista de rotas no formato de CriaRotas
+        ambiente: Informações sobre o ambiente
+        vizinhos: Matriz de vizinhos (Vizinhos), None para os QUANTIDADE_VIZINHOS mais próximos
+
+    Retorno:
+        Distância total (infinita se inválida) e rotas melhoradas no mesmo formato de CriaRotas
+    """
+    if vizinhos is None:
+        vizinhos = Vizinhos(ambiente, QUANTIDADE_VIZINHOS)
+
+    d = ambiente["Distancias"].tolist()
+    demandas = ambiente["Demandas"].tolist()
+    capacidade = ambiente["Capacidade"]
+    listaVizinhos = vizinhos.tolist()
+    quantidadeEstados = len(demandas)
+
+    # Rotas como sequências que começam e terminam no depósito, com a rota e a posição de cada consumidor
+    sequencias = [[0] + [consumidor for consumidor in rota["Consumidores"] if consumidor != 0] + [0] for rota in rotas]
+    cargas = [sum(demandas[consumidor] for consumidor in sequencia) for sequencia in sequencias]
+    rotaDe = [0]*quantidadeEstados
+    posicao = [0]*quantidadeEstados
+
+    def Indexa(rota):
+        sequencia = sequencias[rota]
+        for indice in range(1, len(sequencia) - 1):
+            rotaDe[sequencia[indice]] = rota
+            posicao[sequencia[indice]] = indice
+
+    for rota in range(len(sequencias)):
+        Indexa(rota)
+
+    def Melhora(u):
+        """
+        Aplica o primeiro movimento que melhora a distância envolvendo o consumidor u
+
+        Retorno:
+            Estados afetados pelo movimento, None se nenhum movimento melhora
+        """
+        r = rotaDe[u]
+        R = sequencias[r]
+        i = posicao[u]
+        p = R[i - 1]
+        n = R[i + 1]
+        du = d[u]
+        remocao = d[p][u] + du[n] - d[p][n]
+
+        for v in listaVizinhos[u]:
+            s = rotaDe[v]
+            S = sequencias[s]
+            j = posicao[v]
+            vp = S[j - 1]
+            vn = S[j + 1]
+            dv = d[v]
+
+            if (s == r):
+                # 2-opt: inverte o trecho entre u e v para que fiquem adjacentes
+                if (i < j):
+                    a = R[i + 1]
+                    if (du[v] + d[a][vn] - du[a] - dv[vn] < -TOLERANCIA):
+                        R[i + 1:j + 1] = R[j:i:-1]
+                        Indexa(r)
+                        return (u, v, a, vn)
+                    if (du[v] + d[p][vp] - d[p][u] - d[vp][v] < -TOLERANCIA):
+                        R[i:j] = R[j - 1:i - 1:-1]
+                        Indexa(r)
+                        return (u, v, p, vp)
+                else:
+                    a = S[j + 1]
+                    if (dv[u] + d[a][n] - dv[a] - du[n] < -TOLERANCIA):
+                        R[j + 1:i + 1] = R[i:j:-1]
+                        Indexa(r)
+                        return (u, v, a, n)
+                    if (dv[u] + d[vp][p] - d[vp][v] - d[p][u] < -TOLERANCIA):
+                        R[j:i] = R[i - 1:j - 1:-1]
+                        Indexa(r)
+                        return (u, v, p, vp)
+
+            # Realocação de u logo após ou logo antes de v
+            if (s == r or cargas[s] + demandas[u] <= capacidade):
+                depois = v != p and dv[u] + du[vn] - dv[vn] - remocao < -TOLERANCIA
+                antes = not depois and v != n and d[vp][u] + du[v] - d[vp][v] - remocao < -TOLERANCIA
+                if (depois or antes):
+                    del R[i]
+                    if (s == r and j > i):
+                        j -= 1
+                    S.insert(j + 1 if depois else j, u)
+                    cargas[r] -= demandas[u]
+                    cargas[s] += demandas[u]
+                    Indexa(r)
+                    if (s != r):
+                        Indexa(s)
+                    return (u, v, p, n, vp, vn)
+
+            # Troca de u e v entre rotas
+            if (s != r and cargas[r] - demandas[u] + demandas[v] <= capacidade and cargas[s] - demandas[v] + demandas[u] <= capacidade):
+                if (d[p][v] + dv[n] - d[p][u] - du[n] + d[vp][u] + du[vn] - d[vp][v] - dv[vn] < -TOLERANCIA):
+                    R[i] = v
+                    S[j] = u
+                    cargas[r] += demandas[v] - demandas[u]
+                    cargas[s] += demandas[u] - demandas[v]
+                    Indexa(r)
+                    Indexa(s)
+                    return (u, v, p, n, vp, vn)
+
+        return None
+
+    # Fila dos consumidores ativos (bit "don't look" desligado)
+    fila = deque(consumidor for sequencia in sequencias for consumidor in sequencia[1:-1])
+    naFila = [False]*quantidadeEstados
+    for consumidor in fila:
+        naFila[consumidor] = True
+
+    while (fila):
+        u = fila.popleft()
+        naFila[u] = False
+
+        afetados = Melhora(u)
+        if (afetados is not None):
+            for estado in afetados:
+                if (estado != 0 and not naFila[estado]):
+                    naFila[estado] = True
+                    fila.append(estado)
+
+    # Rotas no formato de CriaRotas e distância total
+    melhoradas = []
+    for sequencia in sequencias:
+        if (len(sequencia) > 2):
+            rota = {"Demanda": 0, "Custo": 0, "Consumidores": [0]}
+            for estado, acao in zip(sequencia, sequencia[1:]):
+                AtualizaRota(rota, estado, acao, ambiente)
+            melhoradas.append(rota)
+
+    invalida = len(melhoradas) > ambiente["Veiculos"] or any(rota["Demanda"] > capacidade for rota in melhoradas)
+    distanciaTotal = sum(rota["Custo"] for rota in melhoradas) if not invalida else float('inf')
+
+    return distanciaTotal, melhoradas
+
+def BuscaLocalBuffer(rotas, ambiente, vizinhos):
+    """
+    Aplica a busca local às rotas de um BufferRotas, no próprio lugar (polimento das menores rotas durante o treinamento)
+
+    Entrada:
+        rotas: Rotas (BufferRotas)
+        ambiente: Informações sobre o ambiente
+        vizinhos: Matriz de vizinhos (Vizinhos)
+
+    Retorno:
+        Distância total das rotas melhoradas (infinita se inválida)
+    """
+    distanciaTotal, melhoradas = BuscaLocal(rotas.ParaLista(ambiente), ambiente, vizinhos)
+
+    ordem = []
+    veiculos = []
+    for veiculo, rota in enumerate(melhoradas):
+        ordem.extend(rota["Consumidores"][1:])
+        veiculos.extend([veiculo]*(len(rota["Consumidores"]) - 1))
+    rotas.Refaz(ordem, veiculos, len(melhoradas), ambiente)
+
+    return distanciaTotal
+
+class PolimentoRotas:
+    """
+    Busca local sobre as menores rotas durante o treinamento: as rotas de cada época que melhoram a menor distância da
+    exploração (sem busca local) são melhoradas, e as menores rotas passam a ser as melhores rotas após a busca local.
+    Como as melhorias da exploração são raras, o custo é pequeno em relação ao treinamento.
+    """
+    __slots__ = ("ambiente", "vizinhos", "menorExploracao", "rotas")
+
+    def __init__(self, ambiente, quantidadeVizinhos = QUANTIDADE_VIZINHOS):
+        """
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            quantidadeVizinhos: Quantidade de vizinhos avaliados por consumidor
+        """
+        self.ambiente = ambiente
+        self.vizinhos = Vizinhos(ambiente, quantidadeVizinhos)
+        self.menorExploracao = float('inf')
+        self.rotas = None
+
+    def Atualiza(self, primeira, distanciaTotal, rotas, menorRotas, menorDistancia):
+        """
+        Entrada:
+            primeira: Se é a primeira época do treinamento
+            distanciaTotal: Distância total das rotas da época
+            rotas: Rotas da época (BufferRotas)
+            menorRotas: Menores rotas (BufferRotas), atualizadas no próprio lugar
+            menorDistancia: Menor distância após a busca local até o momento
+
+        Retorno:
+            Nova menor distância
+        """
+        if (primeira or distanciaTotal < self.menorExploracao):
+            self.menorExploracao = distanciaTotal
+            if (self.rotas is None):
+                self.rotas = BufferRotas(len(rotas.Demanda), len(rotas.ordem))
+            self.rotas.CopiaDe(rotas)
+
+            distanciaPolida = BuscaLocalBuffer(self.rotas, self.ambiente, self.vizinhos)
+            if (primeira or distanciaPolida < menorDistancia):
+                menorRotas.CopiaDe(self.rotas)
+                return distanciaPolida
+
+        return menorDistancia
+
+    def Final(self, rotas):
+        """
+        Busca local sobre as menores rotas ao final do treinamento (núcleo compilado e lote de episódios)
+
+        Entrada:
+            rotas: Lista de rotas no formato de CriaRotas
+
+        Retorno:
+            Distância total e rotas melhoradas
+        """
+        return BuscaLocal(rotas, self.ambiente, self.vizinhos)
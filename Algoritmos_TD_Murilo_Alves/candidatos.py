@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Espaço de ações reduzido por listas de candidatos: a partir de cada estado, somente o depósito e os k consumidores mais
+próximos são ações, com a matriz Q(s,a) armazenada em linhas de k + 1 colunas (coluna 0 = depósito, coluna j = j-ésimo
+vizinho). O tempo por passo e a memória da matriz Q passam de O(N) e O(N²) para O(k) e O(N·k).
+
+@author: Murilo Alves
+"""
+
+import numpy
+
+from .ambiente import Vizinhos
+from .buscalocal import PolimentoRotas
+from .continuacao import IniciaTabelas
+from .nucleo import (Amostrador, AtualizaQ, BufferRotas, DespachoMenorDemanda, EpsilonEpoca, Recompensa, RetornoDeposito,
+                     TaxaAprendizagem)
+
+class EpisodioCandidatos:
+    """
+    Estado de um episódio com ações candidatas. Diferente de Episodio, a viabilidade de capacidade é verificada apenas
+    nos candidatos do estado (O(k) por passo), e a máscara completa só é consultada quando nenhum vizinho é válido.
+    
+    Atributos:
+        Restantes: Quantidade de consumidores abertos
+        DemandaRota: Demanda acumulada pela rota atual (veículos dinâmicos)
+    """
+    __slots__ = ("Restantes", "DemandaRota", "abertos", "mascara", "candidatos", "demandas", "capacidade", "VeiculosDinamicos")
+    
+    def __init__(self, ambiente, candidatos, VeiculosDinamicos):
+        """
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            candidatos: Lista dos vizinhos candidatos de cada estado (Vizinhos)
+            VeiculosDinamicos: Se a capacidade restringe as ações (rotas criadas sob demanda)
+        """
+        quantidadeEstados = len(ambiente["Demandas"])
+        
+        # Estado inicial do ambiente (depósito) já visitado
+        self.abertos = [True]*quantidadeEstados
+        self.abertos[0] = False
+        self.mascara = numpy.ones(quantidadeEstados, dtype=bool)
+        self.mascara[0] = False
+        self.Restantes = quantidadeEstados - 1
+        self.DemandaRota = 0
+        
+        self.candidatos = candidatos
+        self.demandas = ambiente["Demandas"]
+        self.capacidade = ambiente["Capacidade"]
+        self.VeiculosDinamicos = VeiculosDinamicos
+    
+    def Colunas(self, estado, demandas):
+        """
+        Colunas válidas da linha Q(estado,·): o depósito ao fim de uma rota não vazia (veículos dinâmicos) e os vizinhos
+        abertos e, se veículos dinâmicos, viáveis pela capacidade
+        
+        Entrada:
+            estado: Posição do estado
+            demandas: Lista das demandas
+            
+        Retorno:
+            Lista das colunas válidas (0 para o depósito)
+        """
+        colunas = [0] if (self.VeiculosDinamicos and estado != 0) else []
+        abertos = self.abertos
+        if self.VeiculosDinamicos:
+            folga = self.capacidade - self.DemandaRota
+            for coluna, candidato in enumerate(self.candidatos[estado], 1):
+                if abertos[candidato] and demandas[candidato] <= folga:
+                    colunas.append(coluna)
+        else:
+            for coluna, candidato in enumerate(self.candidatos[estado], 1):
+                if abertos[candidato]:
+                    colunas.append(coluna)
+        
+        return colunas
+    
+    def Acao(self, estado, coluna):
+        """
+        Entrada:
+            estado: Posição do estado
+            coluna: Coluna da linha Q(estado,·)
+            
+        Retorno:
+            Posição (index) da ação
+        """
+        return self.candidatos[estado][coluna - 1] if coluna != 0 else 0
+    
+    def SorteiaColuna(self, colunas, uniforme):
+        """
+        Sorteia uma coluna válida para a exploração. O depósito tem a probabilidade que teria no sorteio entre ele e os
+        consumidores abertos (1/(Restantes + 1)), e os vizinhos candidatos dividem o restante de forma uniforme.
+        
+        Entrada:
+            colunas: Colunas válidas (Colunas)
+            uniforme: Número uniforme em [0, 1)
+            
+        Retorno:
+            Coluna sorteada
+        """
+        if (colunas[0] != 0):
+            return colunas[int(uniforme*len(colunas))]
+        
+        chance = 1/(self.Restantes + 1)
+        if (uniforme < chance or len(colunas) == 1):
+            return 0
+        
+        return colunas[min(1 + int((uniforme - chance)/(1 - chance)*(len(colunas) - 1)), len(colunas) - 1)]
+    
+    def MaisProxima(self, estado, distancias):
+        """
+        Consumidor válido mais próximo do estado, usado quando nenhum vizinho candidato é válido (todos visitados ou
+        inviáveis), ou o depósito se nenhum consumidor for válido. Percorre a linha inteira de distâncias (O(N)), e o
+        passo escolhido aqui não é aprendido: a ação está fora da linha de candidatos, então Q e QVisitas não são
+        atualizados (exceto o retorno ao depósito, coluna 0, quando há colunas válidas).
+        
+        Entrada:
+            estado: Posição do estado
+            distancias: Matriz de distâncias
+            
+        Retorno:
+            Posição (index) da ação
+        """
+        mascara = self.mascara
+        if self.VeiculosDinamicos:
+            mascara = mascara & (self.demandas <= self.capacidade - self.DemandaRota)
+        
+        distanciasValidas = numpy.where(mascara, distancias[estado], float('inf'))
+        acao = int(numpy.argmin(distanciasValidas))
+        
+        return acao if distanciasValidas[acao] != float('inf') else 0
+    
+    def Visita(self, acao, demanda):
+        """
+        Marca o consumidor como visitado e acumula sua demanda, ou inicia uma nova rota no depósito (veículos dinâmicos)
+        
+        Entrada:
+            acao: Posição da ação
+            demanda: Demanda da ação
+        """
+        if (acao != 0):
+            self.abertos[acao] = False
+            self.mascara[acao] = False
+            self.Restantes -= 1
+            self.DemandaRota = self.DemandaRota + demanda
+        else:
+            self.DemandaRota = 0
+
+def MaxQColunas(valores, colunas):
+    """
+    Entrada:
+        valores: Linha Q(s,·) (lista)
+        colunas: Colunas válidas
+        
+    Retorno:
+        Coluna válida de maior valor (a primeira em caso de empate)
+    """
+    return max(colunas, key=valores.__getitem__)
+
+def Q_Learning_Candidatos(ambiente, taxaDesconto = 0.1, epsilon = 0.9, epocas = 1000, semente = None, resultados = None, quantidadeCandidatos = 10,
+                          VeiculosDinamicos = False, parada = None, inicial = None, controle = None, buscaLocal = False,
+                          taxaAprendizagem = TaxaAprendizagem, despacho = None):
+    """
+    Q-Learning (Métodos 1 e 3) com as ações restritas aos candidatos de cada estado. Quando nenhum vizinho é válido, a
+    ação é o consumidor válido mais próximo, sem atualização de Q (fora da linha de candidatos). O valor da ação futura
+    é o maior valor entre as colunas válidas do próximo estado (0 se não houver).
+    
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        taxaDesconto, epsilon, epocas, semente, resultados, parada, inicial, controle, buscaLocal, taxaAprendizagem, despacho:
+            Como nos Métodos 1 e 3
+        quantidadeCandidatos: Quantidade k de vizinhos candidatos por estado
+        VeiculosDinamicos: Se as rotas são criadas sob demanda (Método 3) ou fixas (Método 1)
+        
+    Retorno:
+        Menor distância, menores rotas e a distância de cada época
+    """
+    metodo = "Q_Learning_VeiculosDinamicos" if VeiculosDinamicos else "Q_Learning_VeiculosFixos"
+    
+    # Quantidade de estados do ambiente e candidatos de cada estado
+    quantidadeEstados = len(ambiente["Estados"])
+    candidatos = Vizinhos(ambiente, quantidadeCandidatos).tolist()
+    distancias = ambiente["Distancias"]
+    capacidade = ambiente["Capacidade"]
+    demandas = ambiente["Demandas"].tolist()
+    
+    # Matriz Q(s,a) de candidatos, uma linha de k + 1 colunas por estado
+    Q = numpy.zeros((quantidadeEstados, len(candidatos[0]) + 1))
+    QVisitas = numpy.zeros(Q.shape, dtype=numpy.int32)
+    
+    # Gerador de números aleatórios
+    amostrador = Amostrador(semente)
+    
+    # Rotas do episódio e menores rotas, reutilizadas a cada época
+    if (VeiculosDinamicos):
+        rotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+        menorRotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+    else:
+        rotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+        menorRotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+        if (despacho is None):
+            despacho = DespachoMenorDemanda()
+    
+    #Armazenar os resultados (lista ou coletor com append/extend)
+    if (resultados is None):
+        resultados = []
+    
+    # Busca local sobre as menores rotas (opcional)
+    polimento = PolimentoRotas(ambiente) if buscaLocal else None
+    
+    # Tabelas iniciais de um treinamento anterior (warm-start, opcional)
+    matrizes = {"Q": Q, "QVisitas": QVisitas}
+    if (inicial is not None):
+        IniciaTabelas(inicial, matrizes)
+    
+    # Retomada e gravação periódica do estado do treinamento (opcional)
+    epocaInicial = 0
+    menorDistancia = float('inf')
+    if (controle is not None):
+        epocaInicial, menorDistancia = controle.Inicia(metodo + "_Candidatos", ambiente, matrizes, amostrador, menorRotas)
+    
+    # Critérios de parada antecipada (opcional)
+    if (parada is not None):
+        parada.Inicia(ambiente, Q, epocaInicial=epocaInicial)
+    
+    for i in range(epocaInicial, epocas):
+        # Epsilon da época (constante ou programado)
+        epsilonEpoca = EpsilonEpoca(epsilon, i)
+        
+        # Consumidores abertos, com o estado inicial do ambiente (depósito) já visitado
+        episodio = EpisodioCandidatos(ambiente, candidatos, VeiculosDinamicos)
+        
+        # Metricas da rota
+        rotas.Reinicia(1 if VeiculosDinamicos else ambiente["Veiculos"])
+        if (not VeiculosDinamicos):
+            despacho.Reinicia(rotas)
+        veiculo = 0
+        estado = 0
+        
+        # Com veículos dinâmicos, a última rota também retorna ao depósito
+        while (episodio.Restantes != 0 or (VeiculosDinamicos and estado != 0)):
+            # Escolhe um veiculo e o último estado da rota escolhida
+            if (not VeiculosDinamicos):
+                veiculo = despacho.Escolhe(rotas)
+                estado = rotas.Ultimo[veiculo]
+            
+            # Colunas válidas
+            colunas = episodio.Colunas(estado, demandas)
+            
+            # Escolhe uma ação entre os candidatos, ou o consumidor mais próximo se nenhum vizinho for válido
+            if (colunas and (colunas[-1] != 0 or episodio.Restantes == 0)):
+                if (amostrador.Uniforme() > epsilonEpoca): # Aleatoriedade
+                    coluna = episodio.SorteiaColuna(colunas, amostrador.Uniforme())
+                else: # Maior valor
+                    coluna = MaxQColunas(Q[estado].tolist(), colunas)
+                acao = episodio.Acao(estado, coluna)
+            else:
+                acao = episodio.MaisProxima(estado, distancias)
+                coluna = 0 if (acao == 0 and colunas) else None
+            
+            # Cálcula a distância euclidiana e atualiza a rota
+            distancia = rotas.Atualiza(veiculo, acao, ambiente)
+            if (not VeiculosDinamicos):
+                despacho.Atualiza(rotas, veiculo)
+            
+            # Marca a ação para não se escolhida de novo
+            episodio.Visita(acao, demandas[acao])
+            
+            # Cria uma nova rota ao retornar ao depósito
+            if (VeiculosDinamicos and acao == 0 and episodio.Restantes != 0):
+                veiculo = rotas.NovaRota()
+            
+            if (coluna is not None):
+                # Atualiza a quantidade de visitas ao par (s,a)
+                QVisitas[estado, coluna] += 1
+                
+                # Recompensa por escolher a ação no estado atual
+                recompensa = Recompensa(distancia, demandas[acao], capacidade)
+                
+                # Valor da possível próxima ação (0 se não há coluna válida)
+                proximas = episodio.Colunas(acao, demandas) if episodio.Restantes != 0 else []
+                valorAcaoFutura = Q[acao, MaxQColunas(Q[acao].tolist(), proximas)] if proximas else 0
+                
+                # Atualiza Q
+                AtualizaQ(Q, QVisitas, estado, coluna, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+            
+            # Atualiza o estado com a ação
+            estado = acao
+        
+        if (not VeiculosDinamicos):
+            # Retorno de cada rota ao depósito (coluna 0) e distância total
+            distanciaTotal = RetornoDeposito(rotas, Q, QVisitas, ambiente, taxaAprendizagem)
+        else:
+            # Cálculo da distância total das rotas geradas
+            distanciaTotal = rotas.Distancia(ambiente)
+        
+        resultados.append(distanciaTotal)
+        if (polimento is not None): # Busca local sobre cada nova menor rota da exploração (opcional)
+            menorDistancia = polimento.Atualiza(i == 0, distanciaTotal, rotas, menorRotas, menorDistancia)
+        elif (i == 0 or distanciaTotal < menorDistancia):
+            menorDistancia = distanciaTotal
+            menorRotas.CopiaDe(rotas)
+        
+        parar = parada is not None and parada.Para(i + 1, menorDistancia)
+        if (controle is not None):
+            controle.Atualiza(i + 1, menorDistancia, parar or i + 1 == epocas)
+        if (parar):
+            break
+    
+    return menorDistancia, menorRotas.ParaLista(ambiente), resultados
+
+def RotasGulosasCandidatos(Q, ambiente, VeiculosDinamicos = False, despacho = None):
+    """
+    Passada gulosa (ver RotasGulosas) sobre uma matriz Q de candidatos treinada por Q_Learning_Candidatos
+    
+    Entrada:
+        Q: Matriz Q(s,a) de candidatos (estados x (k + 1))
+        ambiente: Informações sobre o ambiente
+        VeiculosDinamicos: Se as rotas são criadas sob demanda (Método 3) ou fixas (Método 1)
+        despacho: Seleção do veículo com veículos fixos, a mesma do treinamento (padrão: DespachoMenorDemanda)
+        
+    Retorno:
+        Distância total (infinita se inválida) e rotas no mesmo formato de CriaRotas
+    """
+    quantidadeEstados = len(ambiente["Demandas"])
+    demandas = ambiente["Demandas"].tolist()
+    episodio = EpisodioCandidatos(ambiente, Vizinhos(ambiente, Q.shape[1] - 1).tolist(), VeiculosDinamicos)
+    
+    if (VeiculosDinamicos):
+        rotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+        rotas.Reinicia(1)
+    else:
+        rotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+        rotas.Reinicia(ambiente["Veiculos"])
+        despacho = DespachoMenorDemanda() if despacho is None else despacho
+        despacho.Reinicia(rotas)
+    veiculo = 0
+    estado = 0
+    
+    while (episodio.Restantes != 0 or (VeiculosDinamicos and estado != 0)):
+        if (not VeiculosDinamicos):
+            veiculo = despacho.Escolhe(rotas)
+            estado = rotas.Ultimo[veiculo]
+        
+        colunas = episodio.Colunas(estado, demandas)
+        if (colunas and (colunas[-1] != 0 or episodio.Restantes == 0)):
+            acao = episodio.Acao(estado, MaxQColunas(Q[estado].tolist(), colunas))
+        else:
+            acao = episodio.MaisProxima(estado, ambiente["Distancias"])
+        
+        rotas.Atualiza(veiculo, acao, ambiente)
+        if (not VeiculosDinamicos):
+            despacho.Atualiza(rotas, veiculo)
+        episodio.Visita(acao, demandas[acao])
+        
+        if (VeiculosDinamicos and acao == 0 and episodio.Restantes != 0):
+            veiculo = rotas.NovaRota()
+        
+        estado = acao
+    
+    if (not VeiculosDinamicos):
+        # Retorno ao depósito
+        for veiculo in range(rotas.Quantidade):
+            rotas.Atualiza(veiculo, 0, ambiente)
+    
+    return rotas.Distancia(ambiente), rotas.ParaLista(ambiente)
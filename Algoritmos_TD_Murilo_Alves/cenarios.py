@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Solução de vários cenários de demanda sobre os mesmos pontos (ex.: as demandas de cada dia com depósito e clientes
+fixos). Os pontos, a matriz de distâncias, os vizinhos candidatos e as tabelas iniciais são enviados uma única vez para
+cada processo, e cada cenário envia somente o seu vetor de demandas. Os cenários são resolvidos em paralelo, partindo
+das mesmas tabelas de um treinamento anterior (warm-start).
+
+@author: Murilo Alves
+"""
+
+import collections
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .ambiente import AmbienteCenario, Vizinhos
+from .continuacao import CarregaEstado
+from .experimento import SementeTarefa
+from .metodos import Metodos
+
+# Ambiente, tabelas iniciais, critérios de parada e argumentos do método enviados uma única vez para cada processo
+_ambienteCenarios = None
+_inicialCenarios = None
+_paradaCenarios = None
+_opcoesCenarios = None
+
+def _IniciaProcessoCenarios(ambiente, inicial, parada, opcoes):
+    global _ambienteCenarios, _inicialCenarios, _paradaCenarios, _opcoesCenarios
+    _ambienteCenarios = ambiente
+    _inicialCenarios = CarregaEstado(inicial) if isinstance(inicial, (str, os.PathLike)) else inicial
+    _paradaCenarios = parada
+    _opcoesCenarios = opcoes
+
+def ExecutaCenario(tarefa):
+    """
+    Resolve um cenário em um processo do executor
+
+    Entrada:
+        tarefa: Tupla (posição do cenário, vetor de demandas, semente)
+
+    Retorno:
+        Dicionário com a posição do cenário, a menor distância, as menores rotas, o tempo de execução e, com critérios
+        de parada, o motivo da parada e as épocas executadas
+    """
+    cenario, demandas, semente = tarefa
+    opcao, opcoes = _opcoesCenarios
+
+    # O nome do cenário não é o da instância, então o ótimo conhecido (gap) não se aplica
+    ambiente = AmbienteCenario(_ambienteCenarios, demandas)
+    ambiente["Nome"] = "%s#%d" % (_ambienteCenarios["Nome"], cenario)
+
+    inicio = time.perf_counter()
+    parada = _paradaCenarios() if _paradaCenarios is not None else None
+    # A taxa de desconto é posicional e sem valor padrão no Método 2, como em ExecutaTrabalho (servico.py)
+    opcoes = dict(opcoes)
+    taxaDesconto = opcoes.pop("taxaDesconto", 0.1)
+    menorDistancia, menorRotas, _ = Metodos()[opcao](ambiente, taxaDesconto, semente=semente, parada=parada,
+                                                     inicial=_inicialCenarios, **opcoes)
+    tempo = time.perf_counter() - inicio
+
+    resultado = {"Cenario": cenario, "MenorDistancia": menorDistancia, "MenorRotas": menorRotas, "Tempo": tempo}
+    if (parada is not None):
+        resultado["Motivo"] = parada.Motivo
+        resultado["Epocas"] = parada.Epocas
+
+    return resultado
+
+def IteraCenarios(ambiente, demandas, opcao = 0, inicial = None, processos = None, sementeBase = 0, parada = None, **opcoes):
+    """
+    Resolve os cenários em paralelo à medida que são lidos, com no máximo dois cenários por processo em espera, e
+    devolve os resultados na ordem dos cenários
+
+    Entrada:
+        ambiente: Informações sobre o ambiente (pontos, capacidade e veículos), ex.: LerArquivo
+        demandas: Matriz cenários x estados ou iterável de vetores de demandas (depósito na posição 0)
+        opcao: Opção do algoritmo (Metodos)
+        inicial: Tabelas iniciais compartilhadas por todos os cenários (caminho do arquivo de estado, estado lido por
+                 CarregaEstado ou dicionário nome -> matriz), None para treinar cada cenário do zero
+        processos: Quantidade de processos, None para a quantidade de núcleos
+        sementeBase: Semente dos cenários
+        parada: Classe (ou função sem argumentos) que cria os critérios de parada de cada cenário, ex.:
+                functools.partial(CriterioParada, paciencia=200)
+        opcoes: Demais argumentos do método (ex.: taxaDesconto, 0.1 se omitida, epocas, candidatos, buscaLocal)
+
+    Retorno:
+        Iterador dos resultados de cada cenário (ExecutaCenario)
+    """
+    processos = processos if processos is not None else os.cpu_count()
+
+    # Vizinhos candidatos calculados uma única vez para todos os cenários
+    if (opcoes.get("candidatos") is not None):
+        ambiente = dict(ambiente, Vizinhos=Vizinhos(ambiente, opcoes["candidatos"]))
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_IniciaProcessoCenarios,
+                             initargs=(ambiente, inicial, parada, (opcao, opcoes))) as executor:
+        pendentes = collections.deque()
+        try:
+            for cenario, vetor in enumerate(demandas):
+                pendentes.append(executor.submit(ExecutaCenario, (cenario, vetor, SementeTarefa(sementeBase, ambiente["Nome"], opcao, cenario))))
+                if (len(pendentes) >= 2*processos):
+                    yield pendentes.popleft().result()
+
+            while (pendentes):
+                yield pendentes.popleft().result()
+        finally: # Iteração interrompida: os cenários ainda não iniciados são cancelados
+            for futuro in pendentes:
+                futuro.cancel()
+
+def ResolveCenarios(ambiente, demandas, opcao = 0, inicial = None, processos = None, sementeBase = 0, parada = None, **opcoes):
+    """
+    Resolve todos os cenários em paralelo (ver IteraCenarios)
+
+    Retorno:
+        Lista com o resultado de cada cenário, na ordem dos cenários
+    """
+    return list(IteraCenarios(ambiente, demandas, opcao, inicial, processos, sementeBase, parada, **opcoes))
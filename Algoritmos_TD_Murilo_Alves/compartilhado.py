@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Treinamento assíncrono de uma instância em vários processos (estilo Hogwild): cada processo gera os seus episódios com
+o seu próprio gerador de números aleatórios e aplica as atualizações TD, sem travas, às mesmas matrizes Q(s,a) e de
+visitas em memória compartilhada (multiprocessing.shared_memory). A menor distância global é compartilhada entre os
+processos, e o primeiro critério de parada atendido em um processo encerra todos.
+
+As atualizações concorrentes podem sobrescrever umas às outras (ex.: dois incrementos de QVisitas no mesmo par), o que
+o Hogwild tolera porque os pares disputados são poucos em relação ao tamanho das matrizes. Por isso, diferente das
+execuções com um processo, o resultado não é reproduzível pela semente. O ganho de tempo com vários núcleos ainda não
+foi medido (python Desempenho.py escalonamento).
+
+@author: Murilo Alves
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy
+
+from .continuacao import IniciaTabelas
+from .metodos import Q_Learning_VeiculosDinamicos
+from .nucleo import TaxaAprendizagem
+from .parada import CriterioParada
+
+# Matrizes compartilhadas de cada método: (nome, tipo)
+MATRIZES = {
+    "Q_Learning_VeiculosDinamicos": (("Q", numpy.float64), ("QVisitas", numpy.int32)),
+    "DoubleQ_Learning_VeiculosDinamicos": (("Q1", numpy.float64), ("Q2", numpy.float64), ("QVisitas", numpy.int32)),
+}
+
+# Alinhamento das matrizes no bloco de memória compartilhada
+ALINHAMENTO = 64
+
+def Disposicao(metodo, quantidadeEstados):
+    """
+    Entrada:
+        metodo: Nome do método (MATRIZES)
+        quantidadeEstados: Quantidade de estados do ambiente
+
+    Retorno:
+        Lista de (nome, tipo, deslocamento) das matrizes no bloco e o tamanho do bloco em bytes
+    """
+    disposicao = []
+    deslocamento = 0
+    for nome, tipo in MATRIZES[metodo]:
+        disposicao.append((nome, numpy.dtype(tipo).str, deslocamento))
+        deslocamento += -(-quantidadeEstados*quantidadeEstados*numpy.dtype(tipo).itemsize//ALINHAMENTO)*ALINHAMENTO
+
+    return disposicao, deslocamento
+
+def Matrizes(memoria, disposicao, quantidadeEstados):
+    """
+    Entrada:
+        memoria: Bloco de memória compartilhada (SharedMemory)
+        disposicao: Disposição das matrizes no bloco (Disposicao)
+        quantidadeEstados: Quantidade de estados do ambiente
+
+    Retorno:
+        Dicionário nome -> matriz (NumPy) sobre o bloco, sem cópia
+    """
+    return {nome: numpy.ndarray((quantidadeEstados, quantidadeEstados), dtype=tipo, buffer=memoria.buf, offset=deslocamento)
+            for nome, tipo, deslocamento in disposicao}
+
+class ParadaCompartilhada:
+    """
+    Critérios de parada de um processo com a menor distância global: a cada época, publica a menor distância do processo
+    e para quando o seu critério é atendido (avisando os demais) ou quando outro processo já parou
+
+    Atributos:
+        Motivo: Motivo da parada (ver CriterioParada), COMPARTILHADA quando outro processo parou antes
+        Epocas: Quantidade de épocas executadas pelo processo
+    """
+    COMPARTILHADA = "compartilhada"
+
+    __slots__ = ("criterio", "menor", "evento", "Motivo", "Epocas")
+
+    def __init__(self, menor, evento, criterio = None):
+        """
+        Entrada:
+            menor: Menor distância global (multiprocessing.Value 'd')
+            evento: Aviso de parada entre os processos (multiprocessing.Event)
+            criterio: Critérios de parada do processo (ex.: CriterioParada), None para somente as épocas
+        """
+        self.criterio = criterio
+        self.menor = menor
+        self.evento = evento
+        self.Motivo = None
+        self.Epocas = 0
+
+    def Inicia(self, ambiente, *matrizes, epocaInicial = 0):
+        self.Motivo = CriterioParada.EPOCAS
+        self.Epocas = epocaInicial
+        if (self.criterio is not None):
+            self.criterio.Inicia(ambiente, *matrizes, epocaInicial=epocaInicial)
+
+    def Para(self, epocas, menorDistancia):
+        self.Epocas = epocas
+
+        # Menor distância global
+        if (menorDistancia < self.menor.value):
+            with self.menor.get_lock():
+                if (menorDistancia < self.menor.value):
+                    self.menor.value = menorDistancia
+
+        if (self.criterio is not None and self.criterio.Para(epocas, menorDistancia)):
+            self.Motivo = self.criterio.Motivo
+            self.evento.set()
+            return True
+        if (self.evento.is_set()):
+            self.Motivo = ParadaCompartilhada.COMPARTILHADA
+            return True
+
+        return False
+
+# Ambiente, matrizes compartilhadas e aviso de parada de cada processo do executor
+_ambienteCompartilhado = None
+_memoriaCompartilhada = None
+_matrizesCompartilhadas = None
+_menorCompartilhada = None
+_eventoCompartilhado = None
+_paradaCompartilhada = None
+
+def _IniciaProcessoCompartilhado(ambiente, nomeMemoria, disposicao, menor, evento, parada):
+    global _ambienteCompartilhado, _memoriaCompartilhada, _matrizesCompartilhadas, _menorCompartilhada, _eventoCompartilhado, _paradaCompartilhada
+    _ambienteCompartilhado = ambiente
+    _memoriaCompartilhada = shared_memory.SharedMemory(name=nomeMemoria)
+    _matrizesCompartilhadas = Matrizes(_memoriaCompartilhada, disposicao, len(ambiente["Estados"]))
+    _menorCompartilhada = menor
+    _eventoCompartilhado = evento
+    _paradaCompartilhada = parada
+
+def ExecutaTrabalhador(trabalho):
+    """
+    Treina sobre as matrizes compartilhadas em um processo do executor
+
+    Entrada:
+        trabalho: Tupla (método, épocas, semente, argumentos do método)
+
+    Retorno:
+        Dicionário com a menor distância, as menores rotas, os resultados por época, o motivo da parada e as épocas
+        executadas pelo processo
+    """
+    metodo, epocas, semente, opcoes = trabalho
+
+    criterio = _paradaCompartilhada() if _paradaCompartilhada is not None else None
+    parada = ParadaCompartilhada(_menorCompartilhada, _eventoCompartilhado, criterio)
+    menorDistancia, menorRotas, resultados = metodo(_ambienteCompartilhado, epocas=epocas, semente=semente, parada=parada,
+                                                    tabelas=_matrizesCompartilhadas, **opcoes)
+
+    return {"MenorDistancia": menorDistancia, "MenorRotas": menorRotas, "Resultados": resultados, "Motivo": parada.Motivo,
+            "Epocas": parada.Epocas}
+
+def TreinamentoCompartilhado(ambiente, metodo = Q_Learning_VeiculosDinamicos, taxaDesconto = 0.1, epsilon = 0.9, epocas = 1000,
+                             processos = None, semente = None, parada = None, inicial = None, buscaLocal = False,
+                             taxaAprendizagem = TaxaAprendizagem, tabelas = None):
+    """
+    Treina uma instância com vários processos sobre as mesmas matrizes (Métodos 3 e 4). As épocas são divididas entre
+    os processos, então o total de episódios é o mesmo de uma execução com um processo. Não há medição de ganho de tempo
+    sobre um processo: a única, em um núcleo (Desempenho.py escalonamento, ver o README), não mostra diferença além da
+    variação entre sementes. As atualizações das matrizes entre processos não são sincronizadas, então com mais de um
+    processo os resultados variam mesmo com a semente fixa.
+
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        metodo: Q_Learning_VeiculosDinamicos ou DoubleQ_Learning_VeiculosDinamicos
+        taxaDesconto, epsilon, buscaLocal, taxaAprendizagem: Como no método (epsilon programado por época de cada processo)
+        epocas: Total de épocas, somando todos os processos
+        processos: Quantidade de processos, None para a quantidade de núcleos
+        semente: Semente das sementes de cada processo; None sorteia as sementes (execução não reproduzível)
+        parada: Classe (ou função sem argumentos) que cria os critérios de parada de cada processo, ex.:
+                functools.partial(CriterioParada, gapAlvo=5); o primeiro processo a parar encerra os demais
+        inicial: Tabelas iniciais (warm-start), como no método
+        tabelas: Dicionário que recebe cópias das matrizes treinadas (Q e QVisitas, ou Q1, Q2 e QVisitas), opcional
+
+    Retorno:
+        Menor distância, menores rotas e lista com o dicionário de cada processo (ExecutaTrabalhador)
+    """
+    if metodo.__name__ not in MATRIZES:
+        raise ValueError("O treinamento compartilhado é suportado somente pelos Métodos 3 e 4 (veículos dinâmicos)")
+    processos = processos if processos is not None else os.cpu_count()
+    quantidadeEstados = len(ambiente["Estados"])
+
+    # Épocas e semente de cada processo
+    sementes = numpy.random.SeedSequence(semente).generate_state(processos, numpy.uint64).tolist()
+    opcoes = {"taxaDesconto": taxaDesconto, "epsilon": epsilon, "buscaLocal": buscaLocal, "taxaAprendizagem": taxaAprendizagem}
+    trabalhos = [(metodo, epocas//processos + (trabalhador < epocas % processos), sementes[trabalhador], opcoes)
+                 for trabalhador in range(processos)]
+
+    # Matrizes zeradas (ou iniciadas) em um único bloco de memória compartilhada
+    disposicao, tamanho = Disposicao(metodo.__name__, quantidadeEstados)
+    memoria = shared_memory.SharedMemory(create=True, size=tamanho)
+    matrizes = None
+    trabalhadores = []
+    try:
+        matrizes = Matrizes(memoria, disposicao, quantidadeEstados)
+        for matriz in matrizes.values():
+            matriz.fill(0)
+        if (inicial is not None):
+            IniciaTabelas(inicial, matrizes)
+
+        menor = multiprocessing.Value('d', float('inf'))
+        evento = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=processos, initializer=_IniciaProcessoCompartilhado,
+                                 initargs=(ambiente, memoria.name, disposicao, menor, evento, parada)) as executor:
+            trabalhadores = list(executor.map(ExecutaTrabalhador, trabalhos))
+
+        if (tabelas is not None):
+            tabelas.update({nome: matriz.copy() for nome, matriz in matrizes.items()})
+    finally:
+        # As matrizes sobre o bloco precisam ser liberadas antes de fechá-lo
+        matrizes = None
+        memoria.close()
+        memoria.unlink()
+
+    melhor = min(trabalhadores, key=lambda trabalhador: trabalhador["MenorDistancia"])
+
+    return melhor["MenorDistancia"], melhor["MenorRotas"], trabalhadores
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação e retomada do treinamento: matrizes Q(s,a) e de visitas, estado do gerador de números aleatórios,
+quantidade de épocas e menores rotas em um arquivo binário mapeado em memória na leitura
+
+Formato do arquivo: MAGICO, tamanho do cabeçalho (uint64), cabeçalho JSON e as matrizes alinhadas em 64 bytes
+
+@author: Murilo Alves
+"""
+
+import json
+import os
+import struct
+
+import numpy
+
+# Identificação e versão do formato do arquivo de estado
+MAGICO = b"CVRPQ\x00"
+VERSAO_ESTADO = 1
+ALINHAMENTO = 64
+
+def _Alinha(tamanho):
+    return -(-tamanho//ALINHAMENTO)*ALINHAMENTO
+
+def GravaEstado(caminho, cabecalho, matrizes):
+    """
+    Grava o cabeçalho e as matrizes em um arquivo temporário e o renomeia, para que uma interrupção durante a
+    gravação não corrompa o estado anterior
+
+    Entrada:
+        caminho: Caminho do arquivo
+        cabecalho: Dicionário serializável em JSON
+        matrizes: Dicionário nome -> matriz (NumPy)
+    """
+    descricao = []
+    deslocamento = 0
+    for nome, matriz in matrizes.items():
+        descricao.append({"Nome": nome, "Tipo": matriz.dtype.str, "Forma": list(matriz.shape), "Deslocamento": deslocamento})
+        deslocamento += _Alinha(matriz.nbytes)
+
+    texto = json.dumps(dict(cabecalho, Versao=VERSAO_ESTADO, Matrizes=descricao)).encode()
+    inicioDados = _Alinha(len(MAGICO) + 8 + len(texto))
+
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as fh:
+        fh.write(MAGICO + struct.pack("<Q", len(texto)) + texto)
+        for item, matriz in zip(descricao, matrizes.values()):
+            fh.seek(inicioDados + item["Deslocamento"])
+            numpy.ascontiguousarray(matriz).tofile(fh)
+        fh.truncate(inicioDados + deslocamento)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(temporario, caminho)
+
+def CarregaEstado(caminho):
+    """
+    Lê um arquivo gravado por GravaEstado, as matrizes são mapeadas em memória (cópia na escrita, o arquivo não é alterado)
+
+    Entrada:
+        caminho: Caminho do arquivo
+
+    Retorno:
+        Dicionário do cabeçalho com as matrizes em "Matrizes" (nome -> matriz)
+    """
+    with open(caminho, 'rb') as fh:
+        if fh.read(len(MAGICO)) != MAGICO:
+            raise ValueError("%s não é um arquivo de estado do treinamento" % caminho)
+        tamanho, = struct.unpack("<Q", fh.read(8))
+        cabecalho = json.loads(fh.read(tamanho))
+
+    if cabecalho["Versao"] != VERSAO_ESTADO:
+        raise ValueError("Versão %d do arquivo de estado não suportada (esperada %d)" % (cabecalho["Versao"], VERSAO_ESTADO))
+
+    inicioDados = _Alinha(len(MAGICO) + 8 + tamanho)
+    matrizes = {}
+    for item in cabecalho["Matrizes"]:
+        forma = tuple(item["Forma"])
+        if 0 in forma: # O mapeamento em memória não aceita tamanho zero
+            matrizes[item["Nome"]] = numpy.zeros(forma, dtype=item["Tipo"])
+        else:
+            matrizes[item["Nome"]] = numpy.memmap(caminho, dtype=item["Tipo"], mode='c', offset=inicioDados + item["Deslocamento"], shape=forma)
+    cabecalho["Matrizes"] = matrizes
+
+    return cabecalho
+
+def IniciaTabelas(inicial, matrizes):
+    """
+    Inicia (warm-start) as matrizes de um método a partir de um treinamento anterior no mesmo ambiente ou em outro com a
+    mesma quantidade de estados. Entre Q-Learning e Double Q-Learning, Q1 e Q2 partem de Q e Q parte da média de Q1 e Q2.
+
+    Entrada:
+        inicial: Caminho do arquivo de estado, estado lido por CarregaEstado ou dicionário nome -> matriz (ex.: tabelas
+                 de TreinamentoCompartilhado)
+        matrizes: Dicionário nome -> matriz do método (Q ou Q1/Q2 e QVisitas), atualizadas no próprio lugar
+    """
+    if isinstance(inicial, (str, os.PathLike)):
+        inicial = CarregaEstado(inicial)
+    origem = inicial["Matrizes"] if "Matrizes" in inicial else inicial
+
+    for nome, matriz in matrizes.items():
+        if nome in origem:
+            valores = origem[nome]
+        elif nome == "Q":
+            valores = (origem["Q1"] + origem["Q2"])/2
+        else:
+            valores = origem["Q"]
+
+        if valores.shape != matriz.shape:
+            raise ValueError("Matriz %s com forma %s, esperada %s" % (nome, valores.shape, matriz.shape))
+        numpy.copyto(matriz, valores, casting='unsafe')
+
+class PontoControle:
+    """
+    Grava o estado do treinamento a cada 'intervalo' épocas e ao final, retomando dele se o arquivo já existir. Com a
+    mesma semente, um treinamento interrompido e retomado produz os mesmos resultados que um sem interrupção.
+
+    Atributos:
+        EpocaInicial: Época em que o treinamento foi retomado (0 se começou do zero)
+    """
+    __slots__ = ("caminho", "intervalo", "retoma", "EpocaInicial", "metodo", "ambiente", "matrizes", "amostrador", "menorRotas")
+
+    def __init__(self, caminho, intervalo = 100, retoma = True):
+        """
+        Entrada:
+            caminho: Caminho do arquivo de estado
+            intervalo: Épocas entre as gravações
+            retoma: Se o treinamento deve ser retomado do arquivo existente
+        """
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.retoma = retoma
+        self.EpocaInicial = 0
+
+    def Inicia(self, metodo, ambiente, matrizes, amostrador, menorRotas):
+        """
+        Associa o estado do método e o restaura do arquivo, se houver
+
+        Entrada:
+            metodo: Nome do método
+            ambiente: Informações sobre o ambiente
+            matrizes: Dicionário nome -> matriz do método, restauradas no próprio lugar
+            amostrador: Gerador de números aleatórios do método
+            menorRotas: Menores rotas (BufferRotas) do método
+
+        Retorno:
+            Quantidade de épocas já executadas e a menor distância (infinita se o treinamento começa do zero)
+        """
+        self.metodo = metodo
+        self.ambiente = ambiente
+        self.matrizes = matrizes
+        self.amostrador = amostrador
+        self.menorRotas = menorRotas
+        self.EpocaInicial = 0
+
+        if not (self.retoma and os.path.exists(self.caminho)):
+            return 0, float('inf')
+
+        estado = CarregaEstado(self.caminho)
+        if estado["Metodo"] != metodo or estado["Instancia"] != ambiente["Nome"]:
+            raise ValueError("O arquivo %s é do método %s na instância %s" % (self.caminho, estado["Metodo"], estado["Instancia"]))
+
+        IniciaTabelas(estado, matrizes)
+        amostrador.Restaura(estado["Gerador"], estado["Matrizes"]["Pendentes"])
+        menorRotas.Refaz(estado["Matrizes"]["Ordem"].tolist(), estado["Matrizes"]["Veiculos"].tolist(), estado["Rotas"], ambiente)
+        self.EpocaInicial = estado["Epocas"]
+
+        return estado["Epocas"], estado["MenorDistancia"]
+
+    def Atualiza(self, epocas, menorDistancia, final = False):
+        """
+        Grava o estado se a quantidade de épocas for múltipla do intervalo ou se for o fim do treinamento
+
+        Entrada:
+            epocas: Quantidade de épocas executadas
+            menorDistancia: Menor distância encontrada até o momento
+            final: Se é a última época do treinamento
+        """
+        if (final or epocas % self.intervalo == 0):
+            self.Grava(epocas, menorDistancia)
+
+    def Grava(self, epocas, menorDistancia):
+        """
+        Entrada:
+            epocas: Quantidade de épocas executadas
+            menorDistancia: Menor distância encontrada até o momento
+        """
+        estadoGerador, pendentes = self.amostrador.Estado()
+        rotas = self.menorRotas
+
+        cabecalho = {"Metodo": self.metodo, "Instancia": self.ambiente["Nome"], "Epocas": epocas, "Rotas": rotas.Quantidade,
+                     "MenorDistancia": menorDistancia, "Gerador": estadoGerador}
+        matrizes = dict(self.matrizes, Pendentes=pendentes, Ordem=numpy.array(rotas.ordem[:rotas.passos], dtype=numpy.int64),
+                        Veiculos=numpy.array(rotas.veiculos[:rotas.passos], dtype=numpy.int64))
+
+        GravaEstado(self.caminho, cabecalho, matrizes)
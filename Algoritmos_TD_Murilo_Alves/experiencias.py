@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Reprodução de experiências (experience replay): as transições de cada passo ficam em uma memória circular de vetores
+pré-alocados e, ao fim de cada episódio, lotes sorteados dessa memória atualizam Q (ou Q1 e Q2) com a atualização TD
+vetorizada. Cada transição é aproveitada em várias atualizações, e o custo da atualização é dividido pelo lote.
+
+Os alvos reproduzidos usam a mesma regra das atualizações online de cada método. No Q-Learning (Métodos 1 e 3), a ação
+futura é a de maior valor na linha do estado ATUAL, entre as ações válidas após a visita, avaliada na linha do próximo
+estado (Q[s', argmax Q[s, válidas]]), como nos métodos. No Double Q-Learning (Métodos 2 e 4), a ação futura é escolhida
+na linha do próximo estado pela matriz atualizada e avaliada pela outra. As reproduções não contam visitas: QVisitas só
+cresce nos passos dos episódios, então a taxa 1/(1 + visitas) de uma reprodução é a da última visita real ao par (s,a).
+
+@author: Murilo Alves
+"""
+
+import numpy
+
+from .nucleo import TaxaAprendizagem
+
+def AtualizaQReproducao(Q, QVisitas, estados, acoes, alvos, pesos, taxa = TaxaAprendizagem):
+    """
+    Atualização TD de um lote reproduzido, sem contar novas visitas. Os erros de pares repetidos no lote são somados
+    (scatter-add) e a média é aplicada com a taxa de aprendizagem das visitas do treinamento.
+
+    Entrada:
+        Q: Matriz Q(s,a) a ser atualizada
+        QVisitas: Matriz de visitas aos pares (s,a)
+        estados, acoes: Vetores com as posições dos estados e das ações
+        alvos: Vetor com os alvos (recompensa mais o valor descontado da ação futura)
+        pesos: Pesos de importância de cada transição (1 sem prioridade)
+        taxa: Taxa de aprendizagem em função das visitas ao par (s,a)
+
+    Retorno:
+        Erro TD de cada transição antes da atualização
+    """
+    pares, inverso, repeticoes = numpy.unique(estados*Q.shape[1] + acoes, return_inverse=True, return_counts=True)
+
+    QPlano = Q.reshape(-1)
+    erros = alvos - QPlano[pares][inverso]
+    QPlano[pares] += taxa(QVisitas.reshape(-1)[pares])*numpy.bincount(inverso, weights=pesos*erros)/repeticoes
+
+    return erros
+
+class BufferExperiencias:
+    """
+    Memória circular das transições (estado, ação, recompensa e ações válidas do próximo estado). O próximo estado é a
+    própria ação. O alvo de cada transição reproduzida segue o método: no Q-Learning, Q(s',a') da ação válida de maior
+    valor em Q(s,·); no Double Q-Learning, a ação válida escolhida em s' por uma matriz e avaliada pela outra. Sem ações
+    válidas, o valor é o do retorno ao depósito com veículos fixos e 0 com veículos dinâmicos, como nos métodos.
+
+    Com prioridade > 0, as transições são sorteadas proporcionalmente a |erro TD|^prioridade (prioritized replay), com
+    os pesos de importância (expoente 'correcao') corrigindo o viés do sorteio. As transições novas entram com a maior
+    prioridade já vista, para serem reproduzidas ao menos uma vez.
+
+    As ações válidas de cada transição são guardadas em bits (numpy.packbits), ceil(N/8) bytes por transição para N
+    estados, e só as do lote são expandidas. A memória ainda cresce com capacidade*N (ex.: 10000 transições de uma
+    instância com 1000 consumidores ocupam cerca de 1,25 MB, contra 10 MB com um booleano por ação). O espaço de ações
+    por candidatos não tem reprodução, então as ações são sempre as N colunas de Q.
+    
+    O buffer é reiniciado no começo de cada treinamento (Inicia).
+    """
+    __slots__ = ("capacidade", "tamanhoLote", "atualizacoes", "prioridade", "correcao", "semente", "gerador",
+                 "estados", "acoes", "recompensas", "mascaras", "quantidadeEstados", "prioridades", "maiorPrioridade",
+                 "Quantidade", "posicao",
+                 "VeiculosDinamicos")
+
+    def __init__(self, capacidade = 10000, tamanhoLote = 64, atualizacoes = 4, prioridade = 0.0, correcao = 0.4, semente = None):
+        """
+        Entrada:
+            capacidade: Quantidade máxima de transições, as mais antigas são substituídas
+            tamanhoLote: Transições por lote reproduzido
+            atualizacoes: Lotes reproduzidos ao fim de cada episódio
+            prioridade: Expoente da prioridade pelo erro TD, 0 para o sorteio uniforme
+            correcao: Expoente dos pesos de importância (somente com prioridade)
+            semente: Semente do sorteio dos lotes
+        """
+        self.capacidade = capacidade
+        self.tamanhoLote = tamanhoLote
+        self.atualizacoes = atualizacoes
+        self.prioridade = prioridade
+        self.correcao = correcao
+        self.semente = semente
+        self.Quantidade = 0
+
+    def Inicia(self, quantidadeEstados, VeiculosDinamicos):
+        """
+        Aloca (ou reinicia) a memória no começo de um treinamento
+
+        Entrada:
+            quantidadeEstados: Quantidade de estados do ambiente
+            VeiculosDinamicos: Se as rotas são criadas sob demanda (valor 0 sem ações válidas)
+        """
+        self.gerador = numpy.random.default_rng(self.semente)
+        self.estados = numpy.zeros(self.capacidade, dtype=numpy.int64)
+        self.acoes = numpy.zeros(self.capacidade, dtype=numpy.int64)
+        self.recompensas = numpy.zeros(self.capacidade)
+        self.mascaras = numpy.zeros((self.capacidade, (quantidadeEstados + 7)//8), dtype=numpy.uint8) # Ações válidas em bits
+        self.quantidadeEstados = quantidadeEstados
+        self.prioridades = numpy.zeros(self.capacidade)
+        self.maiorPrioridade = 1.0
+        self.Quantidade = 0
+        self.posicao = 0
+        self.VeiculosDinamicos = VeiculosDinamicos
+
+    def Adiciona(self, estado, acao, recompensa, acoes):
+        """
+        Guarda uma transição, substituindo a mais antiga com a memória cheia
+
+        Entrada:
+            estado: Posição do estado
+            acao: Posição da ação (próximo estado)
+            recompensa: Recompensa da ação
+            acoes: Valores das ações usados no alvo do método, sendo '-inf' para ações inválidas
+        """
+        posicao = self.posicao
+        self.estados[posicao] = estado
+        self.acoes[posicao] = acao
+        self.recompensas[posicao] = recompensa
+        self.mascaras[posicao] = numpy.packbits(acoes != float('-inf'))
+        self.prioridades[posicao] = self.maiorPrioridade
+
+        self.posicao = (posicao + 1) % self.capacidade
+        self.Quantidade = min(self.Quantidade + 1, self.capacidade)
+
+    def Amostra(self):
+        """
+        Retorno:
+            Posições das transições sorteadas e os seus pesos de importância
+        """
+        if (self.prioridade == 0):
+            return self.gerador.integers(0, self.Quantidade, self.tamanhoLote), numpy.ones(self.tamanhoLote)
+
+        acumuladas = numpy.cumsum(self.prioridades[:self.Quantidade])
+        indices = numpy.searchsorted(acumuladas, self.gerador.random(self.tamanhoLote)*acumuladas[-1], side='right')
+        indices = numpy.minimum(indices, self.Quantidade - 1)
+        pesos = (self.Quantidade*self.prioridades[indices]/acumuladas[-1])**(-self.correcao)
+
+        return indices, pesos/pesos.max()
+
+    def Alvos(self, indices, taxaDesconto, escolha, avaliacao, linhaAtual = False):
+        """
+        Entrada:
+            indices: Posições das transições
+            taxaDesconto: Taxa de desconto
+            escolha: Matriz que escolhe a ação futura
+            avaliacao: Matriz que avalia a ação futura (a mesma de 'escolha' no Q-Learning)
+            linhaAtual: Se a ação futura é escolhida na linha do estado atual (Q-Learning), e não na do próximo
+
+        Retorno:
+            Alvos das transições
+        """
+        proximos = self.acoes[indices]
+        mascaras = numpy.unpackbits(self.mascaras[indices], axis=1, count=self.quantidadeEstados).view(bool)
+        linhas = escolha[self.estados[indices]] if linhaAtual else escolha[proximos]
+        futuras = numpy.argmax(numpy.where(mascaras, linhas, float('-inf')), axis=1)
+        vazias = ~mascaras.any(axis=1)
+        futuras[vazias] = 0 # Sem ações válidas, o retorno ao depósito
+        valores = avaliacao[proximos, futuras]
+        if (self.VeiculosDinamicos):
+            valores[vazias] = 0.0
+
+        return self.recompensas[indices] + taxaDesconto*valores
+
+    def Reproduz(self, taxaDesconto, QVisitas, Q, Q2 = None, taxa = TaxaAprendizagem):
+        """
+        Reproduz 'atualizacoes' lotes ao fim de um episódio, quando a memória tem ao menos um lote
+
+        Entrada:
+            taxaDesconto: Taxa de desconto
+            QVisitas: Matriz de visitas aos pares (s,a)
+            Q: Matriz Q(s,a), ou Q1 no Double Q-Learning
+            Q2: Matriz Q2 no Double Q-Learning, None no Q-Learning
+            taxa: Taxa de aprendizagem em função das visitas ao par (s,a)
+        """
+        if (self.Quantidade < self.tamanhoLote):
+            return
+
+        for _ in range(self.atualizacoes):
+            indices, pesos = self.Amostra()
+            erros = numpy.empty(len(indices))
+
+            if (Q2 is None):
+                alvos = self.Alvos(indices, taxaDesconto, Q, Q, linhaAtual=True)
+                erros[:] = AtualizaQReproducao(Q, QVisitas, self.estados[indices], self.acoes[indices], alvos, pesos, taxa)
+            else: # Cada transição atualiza Q1 ou Q2, sorteada como nos métodos
+                primeira = self.gerador.random(len(indices)) < 0.5
+                for parte, atualizada, outra in ((primeira, Q, Q2), (~primeira, Q2, Q)):
+                    if (parte.any()):
+                        alvos = self.Alvos(indices[parte], taxaDesconto, atualizada, outra)
+                        erros[parte] = AtualizaQReproducao(atualizada, QVisitas, self.estados[indices[parte]], self.acoes[indices[parte]],
+                                                           alvos, pesos[parte], taxa)
+
+            if (self.prioridade != 0):
+                self.prioridades[indices] = (numpy.abs(erros) + 1e-6)**self.prioridade
+                self.maiorPrioridade = max(self.maiorPrioridade, float(self.prioridades[indices].max()))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Execução em paralelo dos experimentos e exibição dos resultados
+
+@author: Murilo Alves
+"""
+
+import statistics
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from .metodos import Metodos
+
+def SementeTarefa(sementeBase, nome, opcao, repeticao):
+    """
+    Semente determinística de uma execução independente, a mesma para todas as taxas de desconto
+    
+    Entrada:
+        sementeBase: Semente do experimento
+        nome: Nome da instância
+        opcao: Opção do algoritmo
+        repeticao: Número da repetição
+        
+    Retorno:
+        Semente inteira da execução
+    """
+    sequencia = numpy.random.SeedSequence(sementeBase, spawn_key=(zlib.crc32(nome.encode()), opcao, repeticao))
+    
+    return int(sequencia.generate_state(1, numpy.uint64)[0])
+
+# Ambientes enviados uma única vez para cada processo do executor
+_ambientesProcesso = {}
+_coletorProcesso = None
+_paradaProcesso = None
+
+def _IniciaProcesso(ambientes, coletor, parada = None):
+    global _ambientesProcesso, _coletorProcesso, _paradaProcesso
+    _ambientesProcesso = ambientes
+    _coletorProcesso = coletor
+    _paradaProcesso = parada
+
+def ExecutaTarefa(tarefa):
+    """
+    Executa uma tarefa (instância, opção, taxa de desconto, semente) em um processo do executor
+    
+    Entrada:
+        tarefa: Tupla (nome da instância, opção do algoritmo, taxa de desconto, semente)
+        
+    Retorno:
+        Dicionário com a tarefa, a menor distância, as menores rotas, os resultados por época, o tempo de execução e,
+        com critérios de parada, o motivo da parada e as épocas executadas
+    """
+    nome, opcao, taxaDesconto, semente = tarefa
+    
+    inicio = time.perf_counter()
+    resultados = _coletorProcesso() if _coletorProcesso is not None else None
+    if (hasattr(resultados, "Tarefa")): # Coletor com um destino por execução (ex.: RegistroBinario)
+        resultados.Tarefa(tarefa)
+    parada = _paradaProcesso() if _paradaProcesso is not None else None
+    menorDistancia, menorRotas, resultados = Metodos()[opcao](_ambientesProcesso[nome], taxaDesconto, semente=semente, resultados=resultados, parada=parada)
+    tempo = time.perf_counter() - inicio
+    
+    execucao = {"Tarefa": tarefa, "MenorDistancia": menorDistancia, "MenorRotas": menorRotas, "Resultados": resultados, "Tempo": tempo}
+    if (parada is not None):
+        execucao["Motivo"] = parada.Motivo
+        execucao["Epocas"] = parada.Epocas
+    
+    return execucao
+
+def ExecutaExperimento(ambientes, opcoes, descontos = (0.1, 0.01), repeticoes = 10, processos = None, sementeBase = 0, coletor = None, parada = None):
+    """
+    Executa em paralelo (um processo por núcleo) as execuções independentes de cada instância, opção, taxa de desconto e repetição
+    
+    Entrada:
+        ambientes: Lista com as informações dos ambientes
+        opcoes: Lista de opções de algoritmo
+        descontos: Taxas de desconto
+        repeticoes: Quantidade de execuções independentes por configuração
+        processos: Quantidade de processos, None para a quantidade de núcleos
+        sementeBase: Semente do experimento
+        coletor: Classe (ou função sem argumentos) que cria o coletor dos resultados de cada execução, ex.: EstatisticasOnline
+                 ou functools.partial(RegistroBinario, caminho), None para a lista completa. O coletor volta do processo
+                 serializado (pickle). Um coletor com o método Tarefa recebe a tarefa antes da execução: o
+                 RegistroBinario grava cada execução em um arquivo próprio (caminho com a instância, o método, a taxa
+                 de desconto e a semente), pois um único arquivo para todas misturaria as séries sem separação.
+        parada: Classe (ou função sem argumentos) que cria os critérios de parada de cada execução, ex.:
+                functools.partial(CriterioParada, tempoMaximo=5), None para executar todas as épocas
+        
+    Retorno:
+        Dicionário (nome, opção, taxa de desconto) -> lista de execuções na ordem das repetições
+    """
+    ambientesPorNome = {ambiente["Nome"]: ambiente for ambiente in ambientes}
+    
+    # Instâncias maiores primeiro para equilibrar a carga entre os processos
+    tarefas = []
+    for ambiente in sorted(ambientes, key=lambda ambiente: len(ambiente["Estados"]), reverse=True):
+        for opcao in opcoes:
+            for desconto in descontos:
+                for repeticao in range(repeticoes):
+                    tarefas.append((ambiente["Nome"], opcao, desconto, SementeTarefa(sementeBase, ambiente["Nome"], opcao, repeticao)))
+    
+    execucoes = {}
+    with ProcessPoolExecutor(max_workers=processos, initializer=_IniciaProcesso, initargs=(ambientesPorNome, coletor, parada)) as executor:
+        for execucao in executor.map(ExecutaTarefa, tarefas):
+            nome, opcao, desconto, _ = execucao["Tarefa"]
+            execucoes.setdefault((nome, opcao, desconto), []).append(execucao)
+    
+    return execucoes
+
+def ExibeResultados(opcao, ambiente, execucoes = None, processos = None):
+    if opcao == 0:
+        algoritmo = "Método 1 \n"
+    elif opcao == 1:
+        algoritmo = "Método 2 \n"
+    elif opcao == 2:
+        algoritmo = "Método 3 \n"
+    elif opcao == 3:
+        algoritmo = "Método 4 \n"
+    else:
+       print("Escolha inválida de algoritmo!")
+       return False
+   
+    print(algoritmo)
+    
+    # Execuções independentes em paralelo, caso não tenham sido feitas para todo o experimento
+    if execucoes is None:
+        execucoes = ExecutaExperimento([ambiente], [opcao], processos=processos)
+    
+    # Taxas de desconto executadas para a instância e a opção
+    descontos = sorted({desconto for nome, opcaoExecucao, desconto in execucoes if nome == ambiente["Nome"] and opcaoExecucao == opcao}, reverse=True)
+    
+    for Desconto in descontos: # Taxa de desconto
+        print("Taxa de Desconto: ", Desconto)
+        valores = []
+        custoComputacional = []
+        motivos = {}
+        for execucao in execucoes[(ambiente["Nome"], opcao, Desconto)]:
+            if ("Motivo" in execucao):
+                motivos[execucao["Motivo"]] = motivos.get(execucao["Motivo"], 0) + 1
+            valores.append(execucao["MenorDistancia"])
+            custoComputacional.append(execucao["Tempo"])
+            #Rotas escolhidas
+            #for i in range(len(execucao["MenorRotas"])):
+            #    print("R"+ str(i) + "  ", execucao["MenorRotas"][i])
+            #GraficoCustoEpisodio(execucao["Resultados"], algoritmo)
+            #GraficoRotas(execucao["MenorRotas"], execucao["MenorDistancia"], algoritmo, ambiente)
+        
+        media = statistics.mean(valores)
+        if (media == float('inf')): # O desvio padrão não é definido com valores infinitos
+            print("Inválido", " Custo Computacional: ", round(statistics.mean(custoComputacional), 2))
+        else:
+            desvio = statistics.pstdev(valores)
+            print("Distância: ", round(media), " Desvio: ", round(desvio), " Custo Computacional: ", round(statistics.mean(custoComputacional), 2))
+        
+        # Motivos da parada antecipada, caso haja critérios de parada
+        if (motivos):
+            epocas = statistics.mean(execucao["Epocas"] for execucao in execucoes[(ambiente["Nome"], opcao, Desconto)])
+            print("Épocas: ", round(epocas), " Parada: ", ", ".join("%s (%d)" % (motivo, quantidade) for motivo, quantidade in motivos.items()))
+    
+    return True
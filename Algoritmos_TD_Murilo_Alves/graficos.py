@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Gráficos dos resultados
+
+O matplotlib é opcional (pip install matplotlib) e só é importado quando um gráfico é gerado
+
+@author: Murilo Alves
+"""
+
+from .resultados import EstatisticasOnline, VetorResultados
+
+def Pyplot():
+    """
+    Importa o matplotlib.pyplot no primeiro uso
+
+    Retorno:
+        Módulo matplotlib.pyplot
+    """
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError as erro:
+        raise ImportError("Os gráficos precisam do matplotlib: pip install matplotlib") from erro
+
+    return plt
+
+def GraficoCustoEpisodio(resultados, algoritmo):
+    plt = Pyplot()
+    if isinstance(resultados, EstatisticasOnline): # Série amostrada
+        plt.plot(resultados.EpocasSerie(), resultados.Serie)
+    elif isinstance(resultados, VetorResultados):
+        plt.plot(resultados.Valores)
+    else:
+        plt.plot(resultados)
+    plt.xlabel(algoritmo)
+    plt.title("Custos por episódios")
+    plt.show()
+    
+def GraficoRotas(menorRotas, menorDistancia, algoritmo, ambiente):
+    plt = Pyplot()
+    cor = ['blue', 'red', 'orange', 'green', 'purple', 'cyan', 'pink', 'lightgreen', 'crimson','navy']
+    
+    for i in range(len(menorRotas)):
+        x = []
+        y = []
+        for j in range(len(menorRotas[i]["Consumidores"])):
+            valor = menorRotas[i]["Consumidores"][j]
+            x.append(ambiente["Estados"][valor]["CoordX"])
+            y.append(ambiente["Estados"][valor]["CoordY"])
+        plt.plot(x, y, cor[i], label="R"+str(i))
+    
+    plt.title("Rotas geradas com distância total de " + str(round(menorDistancia)))
+    plt.xlabel(algoritmo)
+    plt.legend(loc='upper left')
+    plt.rcParams['figure.figsize'] = (1,7)
+    plt.show()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Inferência: rotas geradas por uma passada gulosa sobre uma matriz Q(s,a) treinada, sem exploração nem atualizações
+
+@author: Murilo Alves
+"""
+
+import os
+
+import numpy
+
+from .ambiente import AmbienteCenario
+from .candidatos import RotasGulosasCandidatos
+from .continuacao import CarregaEstado
+from .metodos import RotasDaSequencia, RotasDinamicasDaSequencia
+from .nucleo import BufferRotas, DespachoMenorDemanda, Episodio, MaxQ, ValidaAcoes
+
+def TabelaQ(origem):
+    """
+    Matriz Q(s,a) usada pela política gulosa
+
+    Entrada:
+        origem: Matriz Q, caminho de um arquivo de estado (PontoControle) ou estado lido por CarregaEstado
+
+    Retorno:
+        Matriz Q(s,a), Q1 + Q2 para os métodos Double Q-Learning (mesma escolha de ação do treinamento)
+    """
+    if isinstance(origem, (str, os.PathLike)):
+        origem = CarregaEstado(origem)
+    if isinstance(origem, dict):
+        matrizes = origem["Matrizes"]
+        return matrizes["Q"] if "Q" in matrizes else matrizes["Q1"] + matrizes["Q2"]
+
+    return origem
+
+def RotasGulosas(Q, ambiente, VeiculosDinamicos = False, despacho = None):
+    """
+    Gera as rotas escolhendo sempre a ação válida de maior valor, com a mesma seleção de veículo e as mesmas ações
+    válidas do treinamento com veículos fixos ou dinâmicos
+
+    Entrada:
+        Q: Matriz Q(s,a) treinada (ver TabelaQ), ou de candidatos (estados x (k + 1)) treinada com 'candidatos'
+        ambiente: Informações sobre o ambiente
+        VeiculosDinamicos: Se as rotas são criadas sob demanda (Métodos 3 e 4) ou fixas (Métodos 1 e 2)
+        despacho: Seleção do veículo com veículos fixos, a mesma do treinamento (padrão: DespachoMenorDemanda)
+
+    Retorno:
+        Distância total (infinita se inválida) e rotas no mesmo formato de CriaRotas
+    """
+    quantidadeEstados = len(ambiente["Demandas"])
+    if (Q.shape[1] != quantidadeEstados):
+        return RotasGulosasCandidatos(Q, ambiente, VeiculosDinamicos, despacho)
+
+    episodio = Episodio(ambiente, VeiculosDinamicos)
+
+    if not VeiculosDinamicos:
+        rotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+        rotas.Reinicia(ambiente["Veiculos"])
+        despacho = DespachoMenorDemanda() if despacho is None else despacho
+        despacho.Reinicia(rotas)
+
+        while (episodio.Restantes != 0):
+            veiculo = despacho.Escolhe(rotas)
+            acao = MaxQ(ValidaAcoes(Q[rotas.Ultimo[veiculo]], episodio))
+            rotas.Atualiza(veiculo, acao, ambiente)
+            despacho.Atualiza(rotas, veiculo)
+            episodio.Visita(acao)
+
+        # Retorno ao depósito
+        for veiculo in range(rotas.Quantidade):
+            rotas.Atualiza(veiculo, 0, ambiente)
+    else:
+        rotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+        rotas.Reinicia(1)
+        veiculo = 0
+        estado = 0
+
+        while (episodio.Restantes != 0):
+            acao = MaxQ(ValidaAcoes(Q[estado], episodio))
+            rotas.Atualiza(veiculo, acao, ambiente)
+            episodio.Visita(acao)
+
+            # Continua ou cria uma nova rota
+            if (acao != 0):
+                episodio.AbreDeposito()
+                episodio.AdicionaDemanda(ambiente["Demandas"][acao])
+            elif (episodio.Restantes != 0):
+                episodio.NovaRota()
+                veiculo = rotas.NovaRota()
+
+            estado = acao
+
+    return rotas.Distancia(ambiente), rotas.ParaLista(ambiente)
+
+def RotasGulosasCenarios(Q, ambiente, demandas, VeiculosDinamicos = False, comRotas = True):
+    """
+    Versão vetorizada de RotasGulosas para vários cenários de demanda sobre os mesmos pontos, todos os cenários
+    avançam juntos a cada passo. Com veículos fixos a seleção do veículo é a da menor demanda (DespachoMenorDemanda). Cada cenário produz as mesmas rotas de RotasGulosas com AmbienteCenario.
+
+    Entrada:
+        Q: Matriz Q(s,a) treinada (ver TabelaQ)
+        ambiente: Informações sobre o ambiente (distâncias, capacidade e veículos)
+        demandas: Matriz cenários x estados com as demandas (depósito na posição 0)
+        VeiculosDinamicos: Se as rotas são criadas sob demanda (Métodos 3 e 4) ou fixas (Métodos 1 e 2)
+        comRotas: Se as rotas de cada cenário devem ser montadas, None no lugar delas caso contrário
+
+    Retorno:
+        Vetor com a distância total de cada cenário (infinita se inválida) e lista com as rotas de cada cenário
+    """
+    demandas = numpy.atleast_2d(numpy.asarray(demandas))
+    quantidadeCenarios, quantidadeEstados = demandas.shape
+    if (Q.shape[1] != quantidadeEstados):
+        raise ValueError("RotasGulosasCenarios requer a matriz Q completa (estados x estados), use RotasGulosas com candidatos")
+    distancias = ambiente["Distancias"]
+    capacidade = ambiente["Capacidade"]
+    veiculos = ambiente["Veiculos"]
+    cenarios = numpy.arange(quantidadeCenarios)
+
+    abertos = numpy.ones((quantidadeCenarios, quantidadeEstados), dtype=bool)
+    abertos[:, 0] = False
+    total = numpy.zeros(quantidadeCenarios)
+
+    if not VeiculosDinamicos:
+        cargas = numpy.zeros((quantidadeCenarios, veiculos), dtype=demandas.dtype)
+        custos = numpy.zeros((quantidadeCenarios, veiculos))
+        ultimos = numpy.zeros((quantidadeCenarios, veiculos), dtype=numpy.int64)
+        ordem = numpy.zeros((quantidadeCenarios, quantidadeEstados - 1), dtype=numpy.int64)
+        ordemVeiculos = numpy.zeros((quantidadeCenarios, quantidadeEstados - 1), dtype=numpy.int64)
+
+        for passo in range(quantidadeEstados - 1):
+            # Rota com a menor demanda e a ação válida de maior valor a partir do seu último estado
+            veiculo = numpy.argmin(cargas, axis=1)
+            estado = ultimos[cenarios, veiculo]
+            acao = numpy.argmax(numpy.where(abertos, Q[estado], float('-inf')), axis=1)
+
+            custos[cenarios, veiculo] += distancias[estado, acao]
+            cargas[cenarios, veiculo] += demandas[cenarios, acao]
+            ultimos[cenarios, veiculo] = acao
+            abertos[cenarios, acao] = False
+            ordem[:, passo] = acao
+            ordemVeiculos[:, passo] = veiculo
+
+        # Retorno ao depósito e distância total, somando as rotas na mesma ordem de RotasGulosas
+        custos += distancias[ultimos, 0]
+        for veiculo in range(veiculos):
+            total += custos[:, veiculo]
+        total[(cargas > capacidade).any(axis=1)] = float('inf')
+    else:
+        estados = numpy.zeros(quantidadeCenarios, dtype=numpy.int64)
+        cargas = numpy.zeros(quantidadeCenarios, dtype=demandas.dtype)
+        custoRota = numpy.zeros(quantidadeCenarios)
+        quantidadeRotas = numpy.ones(quantidadeCenarios, dtype=numpy.int64)
+        sequencias = numpy.zeros((quantidadeCenarios, 2*quantidadeEstados), dtype=numpy.int64)
+        passos = numpy.zeros(quantidadeCenarios, dtype=numpy.int64)
+        ativos = cenarios
+
+        while (len(ativos) != 0):
+            estado = estados[ativos]
+
+            # Ações válidas: não visitadas e viáveis pela capacidade
+            mascara = abertos[ativos] & (cargas[ativos, numpy.newaxis] + demandas[ativos] <= capacidade)
+            acao = numpy.argmax(numpy.where(mascara, Q[estado], float('-inf')), axis=1)
+
+            custoRota[ativos] += distancias[estado, acao]
+            sequencias[ativos, passos[ativos]] = acao
+            passos[ativos] += 1
+            abertos[ativos, acao] = False
+
+            # Continua ou encerra a rota (o custo da rota é somado ao total no retorno ao depósito)
+            continua = acao != 0
+            abertos[ativos[continua], 0] = True
+            cargas[ativos] = numpy.where(continua, cargas[ativos] + demandas[ativos, acao], 0)
+            encerradas = ativos[~continua]
+            total[encerradas] += custoRota[encerradas]
+            custoRota[encerradas] = 0.0
+            estados[ativos] = acao
+
+            ativos = ativos[abertos[ativos].any(axis=1)]
+            quantidadeRotas[ativos] += (estados[ativos] == 0)
+
+        total[quantidadeRotas > veiculos] = float('inf')
+
+    if not comRotas:
+        return total, None
+
+    rotas = []
+    for cenario in range(quantidadeCenarios):
+        ambienteCenario = AmbienteCenario(ambiente, demandas[cenario])
+        if not VeiculosDinamicos:
+            rotas.append(RotasDaSequencia(ordem[cenario], ordemVeiculos[cenario], veiculos, ambienteCenario))
+        else:
+            rotas.append(RotasDinamicasDaSequencia(sequencias[cenario, :passos[cenario]].tolist(), ambienteCenario))
+
+    return total, rotas
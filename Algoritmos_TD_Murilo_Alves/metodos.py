@@ -0,0 +1,1005 @@
+# -*- coding: utf-8 -*-
+"""
+Métodos de aprendizagem por reforço (Q-Learning e Double Q-Learning com veículos fixos e dinâmicos)
+
+@author: Murilo Alves
+"""
+
+import warnings
+
+import numpy
+
+from .buscalocal import PolimentoRotas
+from .candidatos import Q_Learning_Candidatos
+from .continuacao import IniciaTabelas
+from .nucleo import (AtualizaQ, AtualizaRota, Amostrador, BufferRotas, CriaMatriz, CriaRotas, DespachoMenorDemanda, Episodio,
+                     EpsilonEpoca, MaxQ, MaxQDouble, PodaEpisodio, Politica, Recompensa, RetornoDeposito, RetornoDepositoDouble,
+                     TaxaAprendizagem, ValidaAcoes)
+
+def _EpocasVeiculosFixos(Q, QVisitas, distancias, demandas, capacidade, quantidadeVeiculos, taxaDesconto, epsilon, epocas, uniformes, custos, menorOrdem, menorVeiculos):
+    """
+    Núcleo de épocas do Q-Learning com veículos fixos sobre vetores, com a mesma semântica do Método 1 (compilável pelo Numba).
+    
+    Entrada:
+        Q, QVisitas: Matrizes Q(s,a) e de visitas, atualizadas no próprio lugar
+        distancias: Matriz de distâncias
+        demandas: Vetor de demandas
+        capacidade: Capacidade máxima do veículo
+        quantidadeVeiculos: Quantidade de veículos (K)
+        taxaDesconto, epsilon: Parâmetros do algoritmo
+        epocas: Quantidade de épocas do bloco
+        uniformes: Números uniformes em [0, 1) consumidos na mesma ordem da política
+        custos: Vetor (epocas) preenchido com a distância total de cada época
+        menorOrdem, menorVeiculos: Vetores (consumidores) preenchidos com a sequência de visitas e o veículo de cada visita da menor época
+        
+    Retorno:
+        Quantidade de números uniformes consumidos e menor distância total do bloco
+    """
+    quantidadeEstados = Q.shape[0]
+    consumidores = quantidadeEstados - 1
+    usados = 0
+    menorDistancia = numpy.inf
+    
+    mascara = numpy.zeros(quantidadeEstados, dtype=numpy.bool_)
+    indices = numpy.zeros(consumidores, dtype=numpy.int64)
+    posicao = numpy.zeros(quantidadeEstados, dtype=numpy.int64)
+    cargas = numpy.zeros(quantidadeVeiculos, dtype=numpy.int64)
+    custosRota = numpy.zeros(quantidadeVeiculos, dtype=numpy.float64)
+    ultimos = numpy.zeros(quantidadeVeiculos, dtype=numpy.int64)
+    ordem = numpy.zeros(consumidores, dtype=numpy.int64)
+    veiculos = numpy.zeros(consumidores, dtype=numpy.int64)
+    
+    for i in range(epocas):
+        # Estados abertos (consumidores) e a lista compacta das ações válidas
+        for j in range(1, quantidadeEstados):
+            mascara[j] = True
+            indices[j - 1] = j
+            posicao[j] = j - 1
+        mascara[0] = False
+        validas = consumidores
+        
+        cargas[:] = 0
+        custosRota[:] = 0.0
+        ultimos[:] = 0
+        
+        for passo in range(consumidores):
+            # Escolhe um veiculo (menor demanda, primeiro em caso de empate)
+            veiculo = 0
+            for k in range(1, quantidadeVeiculos):
+                if cargas[k] < cargas[veiculo]:
+                    veiculo = k
+            estado = ultimos[veiculo]
+            
+            # Escolhe uma ação
+            u = uniformes[usados]
+            usados += 1
+            if u > epsilon: # Aleatoriedade
+                acao = indices[int(uniformes[usados]*validas)]
+                usados += 1
+            else: # Maior valor
+                acao = -1
+                for j in range(quantidadeEstados):
+                    if mascara[j] and (acao == -1 or Q[estado, j] > Q[estado, acao]):
+                        acao = j
+            
+            # Atualiza a rota
+            distancia = distancias[estado, acao]
+            custosRota[veiculo] += distancia
+            cargas[veiculo] += demandas[acao]
+            ultimos[veiculo] = acao
+            ordem[passo] = acao
+            veiculos[passo] = veiculo
+            
+            # Marca a ação para não ser escolhida de novo
+            mascara[acao] = False
+            validas -= 1
+            ultimo = indices[validas]
+            indices[posicao[acao]] = ultimo
+            posicao[ultimo] = posicao[acao]
+            
+            QVisitas[estado, acao] += 1
+            recompensa = - distancia/(capacidade - demandas[acao])
+            
+            # Valor da possível próxima ação
+            if validas == 0: # Se a próxima ação é o depósito
+                valorAcaoFutura = Q[acao, 0]
+            else:
+                melhor = -1
+                for j in range(quantidadeEstados):
+                    if mascara[j] and (melhor == -1 or Q[estado, j] > Q[estado, melhor]):
+                        melhor = j
+                valorAcaoFutura = Q[acao, melhor]
+            
+            Q[estado, acao] += (1/(1 + QVisitas[estado, acao]))*(recompensa + taxaDesconto*valorAcaoFutura - Q[estado, acao])
+        
+        # Retorno ao depósito e cálculo da distância total, na mesma ordem de soma do Método 1
+        distanciaTotal = 0.0
+        for veiculo in range(quantidadeVeiculos):
+            estado = ultimos[veiculo]
+            distancia = distancias[estado, 0]
+            custosRota[veiculo] += distancia
+            
+            QVisitas[estado, 0] += 1
+            recompensa = - distancia/(capacidade - demandas[0])
+            Q[estado, 0] += (1/(1 + QVisitas[estado, 0]))*(recompensa - Q[estado, 0])
+            
+            if cargas[veiculo] > capacidade:
+                distanciaTotal = numpy.inf # inválido
+            
+            distanciaTotal = distanciaTotal + custosRota[veiculo]
+        
+        custos[i] = distanciaTotal
+        if (i == 0 or distanciaTotal < menorDistancia):
+            menorDistancia = distanciaTotal
+            menorOrdem[:] = ordem
+            menorVeiculos[:] = veiculos
+    
+    return usados, menorDistancia
+
+# Núcleo compilado pelo Numba, criado no primeiro uso para não importar o Numba junto com o módulo
+_EpocasVeiculosFixosCompilado = False
+
+def NucleoCompilado():
+    """
+    Núcleo de épocas do Método 1 compilado pelo Numba
+
+    Retorno:
+        Função compilada, None se o Numba não estiver instalado
+    """
+    global _EpocasVeiculosFixosCompilado
+    if _EpocasVeiculosFixosCompilado is False:
+        try:
+            from numba import njit
+        except ImportError: # Numba é opcional, sem ele o núcleo compilado usa a implementação em Python puro
+            njit = None
+        _EpocasVeiculosFixosCompilado = njit(cache=True)(_EpocasVeiculosFixos) if njit is not None else None
+
+    return _EpocasVeiculosFixosCompilado
+
+def RotasDaSequencia(ordem, veiculos, quantidadeVeiculos, ambiente):
+    """
+    Reconstrói as rotas a partir da sequência de visitas e do veículo de cada visita, incluindo o retorno ao depósito
+    
+    Entrada:
+        ordem: Sequência de consumidores visitados
+        veiculos: Veículo de cada visita
+        quantidadeVeiculos: Quantidades de veículos do ambiente
+        ambiente: Informações sobre o ambiente
+        
+    Retorno:
+        Lista de rotas no mesmo formato de CriaRotas
+    """
+    rotas = CriaRotas(quantidadeVeiculos)
+    
+    for acao, veiculo in zip(ordem.tolist(), veiculos.tolist()):
+        AtualizaRota(rotas[veiculo], rotas[veiculo]["Consumidores"][-1], acao, ambiente)
+    
+    for rota in rotas:
+        AtualizaRota(rota, rota["Consumidores"][-1], 0, ambiente)
+    
+    return rotas
+
+def EpocasCompiladasVeiculosFixos(ambiente, Q, QVisitas, taxaDesconto, epsilon, epocas, amostrador, resultados, tamanhoBloco = 256, parada = None, polimento = None):
+    """
+    Executa as épocas do Método 1 em blocos no núcleo compilado, consumindo os números aleatórios na mesma ordem
+    da implementação em Python (mesma semente, mesmos resultados).
+    
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        Q, QVisitas: Matrizes Q(s,a) e de visitas
+        taxaDesconto, epsilon, epocas: Parâmetros do algoritmo
+        amostrador: Gerador de números aleatórios
+        resultados: Lista ou coletor (append/extend) da distância de cada época
+        tamanhoBloco: Quantidade de épocas por chamada do núcleo
+        parada: Critérios de parada antecipada (CriterioParada), avaliados ao fim de cada bloco
+        polimento: Busca local sobre as menores rotas ao final (PolimentoRotas), None para desabilitar
+        
+    Retorno:
+        Menor distância, menores rotas e a distância de cada época
+    """
+    nucleoCompilado = NucleoCompilado()
+    consumidores = len(ambiente["Demandas"]) - 1
+    menorOrdem = numpy.zeros(consumidores, dtype=numpy.int64)
+    menorVeiculos = numpy.zeros(consumidores, dtype=numpy.int64)
+    ordemBloco = numpy.zeros(consumidores, dtype=numpy.int64)
+    veiculosBloco = numpy.zeros(consumidores, dtype=numpy.int64)
+    menorDistancia = float('inf')
+    guardada = False # Se já há uma sequência guardada (a primeira época é guardada mesmo inválida, como em Python)
+    
+    for inicio in range(0, epocas, tamanhoBloco):
+        epocasBloco = min(tamanhoBloco, epocas - inicio)
+        custos = numpy.zeros(epocasBloco)
+        
+        # No máximo dois números por passo (decisão e sorteio da ação)
+        uniformes = amostrador.Proximos(2*consumidores*epocasBloco)
+        usados, menorBloco = nucleoCompilado(Q, QVisitas, ambiente["Distancias"], ambiente["Demandas"], ambiente["Capacidade"], ambiente["Veiculos"],
+                                               taxaDesconto, epsilon, epocasBloco, uniformes, custos, ordemBloco, veiculosBloco)
+        amostrador.Devolve(uniformes[usados:])
+        
+        resultados.extend(custos.tolist())
+        if (not guardada or menorBloco < menorDistancia):
+            menorDistancia = menorBloco
+            menorOrdem[:] = ordemBloco
+            menorVeiculos[:] = veiculosBloco
+            guardada = True
+        
+        if (parada is not None and parada.Para(inicio + epocasBloco, menorDistancia)):
+            break
+    
+    # Sem épocas, sem rotas (como em Python)
+    if (not guardada):
+        return menorDistancia, [], resultados
+    
+    menorRotas = RotasDaSequencia(menorOrdem, menorVeiculos, ambiente["Veiculos"], ambiente)
+    if (polimento is not None):
+        menorDistancia, menorRotas = polimento.Final(menorRotas)
+    
+    return menorDistancia, menorRotas, resultados
+
+# Método 1
+def Q_Learning_VeiculosFixos(ambiente, taxaDesconto = 0.1, epsilon = 0.9, epocas = 1000, semente = None, resultados = None, compilado = False, parada = None, inicial = None, controle = None, buscaLocal = False, candidatos = None, taxaAprendizagem = TaxaAprendizagem, despacho = None, experiencias = None, poda = None):
+    # Fator da poda de episódios: menor que 1 interromperia episódios melhores que a menor distância
+    if (poda is not None and poda < 1):
+        raise ValueError("O fator da poda de episódios deve ser >= 1 (float('inf') para interromper somente os episódios inválidos)")
+    
+    # Opções não suportadas pelo núcleo compilado, recusadas antes de qualquer estado ser alterado (retomada, parada, ...)
+    if (compilado):
+        if (candidatos is not None):
+            raise ValueError("O espaço de ações por candidatos não é suportado pelo núcleo compilado")
+        if (controle is not None):
+            raise ValueError("A retomada do treinamento não é suportada pelo núcleo compilado")
+        if (callable(epsilon) or taxaAprendizagem is not TaxaAprendizagem):
+            raise ValueError("O núcleo compilado usa epsilon constante e a taxa de aprendizagem 1/(1 + visitas)")
+        if (despacho is not None and type(despacho) is not DespachoMenorDemanda):
+            raise ValueError("O núcleo compilado usa a seleção da rota com a menor demanda (DespachoMenorDemanda)")
+        if (experiencias is not None):
+            raise ValueError("A reprodução de experiências não é suportada pelo núcleo compilado")
+        if (poda is not None):
+            raise ValueError("A poda de episódios não é suportada pelo núcleo compilado")
+    
+    # Ações restritas aos k vizinhos mais próximos (opcional)
+    if (candidatos is not None):
+        if (experiencias is not None):
+            raise ValueError("A reprodução de experiências não é suportada pelo espaço de ações por candidatos")
+        if (poda is not None):
+            raise ValueError("A poda de episódios não é suportada pelo espaço de ações por candidatos")
+        return Q_Learning_Candidatos(ambiente, taxaDesconto, epsilon, epocas, semente, resultados, candidatos, False, parada, inicial, controle, buscaLocal, taxaAprendizagem, despacho)
+
+    # Quantidade de estados do ambiente
+    quantidadeEstados = len(ambiente["Estados"])
+    
+    # Matriz Q(s,a)
+    Q = CriaMatriz(quantidadeEstados)
+    QVisitas = CriaMatriz(quantidadeEstados, numpy.int32)
+    
+    # Gerador de números aleatórios
+    amostrador = Amostrador(semente)
+    
+    # Rotas do episódio e menores rotas, reutilizadas a cada época
+    rotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+    menorRotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+    
+    # Seleção do veículo de cada passo (rota com a menor demanda, ou outro despacho)
+    if (despacho is None):
+        despacho = DespachoMenorDemanda()
+    
+    #Armazenar os resultados (lista ou coletor com append/extend)
+    if (resultados is None):
+        resultados = []
+    
+    # Busca local sobre as menores rotas (opcional)
+    polimento = PolimentoRotas(ambiente) if buscaLocal else None
+    
+    # Reprodução de experiências (opcional)
+    if (experiencias is not None):
+        experiencias.Inicia(quantidadeEstados, False)
+    
+    # Tabelas iniciais de um treinamento anterior (warm-start, opcional)
+    matrizes = {"Q": Q, "QVisitas": QVisitas}
+    if (inicial is not None):
+        IniciaTabelas(inicial, matrizes)
+    
+    # Retomada e gravação periódica do estado do treinamento (opcional)
+    epocaInicial = 0
+    menorDistancia = float('inf')
+    if (controle is not None):
+        epocaInicial, menorDistancia = controle.Inicia("Q_Learning_VeiculosFixos", ambiente, matrizes, amostrador, menorRotas)
+    
+    # Critérios de parada antecipada (opcional)
+    if (parada is not None):
+        parada.Inicia(ambiente, Q, epocaInicial=epocaInicial)
+    
+    # Núcleo compilado (opcional)
+    if (compilado):
+        if (NucleoCompilado() is not None):
+            return EpocasCompiladasVeiculosFixos(ambiente, Q, QVisitas, taxaDesconto, epsilon, epocas, amostrador, resultados, parada=parada, polimento=polimento)
+        warnings.warn("Numba não está instalado, usando a implementação em Python puro")
+    
+    for i in range(epocaInicial, epocas):
+        # Epsilon da época (constante ou programado)
+        epsilonEpoca = EpsilonEpoca(epsilon, i)
+        
+        # Estados abertos (consumidores), com o estado inicial do ambiente (depósito) já visitado
+        episodio = Episodio(ambiente, False)
+
+        # Metricas da rota
+        rotas.Reinicia(ambiente["Veiculos"])
+        despacho.Reinicia(rotas)
+        podado = False
+        
+        while (episodio.Restantes != 0):
+            # Escolhe um veiculo
+            veiculo = despacho.Escolhe(rotas)
+            
+            # O último estado da rota escolhida
+            estado = rotas.Ultimo[veiculo]
+
+            # Validar ações
+            acoes = ValidaAcoes(Q[estado], episodio)
+            
+            # Escolhe uma ação
+            acao = Politica(epsilonEpoca, acoes, episodio, amostrador)
+
+            # Cálcula a distância euclidiana e atualiza a rota
+            distancia = rotas.Atualiza(veiculo, acao, ambiente)
+            despacho.Atualiza(rotas, veiculo)
+            
+            # Marca a ação para não se escolhida de novo e atualiza a lista de ações válidas
+            episodio.Visita(acao)
+            acoes[acao] = float('-inf')
+            
+            # Atualiza a quantidade de visitas ao par (s,a)
+            QVisitas[estado, acao] += 1
+            
+            # Recompensa por escolher a ação no estado atual
+            recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+            
+            # Guarda a transição (opcional)
+            if (experiencias is not None):
+                experiencias.Adiciona(estado, acao, recompensa, acoes)
+            
+            # Valor da possível próxima ação
+            if (episodio.Validas == 0): # Se a próxima ação é o depósito
+                valorAcaoFutura = Q[acao, 0]
+            else:
+                valorAcaoFutura = Q[acao, MaxQ(acoes)]
+            
+            # Atualiza Q
+            AtualizaQ(Q, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+
+            # Interrompe o episódio já inválido ou pior que a menor distância (opcional)
+            if (poda is not None and PodaEpisodio(rotas, ambiente, poda, menorDistancia)):
+                podado = True
+                break
+            
+        # Retorno de cada rota ao depósito e distância total (episódio interrompido: sem retorno e distância infinita)
+        if (podado):
+            distanciaTotal = float('inf')
+        else:
+            distanciaTotal = RetornoDeposito(rotas, Q, QVisitas, ambiente, taxaAprendizagem)
+        
+        # Atualizações com lotes das transições guardadas (opcional)
+        if (experiencias is not None):
+            experiencias.Reproduz(taxaDesconto, QVisitas, Q, taxa=taxaAprendizagem)
+        
+        resultados.append(distanciaTotal)
+        # Um episódio interrompido não tem rotas completas e não entra nas menores rotas
+        if (polimento is not None and not podado): # Busca local sobre cada nova menor rota da exploração (opcional)
+            menorDistancia = polimento.Atualiza(i == 0, distanciaTotal, rotas, menorRotas, menorDistancia)
+        elif (not podado and (i == 0 or distanciaTotal < menorDistancia)):
+            menorDistancia = distanciaTotal
+            menorRotas.CopiaDe(rotas)
+        
+        parar = parada is not None and parada.Para(i + 1, menorDistancia)
+        if (controle is not None):
+            controle.Atualiza(i + 1, menorDistancia, parar or i + 1 == epocas)
+        if (parar):
+            break
+        
+    return menorDistancia, menorRotas.ParaLista(ambiente), resultados
+
+# Método 2
+def DoubleQ_Learning_VeiculosFixos(ambiente, taxaDesconto, epsilon = 0.9, epocas = 1000, semente = None, resultados = None, parada = None, inicial = None, controle = None, buscaLocal = False, taxaAprendizagem = TaxaAprendizagem, despacho = None, experiencias = None, poda = None):
+    # Fator da poda de episódios: menor que 1 interromperia episódios melhores que a menor distância
+    if (poda is not None and poda < 1):
+        raise ValueError("O fator da poda de episódios deve ser >= 1 (float('inf') para interromper somente os episódios inválidos)")
+    
+    # Quantidade de estados do ambiente
+    quantidadeEstados = len(ambiente["Estados"])
+    
+    # Matriz Q(s,a)
+    Q1 = CriaMatriz(quantidadeEstados)
+    Q2 = CriaMatriz(quantidadeEstados)
+    QVisitas = CriaMatriz(quantidadeEstados, numpy.int32)
+    
+    # Gerador de números aleatórios
+    amostrador = Amostrador(semente)
+    
+    # Rotas do episódio e menores rotas, reutilizadas a cada época
+    rotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+    menorRotas = BufferRotas(ambiente["Veiculos"], quantidadeEstados - 1 + ambiente["Veiculos"])
+    
+    # Seleção do veículo de cada passo (rota com a menor demanda, ou outro despacho)
+    if (despacho is None):
+        despacho = DespachoMenorDemanda()
+    
+    #Armazenar os resultados (lista ou coletor com append/extend)
+    if (resultados is None):
+        resultados = []
+    
+    # Busca local sobre as menores rotas (opcional)
+    polimento = PolimentoRotas(ambiente) if buscaLocal else None
+    
+    # Reprodução de experiências (opcional)
+    if (experiencias is not None):
+        experiencias.Inicia(quantidadeEstados, False)
+    
+    # Tabelas iniciais de um treinamento anterior (warm-start, opcional)
+    matrizes = {"Q1": Q1, "Q2": Q2, "QVisitas": QVisitas}
+    if (inicial is not None):
+        IniciaTabelas(inicial, matrizes)
+    
+    # Retomada e gravação periódica do estado do treinamento (opcional)
+    epocaInicial = 0
+    menorDistancia = float('inf')
+    if (controle is not None):
+        epocaInicial, menorDistancia = controle.Inicia("DoubleQ_Learning_VeiculosFixos", ambiente, matrizes, amostrador, menorRotas)
+    
+    # Critérios de parada antecipada (opcional)
+    if (parada is not None):
+        parada.Inicia(ambiente, Q1, Q2, epocaInicial=epocaInicial)
+
+    for i in range(epocaInicial, epocas):
+        # Epsilon da época (constante ou programado)
+        epsilonEpoca = EpsilonEpoca(epsilon, i)
+        
+        # Estados abertos (consumidores), com o estado inicial do ambiente (depósito) já visitado
+        episodio = Episodio(ambiente, False)
+
+        # Metricas da rota
+        rotas.Reinicia(ambiente["Veiculos"])
+        despacho.Reinicia(rotas)
+        podado = False
+        
+        while (episodio.Restantes != 0):
+            # Escolhe um veiculo
+            veiculo = despacho.Escolhe(rotas)
+            
+            # O último estado da rota escolhida
+            estado = rotas.Ultimo[veiculo]
+            
+            # Validar ações
+            acoes = ValidaAcoes(Q1[estado] + Q2[estado], episodio)
+            
+            # Escolhe uma ação
+            acao = Politica(epsilonEpoca, acoes, episodio, amostrador)
+
+            # Cálcula a distância euclidiana e atualiza a rota
+            distancia = rotas.Atualiza(veiculo, acao, ambiente)
+            despacho.Atualiza(rotas, veiculo)
+            
+            # Marca a ação para não se escolhida de novo e atualiza a lista de ações válidas
+            episodio.Visita(acao)
+            acoes[acao] = float('-inf')
+            
+            # Atualiza a quantidade de visitas ao par (s,a)
+            QVisitas[estado, acao] += 1
+            
+            # Recompensa por escolher a ação no estado atual
+            recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+            
+            # Guarda a transição (opcional)
+            if (experiencias is not None):
+                experiencias.Adiciona(estado, acao, recompensa, acoes)
+            
+            if (amostrador.Uniforme() < 0.5):
+                # Valor da possível próxima ação
+                if (episodio.Validas == 0): # Se a próxima ação é o depósito
+                    valorAcaoFutura = Q2[acao, 0]
+                else:
+                    valorAcaoFutura = Q2[acao, MaxQDouble(acoes, Q1[acao])]
+                
+                # Atualiza Q
+                AtualizaQ(Q1, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+            else:
+                # Valor da possível próxima ação
+                if (episodio.Validas == 0): # Se a próxima ação é o depósito
+                    valorAcaoFutura = Q1[acao, 0]
+                else:
+                    valorAcaoFutura = Q1[acao, MaxQDouble(acoes, Q2[acao])]
+                
+                # Atualiza Q
+                AtualizaQ(Q2, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+
+            # Interrompe o episódio já inválido ou pior que a menor distância (opcional)
+            if (poda is not None and PodaEpisodio(rotas, ambiente, poda, menorDistancia)):
+                podado = True
+                break
+                
+        # Retorno de cada rota ao depósito e distância total (episódio interrompido: sem retorno e distância infinita)
+        if (podado):
+            distanciaTotal = float('inf')
+        else:
+            distanciaTotal = RetornoDepositoDouble(rotas, Q1, Q2, QVisitas, ambiente, amostrador, taxaAprendizagem)
+        
+        # Atualizações com lotes das transições guardadas (opcional)
+        if (experiencias is not None):
+            experiencias.Reproduz(taxaDesconto, QVisitas, Q1, Q2, taxa=taxaAprendizagem)
+        
+        resultados.append(distanciaTotal)
+        # Um episódio interrompido não tem rotas completas e não entra nas menores rotas
+        if (polimento is not None and not podado): # Busca local sobre cada nova menor rota da exploração (opcional)
+            menorDistancia = polimento.Atualiza(i == 0, distanciaTotal, rotas, menorRotas, menorDistancia)
+        elif (not podado and (i == 0 or distanciaTotal < menorDistancia)):
+            menorDistancia = distanciaTotal
+            menorRotas.CopiaDe(rotas)
+        
+        parar = parada is not None and parada.Para(i + 1, menorDistancia)
+        if (controle is not None):
+            controle.Atualiza(i + 1, menorDistancia, parar or i + 1 == epocas)
+        if (parar):
+            break
+        
+    return menorDistancia, menorRotas.ParaLista(ambiente), resultados
+
+def RotasDinamicasDaSequencia(sequencia, ambiente):
+    """
+    Reconstrói as rotas de veículos dinâmicos a partir da sequência de ações, em que o depósito (0) encerra uma rota
+    
+    Entrada:
+        sequencia: Sequência de ações do episódio
+        ambiente: Informações sobre o ambiente
+        
+    Retorno:
+        Lista de rotas no mesmo formato de CriaRotas
+    """
+    rotas = CriaRotas(1)
+    estado = 0
+    
+    for passo, acao in enumerate(sequencia):
+        AtualizaRota(rotas[-1], estado, acao, ambiente)
+        if (acao == 0 and passo < len(sequencia) - 1):
+            rotas.append({"Demanda": 0, "Custo": 0, "Consumidores": [0]})
+        estado = acao
+    
+    return rotas
+
+def AtualizaQLote(Q, QVisitas, estados, acoes, alvos):
+    """
+    Atualização TD de um lote de pares (estado, ação) na matriz compartilhada, os alvos de pares repetidos são
+    somados (scatter-add) e a média é aplicada com a taxa de aprendizagem após contar todas as visitas
+    
+    Entrada:
+        Q: Matriz Q(s,a) a ser atualizada
+        QVisitas: Matriz de visitas aos pares (s,a)
+        estados: Vetor com as posições dos estados
+        acoes: Vetor com as posições das ações
+        alvos: Vetor com os alvos (recompensa mais o valor descontado da ação futura)
+    """
+    pares, inverso, repeticoes = numpy.unique(estados*Q.shape[1] + acoes, return_inverse=True, return_counts=True)
+    media = numpy.bincount(inverso, weights=alvos)/repeticoes
+    
+    QPlano = Q.reshape(-1)
+    QVisitasPlano = QVisitas.reshape(-1)
+    QVisitasPlano[pares] += repeticoes.astype(QVisitas.dtype)
+    QPlano[pares] += TaxaAprendizagem(QVisitasPlano[pares])*(media - QPlano[pares])
+
+def EpocasLoteVeiculosDinamicos(ambiente, Q, QVisitas, taxaDesconto, epsilon, epocas, amostrador, lote, resultados, parada = None, polimento = None):
+    """
+    Executa as épocas do Método 3 simulando, em cada época, um lote de episódios em paralelo (vetorizado), com as
+    atualizações TD aplicadas na matriz Q compartilhada a cada passo.
+    
+    Entrada:
+        ambiente: Informações sobre o ambiente
+        Q, QVisitas: Matrizes Q(s,a) e de visitas
+        taxaDesconto, epsilon, epocas: Parâmetros do algoritmo
+        amostrador: Gerador de números aleatórios
+        lote: Quantidade de episódios por época
+        resultados: Lista ou coletor (append/extend) da menor distância de cada época
+        parada: Critérios de parada antecipada (CriterioParada)
+        polimento: Busca local sobre as menores rotas ao final (PolimentoRotas), None para desabilitar
+        
+    Retorno:
+        Menor distância, menores rotas e a menor distância de cada época
+    """
+    quantidadeEstados = Q.shape[0]
+    distancias = ambiente["Distancias"]
+    demandas = ambiente["Demandas"]
+    capacidade = ambiente["Capacidade"]
+    gerador = amostrador.gerador
+    episodios = numpy.arange(lote)
+    
+    menorDistancia = float('inf')
+    menorSequencia = None
+    
+    for i in range(epocas):
+        # Estados abertos de cada episódio, com o estado inicial do ambiente (depósito) já visitado
+        abertos = numpy.ones((lote, quantidadeEstados), dtype=bool)
+        abertos[:, 0] = False
+        estados = numpy.zeros(lote, dtype=numpy.int64)
+        cargas = numpy.zeros(lote, dtype=demandas.dtype)
+        custos = numpy.zeros(lote)
+        quantidadeRotas = numpy.ones(lote, dtype=numpy.int64)
+        sequencias = numpy.zeros((lote, 2*quantidadeEstados), dtype=numpy.int64)
+        passos = numpy.zeros(lote, dtype=numpy.int64)
+        ativos = episodios
+        
+        while (len(ativos) != 0):
+            estado = estados[ativos]
+            
+            # Validar ações (não visitadas e viáveis pela capacidade)
+            mascara = abertos[ativos] & (cargas[ativos, numpy.newaxis] + demandas[numpy.newaxis, :] <= capacidade)
+            linhas = Q[estado]
+            acoes = numpy.where(mascara, linhas, float('-inf'))
+            
+            # Escolhe uma ação: maior valor ou uniforme entre as válidas (maior chave aleatória)
+            acao = numpy.argmax(acoes, axis=1)
+            aleatorios = gerador.random(len(ativos)) > epsilon
+            if (aleatorios.any()):
+                chaves = numpy.where(mascara[aleatorios], gerador.random((int(aleatorios.sum()), quantidadeEstados)), -1.0)
+                acao[aleatorios] = numpy.argmax(chaves, axis=1)
+            
+            # Atualiza as rotas
+            distancia = distancias[estado, acao]
+            custos[ativos] += distancia
+            sequencias[ativos, passos[ativos]] = acao
+            passos[ativos] += 1
+            
+            # Marca a ação para não ser escolhida de novo
+            linhasAtivas = numpy.arange(len(ativos))
+            abertos[ativos, acao] = False
+            mascara[linhasAtivas, acao] = False
+            acoes[linhasAtivas, acao] = float('-inf')
+            
+            # Recompensa e valor da possível próxima ação (0 se a próxima ação é o depósito)
+            recompensa = - distancia/(capacidade - demandas[acao])
+            valorAcaoFutura = numpy.where(mascara.any(axis=1), Q[acao, numpy.argmax(acoes, axis=1)], 0.0)
+            
+            # Atualiza Q
+            AtualizaQLote(Q, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura)
+            
+            # Continua ou cria uma nova rota
+            continua = acao != 0
+            abertos[ativos[continua], 0] = True
+            cargas[ativos] = numpy.where(continua, cargas[ativos] + demandas[acao], 0)
+            estados[ativos] = acao
+            
+            ativos = ativos[abertos[ativos].any(axis=1)]
+            quantidadeRotas[ativos] += (estados[ativos] == 0)
+        
+        # Cálculo da distância total das rotas geradas
+        custos[quantidadeRotas > ambiente["Veiculos"]] = float('inf')
+        melhor = int(numpy.argmin(custos))
+        
+        resultados.append(float(custos[melhor]))
+        if (i == 0 or custos[melhor] < menorDistancia):
+            menorDistancia = float(custos[melhor])
+            menorSequencia = sequencias[melhor, :passos[melhor]].tolist()
+        
+        if (parada is not None and parada.Para(i + 1, menorDistancia)):
+            break
+    
+    menorRotas = RotasDinamicasDaSequencia(menorSequencia, ambiente)
+    if (polimento is not None):
+        menorDistancia, menorRotas = polimento.Final(menorRotas)
+    
+    return menorDistancia, menorRotas, resultados
+
+# Método 3
+def Q_Learning_VeiculosDinamicos(ambiente, taxaDesconto = 0.1, epsilon = 0.9, epocas = 1000, semente = None, resultados = None, lote = 1, parada = None, inicial = None, controle = None, buscaLocal = False, candidatos = None, taxaAprendizagem = TaxaAprendizagem, tabelas = None, experiencias = None, poda = None):
+    # Fator da poda de episódios: menor que 1 interromperia episódios melhores que a menor distância
+    if (poda is not None and poda < 1):
+        raise ValueError("O fator da poda de episódios deve ser >= 1 (float('inf') para interromper somente os episódios inválidos)")
+    
+    # Opções não suportadas pelo lote de episódios, recusadas antes de qualquer estado ser alterado (tabelas, retomada, ...)
+    if (lote > 1):
+        if (controle is not None):
+            raise ValueError("A retomada do treinamento não é suportada com lote de episódios")
+        if (callable(epsilon) or taxaAprendizagem is not TaxaAprendizagem):
+            raise ValueError("O lote de episódios usa epsilon constante e a taxa de aprendizagem 1/(1 + visitas)")
+        if (experiencias is not None):
+            raise ValueError("A reprodução de experiências não é suportada com lote de episódios")
+        if (poda is not None):
+            raise ValueError("A poda de episódios não é suportada com lote de episódios")
+    
+    # Ações restritas aos k vizinhos mais próximos (opcional)
+    if (candidatos is not None):
+        if (lote > 1):
+            raise ValueError("O espaço de ações por candidatos não é suportado com lote de episódios")
+        if (experiencias is not None):
+            raise ValueError("A reprodução de experiências não é suportada pelo espaço de ações por candidatos")
+        if (poda is not None):
+            raise ValueError("A poda de episódios não é suportada pelo espaço de ações por candidatos")
+        return Q_Learning_Candidatos(ambiente, taxaDesconto, epsilon, epocas, semente, resultados, candidatos, True, parada, inicial, controle, buscaLocal, taxaAprendizagem)
+
+    # Quantidade de estados do ambiente
+    quantidadeEstados = len(ambiente["Estados"])
+    
+    # Matriz Q(s,a), ou matrizes já alocadas (ex.: em memória compartilhada, ver compartilhado.py)
+    if (tabelas is not None):
+        Q, QVisitas = tabelas["Q"], tabelas["QVisitas"]
+    else:
+        Q = CriaMatriz(quantidadeEstados)
+        QVisitas = CriaMatriz(quantidadeEstados, numpy.int32)
+    
+    # Gerador de números aleatórios
+    amostrador = Amostrador(semente)
+    
+    # Rotas do episódio e menores rotas, reutilizadas a cada época
+    rotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+    menorRotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+    
+    #Armazenar os resultados (lista ou coletor com append/extend)
+    if (resultados is None):
+        resultados = []
+    
+    # Busca local sobre as menores rotas (opcional)
+    polimento = PolimentoRotas(ambiente) if buscaLocal else None
+    
+    # Reprodução de experiências (opcional)
+    if (experiencias is not None):
+        experiencias.Inicia(quantidadeEstados, True)
+    
+    # Tabelas iniciais de um treinamento anterior (warm-start, opcional)
+    matrizes = {"Q": Q, "QVisitas": QVisitas}
+    if (inicial is not None):
+        IniciaTabelas(inicial, matrizes)
+    
+    # Retomada e gravação periódica do estado do treinamento (opcional)
+    epocaInicial = 0
+    menorDistancia = float('inf')
+    if (controle is not None):
+        epocaInicial, menorDistancia = controle.Inicia("Q_Learning_VeiculosDinamicos", ambiente, matrizes, amostrador, menorRotas)
+    
+    # Critérios de parada antecipada (opcional)
+    if (parada is not None):
+        parada.Inicia(ambiente, Q, epocaInicial=epocaInicial)
+
+    # Lote de episódios por época (opcional)
+    if (lote > 1):
+        return EpocasLoteVeiculosDinamicos(ambiente, Q, QVisitas, taxaDesconto, epsilon, epocas, amostrador, lote, resultados, parada, polimento)
+    
+    for i in range(epocaInicial, epocas):
+        # Epsilon da época (constante ou programado)
+        epsilonEpoca = EpsilonEpoca(epsilon, i)
+        
+        # Estados abertos (consumidores), com o estado inicial do ambiente (depósito) já visitado
+        episodio = Episodio(ambiente, True)
+
+        # Metricas da rota
+        rotas.Reinicia(1)
+        veiculo = 0
+        
+        # Estado inicial
+        estado = 0
+        podado = False
+        
+        while (episodio.Restantes != 0):
+            # Validar ações
+            acoes = ValidaAcoes(Q[estado], episodio)
+            
+            # Escolhe uma ação
+            acao = Politica(epsilonEpoca, acoes, episodio, amostrador)
+            
+            # Cálcula a distância euclidiana e atualiza a rota
+            distancia = rotas.Atualiza(veiculo, acao, ambiente)
+            
+            # Marca a ação para não se escolhida de novo e atualiza a lista de ações válidas
+            episodio.Visita(acao)
+            acoes[acao] = float('-inf')
+            
+            # Atualiza a quantidade de visitas ao par (s,a)
+            QVisitas[estado, acao] += 1
+            
+            # Recompensa por escolher a ação no estado atual
+            recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+            
+            # Guarda a transição (opcional)
+            if (experiencias is not None):
+                experiencias.Adiciona(estado, acao, recompensa, acoes)
+            
+            # Valor da possível próxima ação
+            if (episodio.Validas == 0): #Se a próxima ação é o depósito
+                valorAcaoFutura = 0
+            else:
+                valorAcaoFutura = Q[acao, MaxQ(acoes)]
+            
+            # Atualiza Q
+            AtualizaQ(Q, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+            
+            # Continua ou cria uma nova rota
+            if (acao != 0):
+                episodio.AbreDeposito()
+                episodio.AdicionaDemanda(ambiente["Demandas"][acao])
+            else:
+                if (episodio.Restantes != 0):
+                    episodio.NovaRota()
+                    veiculo = rotas.NovaRota()
+            
+            # Atualiza o estado com a ação
+            estado = acao
+
+            # Interrompe o episódio já inválido ou pior que a menor distância (opcional)
+            if (poda is not None and PodaEpisodio(rotas, ambiente, poda, menorDistancia)):
+                podado = True
+                break
+    
+        # Cálculo da distância total das rotas geradas (episódio interrompido: distância infinita)
+        distanciaTotal = rotas.Distancia(ambiente) if not podado else float('inf')
+        
+        # Atualizações com lotes das transições guardadas (opcional)
+        if (experiencias is not None):
+            experiencias.Reproduz(taxaDesconto, QVisitas, Q, taxa=taxaAprendizagem)
+        
+        resultados.append(distanciaTotal)
+        # Um episódio interrompido não tem rotas completas e não entra nas menores rotas
+        if (polimento is not None and not podado): # Busca local sobre cada nova menor rota da exploração (opcional)
+            menorDistancia = polimento.Atualiza(i == 0, distanciaTotal, rotas, menorRotas, menorDistancia)
+        elif (not podado and (i == 0 or distanciaTotal < menorDistancia)):
+            menorDistancia = distanciaTotal
+            menorRotas.CopiaDe(rotas)
+        
+        parar = parada is not None and parada.Para(i + 1, menorDistancia)
+        if (controle is not None):
+            controle.Atualiza(i + 1, menorDistancia, parar or i + 1 == epocas)
+        if (parar):
+            break
+        
+    return menorDistancia, menorRotas.ParaLista(ambiente), resultados
+        
+# Método 4
+def DoubleQ_Learning_VeiculosDinamicos(ambiente, taxaDesconto = 0.1, epsilon = 0.9, epocas = 1000, semente = None, resultados = None, parada = None, inicial = None, controle = None, buscaLocal = False, taxaAprendizagem = TaxaAprendizagem, tabelas = None, experiencias = None, poda = None):
+    # Fator da poda de episódios: menor que 1 interromperia episódios melhores que a menor distância
+    if (poda is not None and poda < 1):
+        raise ValueError("O fator da poda de episódios deve ser >= 1 (float('inf') para interromper somente os episódios inválidos)")
+    
+    # Quantidade de estados do ambiente
+    quantidadeEstados = len(ambiente["Estados"])
+    
+    # Matriz Q(s,a), ou matrizes já alocadas (ex.: em memória compartilhada, ver compartilhado.py)
+    if (tabelas is not None):
+        Q1, Q2, QVisitas = tabelas["Q1"], tabelas["Q2"], tabelas["QVisitas"]
+    else:
+        Q1 = CriaMatriz(quantidadeEstados)
+        Q2 = CriaMatriz(quantidadeEstados)
+        QVisitas = CriaMatriz(quantidadeEstados, numpy.int32)
+    
+    # Gerador de números aleatórios
+    amostrador = Amostrador(semente)
+    
+    # Rotas do episódio e menores rotas, reutilizadas a cada época
+    rotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+    menorRotas = BufferRotas(quantidadeEstados, 2*quantidadeEstados)
+    
+    #Armazenar os resultados (lista ou coletor com append/extend)
+    if (resultados is None):
+        resultados = []
+    
+    # Busca local sobre as menores rotas (opcional)
+    polimento = PolimentoRotas(ambiente) if buscaLocal else None
+    
+    # Reprodução de experiências (opcional)
+    if (experiencias is not None):
+        experiencias.Inicia(quantidadeEstados, True)
+    
+    # Tabelas iniciais de um treinamento anterior (warm-start, opcional)
+    matrizes = {"Q1": Q1, "Q2": Q2, "QVisitas": QVisitas}
+    if (inicial is not None):
+        IniciaTabelas(inicial, matrizes)
+    
+    # Retomada e gravação periódica do estado do treinamento (opcional)
+    epocaInicial = 0
+    menorDistancia = float('inf')
+    if (controle is not None):
+        epocaInicial, menorDistancia = controle.Inicia("DoubleQ_Learning_VeiculosDinamicos", ambiente, matrizes, amostrador, menorRotas)
+    
+    # Critérios de parada antecipada (opcional)
+    if (parada is not None):
+        parada.Inicia(ambiente, Q1, Q2, epocaInicial=epocaInicial)
+
+    for i in range(epocaInicial, epocas):
+        # Epsilon da época (constante ou programado)
+        epsilonEpoca = EpsilonEpoca(epsilon, i)
+        
+        # Estados abertos (consumidores), com o estado inicial do ambiente (depósito) já visitado
+        episodio = Episodio(ambiente, True)
+
+        # Metricas da rota
+        rotas.Reinicia(1)
+        veiculo = 0
+        
+        # Estado inicial
+        estado = 0
+        podado = False
+        
+        while (episodio.Restantes != 0):
+            # Validar ações
+            acoes = ValidaAcoes(Q1[estado] + Q2[estado], episodio)
+            
+            # Escolhe uma ação
+            acao = Politica(epsilonEpoca, acoes, episodio, amostrador)
+
+            # Cálcula a distância euclidiana e atualiza a rota
+            distancia = rotas.Atualiza(veiculo, acao, ambiente)
+            
+            # Marca a ação para não se escolhida de novo e atualiza a lista de ações válidas
+            episodio.Visita(acao)
+            acoes[acao] = float('-inf')
+            
+            # Atualiza a quantidade de visitas ao par (s,a)
+            QVisitas[estado, acao] += 1
+            
+            # Recompensa por escolher a ação no estado atual
+            recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+            
+            # Guarda a transição (opcional)
+            if (experiencias is not None):
+                experiencias.Adiciona(estado, acao, recompensa, acoes)
+            
+            if (amostrador.Uniforme() < 0.5):
+                # Valor da possível próxima ação
+                if (episodio.Validas == 0): # Se a próxima ação é o depósito
+                    valorAcaoFutura = 0
+                else:
+                    valorAcaoFutura = Q2[acao, MaxQDouble(acoes, Q1[acao])]
+                
+                # Atualiza Q1
+                AtualizaQ(Q1, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+            else:
+                # Valor da possível próxima ação
+                if (episodio.Validas == 0): # Se a próxima ação é o depósito
+                    valorAcaoFutura = 0
+                else:
+                    valorAcaoFutura = Q1[acao, MaxQDouble(acoes, Q2[acao])]
+                
+                # Atualiza Q2
+                AtualizaQ(Q2, QVisitas, estado, acao, recompensa + taxaDesconto*valorAcaoFutura, taxaAprendizagem)
+            
+            # Continua ou cria uma nova rota
+            if (acao != 0):
+                episodio.AbreDeposito()
+                episodio.AdicionaDemanda(ambiente["Demandas"][acao])
+            else:
+                if (episodio.Restantes != 0):
+                    episodio.NovaRota()
+                    veiculo = rotas.NovaRota()
+                
+            # Atualiza o estado com a ação
+            estado = acao
+
+            # Interrompe o episódio já inválido ou pior que a menor distância (opcional)
+            if (poda is not None and PodaEpisodio(rotas, ambiente, poda, menorDistancia)):
+                podado = True
+                break
+
+        # Cálculo da distância total das rotas geradas (episódio interrompido: distância infinita)
+        distanciaTotal = rotas.Distancia(ambiente) if not podado else float('inf')
+        
+        # Atualizações com lotes das transições guardadas (opcional)
+        if (experiencias is not None):
+            experiencias.Reproduz(taxaDesconto, QVisitas, Q1, Q2, taxa=taxaAprendizagem)
+        
+        resultados.append(distanciaTotal)
+        # Um episódio interrompido não tem rotas completas e não entra nas menores rotas
+        if (polimento is not None and not podado): # Busca local sobre cada nova menor rota da exploração (opcional)
+            menorDistancia = polimento.Atualiza(i == 0, distanciaTotal, rotas, menorRotas, menorDistancia)
+        elif (not podado and (i == 0 or distanciaTotal < menorDistancia)):
+            menorDistancia = distanciaTotal
+            menorRotas.CopiaDe(rotas)
+        
+        parar = parada is not None and parada.Para(i + 1, menorDistancia)
+        if (controle is not None):
+            controle.Atualiza(i + 1, menorDistancia, parar or i + 1 == epocas)
+        if (parar):
+            break
+        
+    return menorDistancia, menorRotas.ParaLista(ambiente), resultados
+
+def Metodos():
+    """
+    Métodos disponíveis, na ordem da opção de algoritmo (0 a 3)
+    
+    Retorno:
+        Lista com as funções dos métodos
+    """
+    return [Q_Learning_VeiculosFixos, DoubleQ_Learning_VeiculosFixos, Q_Learning_VeiculosDinamicos, DoubleQ_Learning_VeiculosDinamicos]
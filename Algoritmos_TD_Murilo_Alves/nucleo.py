@@ -0,0 +1,767 @@
+# -*- coding: utf-8 -*-
+"""
+Elementos comuns aos métodos: recompensa, política, matriz Q, rotas, gerador de números aleatórios e episódio
+
+@author: Murilo Alves
+"""
+
+import heapq
+
+import numpy
+
+def Recompensa(distancia, demanda, capacidadeVeiculo):
+    """
+    Recompensa da ação escolhida.
+    
+    Entrada:
+        distancia: Custo de sair do estado atual e ir para o próximo
+        demanda: Demanda do próximo estado
+        capacidadeVeiculo: Capacidade máxima do veículo
+        
+    Retorno:
+        Valor da recompensa (negativa)
+    """
+    return - distancia/(capacidadeVeiculo - demanda)
+
+def ValidaAcoes (acoesPossiveis, episodio):
+    """
+    Válida ações para serem escolhidas no estado atual, caso não for um estado visitado e no caso de veículos dinâmicos 
+    a demanda não torna a rota inválida.
+    
+    Entrada:
+        acoesPossiveis: Todas as ações que o estado atual possui (linha da matriz Q)
+        episodio: Estado do episódio com a máscara de ações válidas
+        
+    Retorno:
+        Cópia dos valores das ações, sendo '-inf' para ações inválidas
+    """
+    return numpy.where(episodio.Mascara, acoesPossiveis, float('-inf'))
+
+def Politica(epsilon, acoes, episodio, amostrador): 
+    """
+    Escolhe uma ação, aleatoriamente (uniforme entre as ações válidas) ou pelo maior valor.
+    
+    Entrada:
+        epsilon: Parâmetro para probalidade de decição do metódo de escolha da ação
+        acoes: Valores das ações, sendo '-inf' para ações inválidas
+        episodio: Estado do episódio com as ações válidas
+        amostrador: Gerador de números aleatórios
+        
+    Retorno:
+        Posição (index) da ação na lista de ações 
+    """
+    if (amostrador.Uniforme() > epsilon): # Aleatoriedade
+        return episodio.SorteiaAcao(amostrador.Uniforme())
+    else: # Maior valor
+        return MaxQ(acoes)
+    
+def MaxQ (acoes):
+    """
+    Escolhe uma ação pelo maior valor.
+    
+    Entrada:
+        acoes: Valores das ações, sendo '-inf' para ações inválidas
+        
+    Retorno:
+        Posição (index) da ação na lista de ações 
+    """
+    return int(numpy.argmax(acoes))
+
+def MaxQDouble (acoes, valores):
+    """
+    Escolhe uma ação pelo maior valor.
+    
+    Entrada:
+        acoes: Valores das ações, sendo '-inf' para ações inválidas
+        valores: Valores das ações para Q1 ou Q2
+        
+    Retorno:
+        Posição (index) da ação na lista de ações 
+    """
+    return int(numpy.argmax(numpy.where(acoes != float('-inf'), valores, float('-inf'))))
+
+def TaxaAprendizagem (visitas):
+    """
+    Taxa de aprendizagem baseada em visitas feitas ao par Q(estado, ação)
+    
+    Entrada:
+        visitas: Quantidades de visitas ao par Q(estado, ação)
+        
+    Retorno:
+        Cálculo da taxa
+    """
+    return 1/(1 + visitas)
+
+class TaxaPolinomial:
+    """
+    Taxa de aprendizagem 1/(1 + visitas)^expoente, com expoente em (0.5, 1] (expoente 1 é a TaxaAprendizagem)
+    """
+    __slots__ = ("expoente",)
+    
+    def __init__(self, expoente):
+        self.expoente = expoente
+    
+    def __call__(self, visitas):
+        return 1/(1 + visitas)**self.expoente
+
+class EpsilonLinear:
+    """
+    Epsilon variando linearmente de 'inicio' a 'fim' ao longo de 'epocas' épocas e constante depois. Como a ação é
+    aleatória quando o sorteio supera epsilon, um epsilon crescente reduz a exploração ao longo do treinamento.
+    """
+    __slots__ = ("inicio", "fim", "epocas")
+    
+    def __init__(self, inicio, fim, epocas):
+        self.inicio = inicio
+        self.fim = fim
+        self.epocas = epocas
+    
+    def __call__(self, epoca):
+        return self.inicio + (self.fim - self.inicio)*min(epoca/self.epocas, 1.0)
+
+class EpsilonExponencial:
+    """
+    Epsilon que se aproxima exponencialmente de 'fim', partindo de 'inicio', com a diferença caindo à metade a cada 'meiaVida' épocas
+    """
+    __slots__ = ("inicio", "fim", "meiaVida")
+    
+    def __init__(self, inicio, fim, meiaVida):
+        self.inicio = inicio
+        self.fim = fim
+        self.meiaVida = meiaVida
+    
+    def __call__(self, epoca):
+        return self.fim + (self.inicio - self.fim)*0.5**(epoca/self.meiaVida)
+
+def EpsilonEpoca(epsilon, epoca):
+    """
+    Entrada:
+        epsilon: Valor constante ou programação (função da época, ex.: EpsilonLinear)
+        epoca: Época atual, contada desde o início do treinamento (inclusive antes de uma retomada)
+        
+    Retorno:
+        Epsilon da época
+    """
+    return epsilon(epoca) if callable(epsilon) else epsilon
+
+def CriaMatriz(quantidadeEstados, tipo = numpy.float64):
+    """
+    Inicializa a matriz contígua (NumPy) com tamanho estados x estados ou Q(s,a)
+    
+    Entrada:
+        quantidadeEstados: Quantidades de estados do ambiente
+        tipo: Tipo dos elementos, numpy.float64/numpy.float32 para valores e numpy.int32 para visitas
+        
+    Retorno:
+        Matriz zerada com tamanho estados x estados
+    """
+    return numpy.zeros((quantidadeEstados, quantidadeEstados), dtype=tipo)
+
+def AtualizaQ(Q, QVisitas, estado, acao, alvo, taxa = TaxaAprendizagem):
+    """
+    Atualização TD, no próprio lugar, do par Q(estado, ação) em direção ao alvo
+    
+    Entrada:
+        Q: Matriz Q(s,a) a ser atualizada
+        QVisitas: Matriz de visitas aos pares (s,a)
+        estado: Posição do estado atual
+        acao: Posição da ação atual
+        alvo: Recompensa mais o valor descontado da ação futura
+        taxa: Taxa de aprendizagem em função das visitas ao par (s,a)
+    """
+    Q[estado, acao] += taxa(QVisitas[estado, acao])*(alvo - Q[estado, acao])
+ 
+def EscolheRota(rotas):
+    """
+    Seleciona a rota com a menor demanda
+    
+    Entrada:
+        rotas: Rotas do episódio (BufferRotas) com veículos fixos
+        
+    Retorno:
+        Posição (index) da rota com menor demanda
+    """
+    return rotas.Demanda.index(min(rotas.Demanda))
+
+# Despachos: regras de seleção do veículo com veículos fixos. Cada despacho é reiniciado com as rotas no início do
+# episódio (Reinicia), escolhe o veículo de cada passo (Escolhe) e é avisado depois que a rota escolhida é atualizada
+# (Atualiza). Somente a rota escolhida muda entre Escolhe e Atualiza.
+
+class DespachoMenorDemanda:
+    """
+    Rota com a menor demanda, a mesma seleção de EscolheRota, em um heap de (demanda, veículo): O(log K) por passo e
+    empates decididos pelo menor veículo
+    """
+    __slots__ = ("heap",)
+    
+    def __init__(self):
+        self.heap = []
+    
+    def Chave(self, rotas, veiculo):
+        return rotas.Demanda[veiculo]
+    
+    def Reinicia(self, rotas):
+        """
+        Entrada:
+            rotas: Rotas do episódio (BufferRotas) com veículos fixos
+        """
+        self.heap = [(self.Chave(rotas, veiculo), veiculo) for veiculo in range(rotas.Quantidade)]
+        heapq.heapify(self.heap)
+    
+    def Escolhe(self, rotas):
+        """
+        Retorno:
+            Posição (index) da rota escolhida
+        """
+        return self.heap[0][1]
+    
+    def Atualiza(self, rotas, veiculo):
+        """
+        Entrada:
+            rotas: Rotas do episódio (BufferRotas)
+            veiculo: Rota escolhida e atualizada (topo do heap)
+        """
+        heapq.heapreplace(self.heap, (self.Chave(rotas, veiculo), veiculo))
+
+class DespachoMenorCusto(DespachoMenorDemanda):
+    """
+    Rota com o menor custo (distância percorrida) até o momento, empates decididos pelo menor veículo
+    """
+    __slots__ = ()
+    
+    def Chave(self, rotas, veiculo):
+        return rotas.Custo[veiculo]
+
+class DespachoCircular:
+    """
+    Rotas alternadas em ordem circular (round-robin)
+    """
+    __slots__ = ("proximo",)
+    
+    def __init__(self):
+        self.proximo = 0
+    
+    def Reinicia(self, rotas):
+        self.proximo = 0
+    
+    def Escolhe(self, rotas):
+        return self.proximo
+    
+    def Atualiza(self, rotas, veiculo):
+        self.proximo = (veiculo + 1) % rotas.Quantidade
+
+def RetornoDeposito(rotas, Q, QVisitas, ambiente, taxa = TaxaAprendizagem):
+    """
+    Retorno de cada rota ao depósito ao fim do episódio (veículos fixos), com a atualização de Q(s, depósito)
+    
+    Entrada:
+        rotas: Rotas do episódio (BufferRotas)
+        Q: Matriz Q(s,a) a ser atualizada (coluna 0 = depósito)
+        QVisitas: Matriz de visitas aos pares (s,a)
+        ambiente: Informações sobre o ambiente
+        taxa: Taxa de aprendizagem em função das visitas ao par (s,a)
+        
+    Retorno:
+        Distância total das rotas, infinita se alguma excede a capacidade (BufferRotas.Distancia)
+    """
+    for veiculo in range(rotas.Quantidade):
+        # Calcular as metricas para o retorno ao deposito
+        estado = rotas.Ultimo[veiculo]
+        acao = 0
+        
+        # Cálcula a distância euclidiana e atualiza a rota
+        distancia = rotas.Atualiza(veiculo, acao, ambiente)
+        
+        # Atualiza a quantidade de visitas ao par (s,a)
+        QVisitas[estado, acao] += 1
+        
+        # Recompensa por escolher a ação no estado atual
+        recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+        
+        # Atualiza Q
+        AtualizaQ(Q, QVisitas, estado, acao, recompensa, taxa)
+    
+    return rotas.Distancia(ambiente)
+
+def RetornoDepositoDouble(rotas, Q1, Q2, QVisitas, ambiente, amostrador, taxa = TaxaAprendizagem):
+    """
+    RetornoDeposito do Double Q-Learning, atualizando Q1 ou Q2 (sorteio) em cada retorno
+    
+    Entrada:
+        rotas: Rotas do episódio (BufferRotas)
+        Q1, Q2: Matrizes Q(s,a) a serem atualizadas (coluna 0 = depósito)
+        QVisitas: Matriz de visitas aos pares (s,a)
+        ambiente: Informações sobre o ambiente
+        amostrador: Gerador de números aleatórios
+        taxa: Taxa de aprendizagem em função das visitas ao par (s,a)
+        
+    Retorno:
+        Distância total das rotas, infinita se alguma excede a capacidade (BufferRotas.Distancia)
+    """
+    for veiculo in range(rotas.Quantidade):
+        # Calcular as metricas para o retorno ao deposito
+        estado = rotas.Ultimo[veiculo]
+        acao = 0
+        
+        # Cálcula a distância euclidiana e atualiza a rota
+        distancia = rotas.Atualiza(veiculo, acao, ambiente)
+        
+        # Atualiza a quantidade de visitas ao par (s,a)
+        QVisitas[estado, acao] += 1
+        
+        # Recompensa por escolher a ação no estado atual
+        recompensa = Recompensa(distancia, ambiente["Estados"][acao]["Demanda"], ambiente["Capacidade"])
+        
+        # Atualiza Q
+        if (amostrador.Uniforme() < 0.5):
+            AtualizaQ(Q1, QVisitas, estado, acao, recompensa, taxa)
+        else:
+            AtualizaQ(Q2, QVisitas, estado, acao, recompensa, taxa)
+    
+    return rotas.Distancia(ambiente)
+
+def PodaEpisodio(rotas, ambiente, poda, menorDistancia):
+    """
+    Se o episódio pode ser interrompido: as rotas já são inválidas ou o custo acumulado (sem os retornos ao depósito
+    ainda não feitos, então um limite inferior da distância final) já excede 'poda' vezes a menor distância
+    
+    Entrada:
+        rotas: Rotas do episódio (BufferRotas)
+        ambiente: Informações sobre o ambiente
+        poda: Fator (>= 1) sobre a menor distância, infinito para interromper somente os episódios inválidos. Enquanto
+              não há episódio completo (menor distância infinita), só os episódios inválidos são interrompidos, e as
+              menores rotas continuam vazias
+        menorDistancia: Menor distância até o momento
+        
+    Retorno:
+        True se o episódio deve ser interrompido
+    """
+    return rotas.Invalida(ambiente) or rotas.Total > poda*menorDistancia
+
+def CriaRotas(quantidadeVeiculos):
+    """
+    Inicializa uma lista (tamanho K veículos) com informações de demanda, custo e uma lista de estados visitados 
+    
+    Entrada:
+        quantidadeVeiculos: Quantidades de veículos do ambiente
+        
+    Retorno:
+        Matriz com demanda e custo zeradas, lista de consumidores inicializa com 0 (depósito)
+    """
+    rotas = []
+    
+    for i in range(quantidadeVeiculos):
+        rotas.append({"Demanda": 0, "Custo": 0, "Consumidores": [0]})
+
+    return rotas
+
+class BufferRotas:
+    """
+    Rotas de um episódio em listas pré-alocadas e reutilizadas a cada época: sequência de visitas com o veículo de cada
+    visita e, por rota, a demanda, o custo e o último estado. As rotas no formato de CriaRotas são geradas somente no final.
+    
+    Atributos:
+        Demanda: Demanda de cada rota
+        Custo: Custo de cada rota
+        Ultimo: Último estado de cada rota
+        Quantidade: Quantidade de rotas em uso
+        Total: Custo acumulado do episódio, atualizado a cada passo
+        Excedidas: Quantidade de rotas cuja demanda excede a capacidade, atualizada a cada passo
+    """
+    __slots__ = ("Demanda", "Custo", "Ultimo", "Quantidade", "Total", "Excedidas", "ordem", "veiculos", "passos")
+    
+    def __init__(self, maximoRotas, maximoPassos):
+        """
+        Entrada:
+            maximoRotas: Quantidade máxima de rotas (veículos)
+            maximoPassos: Quantidade máxima de visitas no episódio, incluindo os retornos ao depósito
+        """
+        self.Demanda = [0]*maximoRotas
+        self.Custo = [0.0]*maximoRotas
+        self.Ultimo = [0]*maximoRotas
+        self.ordem = [0]*maximoPassos
+        self.veiculos = [0]*maximoPassos
+        self.Quantidade = 0
+        self.Total = 0.0
+        self.Excedidas = 0
+        self.passos = 0
+    
+    def Reinicia(self, quantidadeRotas):
+        """
+        Reinicia as rotas no próprio lugar, todas partindo do depósito
+        
+        Entrada:
+            quantidadeRotas: Quantidade de rotas iniciais
+        """
+        for rota in range(quantidadeRotas):
+            self.Demanda[rota] = 0
+            self.Custo[rota] = 0.0
+            self.Ultimo[rota] = 0
+        self.Quantidade = quantidadeRotas
+        self.Total = 0.0
+        self.Excedidas = 0
+        self.passos = 0
+    
+    def NovaRota(self):
+        """
+        Inicia uma nova rota partindo do depósito (veículos dinâmicos)
+        
+        Retorno:
+            Posição (index) da nova rota
+        """
+        rota = self.Quantidade
+        self.Demanda[rota] = 0
+        self.Custo[rota] = 0.0
+        self.Ultimo[rota] = 0
+        self.Quantidade += 1
+        
+        return rota
+    
+    def Atualiza(self, rota, acao, ambiente):
+        """
+        Adiciona a ação ao final da rota, atualizando o custo e a demanda da rota e o custo e a validade do episódio
+        
+        Entrada:
+            rota: Posição da rota
+            acao: Posição da ação atual
+            ambiente: Informações sobre o ambiente
+            
+        Retorno:
+            Distância euclidiana entre o último estado da rota e a ação
+        """
+        distancia = float(ambiente["Distancias"][self.Ultimo[rota], acao])
+        demanda = self.Demanda[rota] + ambiente["Estados"][acao]["Demanda"]
+        
+        # A rota passa a exceder a capacidade
+        if (demanda > ambiente["Capacidade"] >= self.Demanda[rota]):
+            self.Excedidas += 1
+        
+        self.Custo[rota] = self.Custo[rota] + distancia
+        self.Demanda[rota] = demanda
+        self.Total += distancia
+        self.Ultimo[rota] = acao
+        self.ordem[self.passos] = acao
+        self.veiculos[self.passos] = rota
+        self.passos += 1
+        
+        return distancia
+    
+    def CopiaDe(self, outro):
+        """
+        Copia, no próprio lugar, as rotas de outro buffer (ex.: ao encontrar uma nova menor distância)
+        
+        Entrada:
+            outro: Buffer de rotas a ser copiado
+        """
+        self.Demanda[:] = outro.Demanda
+        self.Custo[:] = outro.Custo
+        self.Ultimo[:] = outro.Ultimo
+        self.ordem[:outro.passos] = outro.ordem[:outro.passos]
+        self.veiculos[:outro.passos] = outro.veiculos[:outro.passos]
+        self.Quantidade = outro.Quantidade
+        self.Total = outro.Total
+        self.Excedidas = outro.Excedidas
+        self.passos = outro.passos
+    
+    def Invalida(self, ambiente):
+        """
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            
+        Retorno:
+            Se alguma rota excede a capacidade ou se há mais rotas que veículos
+        """
+        return self.Excedidas != 0 or self.Quantidade > ambiente["Veiculos"]
+    
+    def Distancia(self, ambiente):
+        """
+        Distância total das rotas, somando o custo de cada rota (a mesma soma, na mesma ordem, de antes do custo
+        acumulado, para que os resultados não mudem)
+        
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            
+        Retorno:
+            Distância total das rotas, infinita se inválida (Invalida)
+        """
+        if (self.Invalida(ambiente)):
+            return float('inf')
+        
+        distanciaTotal = 0
+        for rota in range(self.Quantidade):
+            distanciaTotal = distanciaTotal + self.Custo[rota]
+        
+        return distanciaTotal
+    
+    def Refaz(self, ordem, veiculos, quantidadeRotas, ambiente):
+        """
+        Reconstrói as rotas repetindo a sequência de visitas (ex.: ao retomar um treinamento)
+        
+        Entrada:
+            ordem: Sequência de visitas
+            veiculos: Rota de cada visita
+            quantidadeRotas: Quantidade de rotas
+            ambiente: Informações sobre o ambiente
+        """
+        self.Reinicia(quantidadeRotas)
+        
+        for acao, rota in zip(ordem, veiculos):
+            self.Atualiza(rota, acao, ambiente)
+    
+    def ParaLista(self, ambiente):
+        """
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            
+        Retorno:
+            Lista de rotas no mesmo formato de CriaRotas
+        """
+        rotas = CriaRotas(self.Quantidade)
+        
+        for passo in range(self.passos):
+            rota = rotas[self.veiculos[passo]]
+            AtualizaRota(rota, rota["Consumidores"][-1], self.ordem[passo], ambiente)
+        
+        return rotas
+
+class Amostrador:
+    """
+    Gerador de números aleatórios com semente (numpy.random.Generator), os números uniformes em [0, 1) são
+    sorteados em lotes para que cada consulta custe O(1).
+    """
+    __slots__ = ("gerador", "tamanhoLote", "lote", "posicao")
+    
+    def __init__(self, semente = None, tamanhoLote = 4096):
+        """
+        Entrada:
+            semente: Semente do gerador, None para uma semente aleatória
+            tamanhoLote: Quantidade de números sorteados por lote
+        """
+        self.gerador = numpy.random.default_rng(semente)
+        self.tamanhoLote = tamanhoLote
+        self.lote = []
+        self.posicao = 0
+    
+    def Uniforme(self):
+        """
+        Retorno:
+            Próximo número uniforme em [0, 1)
+        """
+        if self.posicao == len(self.lote):
+            self.lote = self.gerador.random(self.tamanhoLote).tolist()
+            self.posicao = 0
+        
+        valor = self.lote[self.posicao]
+        self.posicao += 1
+        
+        return valor
+    
+    def Proximos(self, quantidade):
+        """
+        Entrada:
+            quantidade: Quantidade de números a serem consumidos
+            
+        Retorno:
+            Vetor com os próximos números uniformes em [0, 1), na mesma sequência de Uniforme()
+        """
+        restantes = self.lote[self.posicao:]
+        self.lote = []
+        self.posicao = 0
+        
+        if quantidade <= len(restantes):
+            self.Devolve(numpy.array(restantes[quantidade:]))
+            return numpy.array(restantes[:quantidade])
+        
+        return numpy.concatenate((numpy.array(restantes), self.gerador.random(quantidade - len(restantes))))
+    
+    def Estado(self):
+        """
+        Retorno:
+            Estado do gerador e vetor dos números já sorteados e ainda não consumidos
+        """
+        return self.gerador.bit_generator.state, numpy.array(self.lote[self.posicao:], dtype=numpy.float64)
+    
+    def Restaura(self, estadoGerador, pendentes):
+        """
+        Restaura o estado obtido por Estado(), continuando a mesma sequência de números
+        
+        Entrada:
+            estadoGerador: Estado do gerador
+            pendentes: Números sorteados e ainda não consumidos
+        """
+        self.gerador.bit_generator.state = estadoGerador
+        self.lote = numpy.asarray(pendentes).tolist()
+        self.posicao = 0
+    
+    def Devolve(self, naoUsados):
+        """
+        Devolve números não consumidos para o início da sequência
+        
+        Entrada:
+            naoUsados: Vetor de números obtidos por Proximos() e não consumidos
+        """
+        self.lote = naoUsados.tolist() + self.lote[self.posicao:]
+        self.posicao = 0
+
+class Episodio:
+    """
+    Estado de um episódio, atualizado incrementalmente (O(1) amortizado) a cada visita: máscara e lista compacta das
+    ações válidas, quantidade de estados restantes e, no caso de veículos dinâmicos, a viabilidade de capacidade da
+    rota atual.
+    
+    Atributos:
+        Mascara: Vetor booleano das ações válidas (aberto e, se veículos dinâmicos, viável pela capacidade)
+        Restantes: Quantidade de estados abertos, incluindo o depósito quando aberto
+        Validas: Quantidade de ações válidas
+        DemandaRota: Demanda acumulada pela rota atual
+    """
+    __slots__ = ("Mascara", "Restantes", "DemandaRota", "abertos", "indices", "posicao", "demandas", "capacidade", "ordemDemanda", "cursor", "VeiculosDinamicos")
+    
+    def __init__(self, ambiente, VeiculosDinamicos):
+        """
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            VeiculosDinamicos: Condição para considerar se a demanda não torna a rota inválida
+        """
+        quantidadeEstados = len(ambiente["Demandas"])
+        
+        # Estado inicial do ambiente (depósito) já visitado
+        self.abertos = numpy.ones(quantidadeEstados, dtype=bool)
+        self.abertos[0] = False
+        self.Mascara = self.abertos.copy()
+        self.Restantes = quantidadeEstados - 1
+        
+        self.demandas = ambiente["Demandas"]
+        self.capacidade = ambiente["Capacidade"]
+        self.ordemDemanda = ambiente["OrdemDemanda"]
+        self.cursor = 0
+        self.DemandaRota = 0
+        self.VeiculosDinamicos = VeiculosDinamicos
+        
+        self.CompactaValidas()
+        self.AtualizaViabilidade()
+    
+    @property
+    def Validas(self):
+        return len(self.indices)
+    
+    def CompactaValidas(self):
+        """
+        Reconstrói a lista compacta das ações válidas (indices) e a posição de cada ação nela a partir da máscara
+        """
+        self.indices = numpy.flatnonzero(self.Mascara).tolist()
+        posicao = numpy.zeros(len(self.Mascara), dtype=numpy.int64)
+        posicao[self.indices] = numpy.arange(len(self.indices))
+        self.posicao = posicao.tolist()
+    
+    def Invalida(self, estado):
+        """
+        Remove a ação da máscara e da lista compacta (troca com a última posição)
+        
+        Entrada:
+            estado: Posição da ação a ser invalidada
+        """
+        if self.Mascara[estado]:
+            self.Mascara[estado] = False
+            posicao = self.posicao[estado]
+            ultimo = self.indices.pop()
+            if ultimo != estado:
+                self.indices[posicao] = ultimo
+                self.posicao[ultimo] = posicao
+    
+    def SorteiaAcao(self, uniforme):
+        """
+        Sorteia uma ação válida com probabilidade uniforme
+        
+        Entrada:
+            uniforme: Número uniforme em [0, 1)
+            
+        Retorno:
+            Posição (index) da ação sorteada
+        """
+        return self.indices[int(uniforme*len(self.indices))]
+    
+    def Visita(self, estado):
+        """
+        Marca o estado como visitado para não ser escolhido de novo
+        
+        Entrada:
+            estado: Posição do estado visitado
+        """
+        if self.abertos[estado]:
+            self.abertos[estado] = False
+            self.Restantes -= 1
+        
+        self.Invalida(estado)
+    
+    def AbreDeposito(self):
+        """
+        Permite o retorno ao depósito (veículos dinâmicos)
+        """
+        if not self.abertos[0]:
+            self.abertos[0] = True
+            self.Mascara[0] = True
+            self.Restantes += 1
+            self.posicao[0] = len(self.indices)
+            self.indices.append(0)
+    
+    def AdicionaDemanda(self, demanda):
+        """
+        Acumula a demanda na rota atual e invalida os estados que passam a exceder a capacidade
+        
+        Entrada:
+            demanda: Demanda do estado adicionado à rota
+        """
+        self.DemandaRota = self.DemandaRota + demanda
+        self.AtualizaViabilidade()
+    
+    def AtualizaViabilidade(self):
+        """
+        Avança o cursor sobre os estados ordenados por demanda decrescente, invalidando os que excedem a capacidade
+        """
+        if not self.VeiculosDinamicos:
+            return
+        
+        folga = self.capacidade - self.DemandaRota
+        while (self.cursor < len(self.ordemDemanda) and self.demandas[self.ordemDemanda[self.cursor]] > folga):
+            self.Invalida(self.ordemDemanda[self.cursor])
+            self.cursor += 1
+    
+    def NovaRota(self):
+        """
+        Inicia uma nova rota, restaurando a viabilidade dos estados abertos
+        """
+        invalidados = self.ordemDemanda[:self.cursor]
+        self.Mascara[invalidados] = self.abertos[invalidados]
+        self.cursor = 0
+        self.DemandaRota = 0
+        
+        self.CompactaValidas()
+        self.AtualizaViabilidade()
+
+def AtualizaRota(rotaAtual, estado, acao, ambiente):
+    """
+    Obtém a distância euclidiana entre o estado e acão na matriz de distâncias, além disso atualiza o custo, a demanda e a lista visitados da rota
+    
+    Entrada:
+        rotaAtual: Rota atual para ser atualizada
+        estado: Posição do estado atual
+        acao: Posição da ação atual
+        ambiente: Informações sobre o ambiente
+        
+    Retorno:
+        Rota atualizada e a distância euclidiana
+    """
+    # Distância euclidiana pré-calculada entre dois pontos
+    distancia = float(ambiente["Distancias"][estado, acao])
+    
+    # Atualiza o custo da rota
+    rotaAtual["Custo"] = rotaAtual["Custo"] + distancia
+    
+    # Atualiza a demanda da rota
+    rotaAtual["Demanda"] = rotaAtual["Demanda"] + ambiente["Estados"][acao]["Demanda"]
+    
+    # Atualiza a sequência de consumidores da rota
+    rotaAtual["Consumidores"].append(acao)
+
+    return rotaAtual, distancia
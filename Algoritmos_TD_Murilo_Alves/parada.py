@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Critérios de parada antecipada do treinamento
+
+@author: Murilo Alves
+"""
+
+import time
+
+import numpy
+
+from .ambiente import Otimos
+
+class CriterioParada:
+    """
+    Critérios de parada antecipada, avaliados ao fim de cada época (ou de cada bloco de épocas no núcleo compilado).
+    O treinamento para no primeiro critério atendido ou ao completar as épocas pedidas ao método; com um tempo máximo,
+    as épocas podem ser um limite alto (ex.: 10**6) para que o orçamento de tempo decida a duração.
+
+    Atributos:
+        Motivo: Motivo da parada (EPOCAS, PACIENCIA, CONVERGENCIA, TEMPO ou GAP)
+        Epocas: Quantidade de épocas executadas
+        Tempo: Tempo de treinamento em segundos
+    """
+    EPOCAS = "epocas"             # Todas as épocas foram executadas
+    PACIENCIA = "paciencia"       # Menor distância sem melhora por 'paciencia' épocas
+    CONVERGENCIA = "convergencia" # Variação de Q abaixo de 'limiarQ'
+    TEMPO = "tempo"               # Tempo máximo atingido
+    GAP = "gap"                   # Gap em relação ao ótimo atingido
+
+    __slots__ = ("paciencia", "limiarQ", "intervaloQ", "tempoMaximo", "otimo", "gapAlvo", "Motivo", "Epocas", "Tempo",
+                 "inicio", "limiteDistancia", "epocaMelhora", "melhorDistancia", "epocaQ", "matrizes", "anteriores")
+
+    def __init__(self, paciencia = None, limiarQ = None, intervaloQ = 50, tempoMaximo = None, otimo = None, gapAlvo = None):
+        """
+        Entrada:
+            paciencia: Épocas seguidas sem melhora da menor distância, None para desabilitar
+            limiarQ: Maior variação absoluta de Q(s,a) entre duas verificações para considerar convergido, None para desabilitar
+            intervaloQ: Épocas entre as verificações da variação de Q
+            tempoMaximo: Tempo máximo de treinamento em segundos, None para desabilitar
+            otimo: Distância ótima, None para usar Otimos() pelo nome da instância
+            gapAlvo: Gap (%) em relação ao ótimo que encerra o treinamento, None para desabilitar
+        """
+        self.paciencia = paciencia
+        self.limiarQ = limiarQ
+        self.intervaloQ = intervaloQ
+        self.tempoMaximo = tempoMaximo
+        self.otimo = otimo
+        self.gapAlvo = gapAlvo
+        self.Motivo = None
+        self.Epocas = 0
+        self.Tempo = 0.0
+
+    def Inicia(self, ambiente, *matrizes, epocaInicial = 0):
+        """
+        Reinicia os critérios no começo do treinamento
+
+        Entrada:
+            ambiente: Informações sobre o ambiente
+            matrizes: Matrizes Q(s,a) do método, usadas na variação de Q
+            epocaInicial: Quantidade de épocas já executadas (treinamento retomado)
+        """
+        self.Motivo = CriterioParada.EPOCAS
+        self.Epocas = epocaInicial
+        self.Tempo = 0.0
+        self.inicio = time.perf_counter()
+        self.epocaMelhora = epocaInicial
+        self.melhorDistancia = float('inf')
+        self.epocaQ = epocaInicial
+
+        otimo = self.otimo if self.otimo is not None else Otimos().get(ambiente["Nome"])
+        self.limiteDistancia = otimo*(1 + self.gapAlvo/100) if (self.gapAlvo is not None and otimo is not None) else None
+
+        self.matrizes = matrizes
+        self.anteriores = [matriz.copy() for matriz in matrizes] if self.limiarQ is not None else None
+
+    def Para(self, epocas, menorDistancia):
+        """
+        Avalia os critérios ao fim de uma época
+
+        Entrada:
+            epocas: Quantidade de épocas executadas
+            menorDistancia: Menor distância encontrada até o momento
+
+        Retorno:
+            True se o treinamento deve parar
+        """
+        self.Epocas = epocas
+        self.Tempo = time.perf_counter() - self.inicio
+
+        if (menorDistancia < self.melhorDistancia):
+            self.melhorDistancia = menorDistancia
+            self.epocaMelhora = epocas
+
+        if (self.limiteDistancia is not None and menorDistancia <= self.limiteDistancia):
+            self.Motivo = CriterioParada.GAP
+        elif (self.paciencia is not None and epocas - self.epocaMelhora >= self.paciencia):
+            self.Motivo = CriterioParada.PACIENCIA
+        elif (self.tempoMaximo is not None and self.Tempo >= self.tempoMaximo):
+            self.Motivo = CriterioParada.TEMPO
+        elif (self.anteriores is not None and epocas - self.epocaQ >= self.intervaloQ and self.VariacaoQ(epocas) < self.limiarQ):
+            self.Motivo = CriterioParada.CONVERGENCIA
+        else:
+            return False
+
+        return True
+
+    def VariacaoQ(self, epocas):
+        """
+        Maior variação absoluta de Q(s,a) desde a verificação anterior, guardando as matrizes atuais para a próxima
+
+        Entrada:
+            epocas: Quantidade de épocas executadas
+
+        Retorno:
+            Maior variação absoluta entre as matrizes
+        """
+        variacao = 0.0
+        for matriz, anterior in zip(self.matrizes, self.anteriores):
+            variacao = max(variacao, float(numpy.abs(matriz - anterior).max()))
+            numpy.copyto(anterior, matriz)
+        self.epocaQ = epocas
+
+        return variacao
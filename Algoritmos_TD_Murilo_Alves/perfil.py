@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+Perfil do treinamento: tempo por fase (escolha do veículo, validação das ações, política, atualização da rota, TD,
+retorno ao depósito, ...) e contadores, exportados em JSON e no formato de pilhas "dobradas" dos flamegraphs
+(flamegraph.pl, speedscope, inferno).
+
+As fases são medidas substituindo, somente durante Perfil.Executa, as funções e métodos dos módulos por versões
+cronometradas. Fora dele o código dos métodos é o mesmo e não há custo algum. O custo de cada chamada cronometrada é
+medido no início e descontado do tempo próprio da fase que a chamou, mas as fases muito curtas continuam aproximadas.
+
+@author: Murilo Alves
+"""
+
+import json
+import time
+
+from . import candidatos, experiencias, metodos, nucleo
+
+# Fases cronometradas: "módulo.função" ou "módulo.Classe.método" -> nome da fase. Um nome que não existe mais (ex.:
+# função renomeada) gera AttributeError em Perfil.Executa, em vez de sumir do perfil.
+FASES = {
+    "nucleo.EscolheRota": "EscolheRota",
+    "nucleo.DespachoMenorDemanda.Reinicia": "EscolheRota",
+    "nucleo.DespachoMenorDemanda.Escolhe": "EscolheRota",
+    "nucleo.DespachoMenorDemanda.Atualiza": "EscolheRota",
+    "nucleo.DespachoCircular.Reinicia": "EscolheRota",
+    "nucleo.DespachoCircular.Escolhe": "EscolheRota",
+    "nucleo.DespachoCircular.Atualiza": "EscolheRota",
+    "nucleo.ValidaAcoes": "ValidaAcoes",
+    "nucleo.Politica": "Politica",
+    "nucleo.MaxQ": "MaxQ",
+    "nucleo.MaxQDouble": "MaxQ",
+    "candidatos.MaxQColunas": "MaxQ",
+    "nucleo.Recompensa": "Recompensa",
+    "nucleo.AtualizaQ": "AtualizaQ",
+    "nucleo.RetornoDeposito": "RetornoDeposito",
+    "nucleo.RetornoDepositoDouble": "RetornoDeposito",
+    "nucleo.BufferRotas.Atualiza": "AtualizaRota",
+    "nucleo.BufferRotas.NovaRota": "AtualizaRota",
+    "nucleo.Episodio.__init__": "Episodio",
+    "nucleo.Episodio.Visita": "Episodio",
+    "nucleo.Episodio.AbreDeposito": "Episodio",
+    "nucleo.Episodio.AdicionaDemanda": "Episodio",
+    "nucleo.Episodio.NovaRota": "Episodio",
+    "candidatos.EpisodioCandidatos.__init__": "Episodio",
+    "candidatos.EpisodioCandidatos.Visita": "Episodio",
+    "candidatos.EpisodioCandidatos.Colunas": "ValidaAcoes",
+    "candidatos.EpisodioCandidatos.MaisProxima": "ValidaAcoes",
+    "candidatos.EpisodioCandidatos.SorteiaColuna": "Politica",
+    "experiencias.BufferExperiencias.Adiciona": "Experiencias",
+    "experiencias.BufferExperiencias.Reproduz": "Experiencias",
+}
+
+# Chamadas contadas (sem cronometrar, se não estiverem em FASES): nome -> contador interno
+CONTAGENS = {
+    "nucleo.BufferRotas.Atualiza": "Passos",
+    "nucleo.Politica": "Politicas",
+    "nucleo.Episodio.SorteiaAcao": "Sorteios",
+    "candidatos.EpisodioCandidatos.SorteiaColuna": "SorteiosColunas",
+}
+
+# Módulos cujas referências às funções são substituídas
+MODULOS = {"nucleo": nucleo, "metodos": metodos, "candidatos": candidatos, "experiencias": experiencias}
+
+def Localiza(nome):
+    """
+    Entrada:
+        nome: "módulo.função" ou "módulo.Classe.método"
+
+    Retorno:
+        Dono (módulo ou classe), nome do atributo e a função original. Gera KeyError (módulo) ou AttributeError (função,
+        classe ou método inexistente, ou método herdado, que não pode ser substituído na própria classe).
+    """
+    partes = nome.split(".")
+    dono = MODULOS[partes[0]]
+    for parte in partes[1:-1]:
+        dono = getattr(dono, parte)
+    original = getattr(dono, partes[-1])
+    if isinstance(dono, type) and partes[-1] not in vars(dono):
+        raise AttributeError("%s: %s é herdado, não definido em %s" % (nome, partes[-1], dono.__name__))
+
+    return dono, partes[-1], original
+
+class _No:
+    """
+    Nó da árvore de chamadas das fases
+    """
+    __slots__ = ("nome", "filhos", "chamadas", "tempo")
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.filhos = {}
+        self.chamadas = 0
+        self.tempo = 0.0
+
+    def Filho(self, nome):
+        no = self.filhos[nome] = _No(nome)
+        return no
+
+class Perfil:
+    """
+    Tempo por fase e contadores de uma execução de um método. As fases formam uma árvore de chamadas (ex.: MaxQ dentro
+    de Politica), e o tempo próprio de uma fase exclui o das fases internas.
+
+    Atributos:
+        Metodo: Nome do método executado
+        Tempo: Tempo total da execução em segundos
+        Sobrecarga: Custo estimado de cada chamada cronometrada em segundos
+        Contadores: Passos (visitas a consumidores, sem os retornos ao depósito, como PassosPorSegundo em
+                    Desempenho.py), explorações e aproveitamentos (política), épocas, épocas inválidas e novas menores
+                    distâncias (da exploração, sem a busca local). No modo candidatos só as explorações são contadas.
+    """
+    __slots__ = ("Metodo", "Tempo", "Sobrecarga", "Contadores", "raiz", "atual", "resultados", "menorDistancia", "originais",
+                 "chamadas")
+
+    def __init__(self):
+        self.Metodo = None
+        self.Tempo = 0.0
+        self.Sobrecarga = 0.0
+        self.Contadores = {"Passos": 0, "Exploracoes": 0, "Aproveitamentos": 0, "Epocas": 0, "EpocasInvalidas": 0, "NovasMenores": 0}
+        self.raiz = None
+        self.atual = None
+        self.resultados = None
+        self.menorDistancia = float('inf')
+        self.originais = []
+        self.chamadas = dict.fromkeys(CONTAGENS.values(), 0)
+
+    def Executa(self, metodo, ambiente, *argumentos, **opcoes):
+        """
+        Executa o método com as fases cronometradas. As distâncias por época passam pelo perfil (contadores por época)
+        antes de chegar ao coletor 'resultados' de 'opcoes', se houver.
+
+        Entrada:
+            metodo: Método (ex.: Q_Learning_VeiculosFixos)
+            ambiente, argumentos, opcoes: Argumentos do método
+
+        Retorno:
+            Retorno do método, com o coletor de resultados original
+        """
+        self.Metodo = metodo.__name__
+        self.resultados = opcoes.get("resultados")
+        if (self.resultados is None):
+            self.resultados = []
+        opcoes["resultados"] = self
+
+        self.Sobrecarga = self.Calibra()
+        self.raiz = self.atual = _No(self.Metodo)
+        self.chamadas = dict.fromkeys(CONTAGENS.values(), 0)
+        self.Instala()
+        inicio = time.perf_counter()
+        try:
+            menorDistancia, menorRotas, _ = metodo(ambiente, *argumentos, **opcoes)
+        finally:
+            self.Tempo = time.perf_counter() - inicio
+            self.Restaura()
+            self.Conta()
+        self.raiz.chamadas = 1
+        self.raiz.tempo = self.Tempo
+
+        return menorDistancia, menorRotas, self.resultados
+
+    def Cronometra(self, nome, funcao):
+        """
+        Entrada:
+            nome: Nome da fase
+            funcao: Função ou método original
+
+        Retorno:
+            Função que executa a original como uma fase
+        """
+        perfil = self
+        relogio = time.perf_counter
+
+        def Cronometrada(*argumentos, **opcoes):
+            pai = perfil.atual
+            no = pai.filhos.get(nome)
+            if no is None:
+                no = pai.Filho(nome)
+            perfil.atual = no
+            inicio = relogio()
+            try:
+                return funcao(*argumentos, **opcoes)
+            finally:
+                no.tempo += relogio() - inicio
+                no.chamadas += 1
+                perfil.atual = pai
+
+        return Cronometrada
+
+    def Calibra(self, chamadas = 20000):
+        """
+        Retorno:
+            Custo médio, em segundos, de uma chamada cronometrada além da chamada da própria função
+        """
+        def Vazia():
+            return None
+
+        raiz = self.atual = _No("Calibracao")
+        cronometrada = self.Cronometra("Vazia", Vazia)
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            Vazia()
+        direta = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            cronometrada()
+        total = time.perf_counter() - inicio
+        self.atual = None
+
+        # O tempo medido dentro da fase já é atribuído a ela
+        return max(0.0, (total - direta - raiz.filhos["Vazia"].tempo)/chamadas)
+
+    def Instala(self):
+        """
+        Substitui as funções e métodos de FASES e CONTAGENS por versões cronometradas e/ou contadas, que chamam as
+        originais. Uma função é substituída no módulo em que foi definida e em cada módulo de MODULOS que a importou.
+        """
+        chamadas = self.chamadas
+
+        def Contada(funcao, contador):
+            def FuncaoContada(*argumentos):
+                chamadas[contador] += 1
+                return funcao(*argumentos)
+            return FuncaoContada
+
+        def PassoContado(funcao):
+            def Atualiza(rotas, rota, acao, ambiente):
+                if (acao != 0): # Visita a um consumidor
+                    chamadas["Passos"] += 1
+                return funcao(rotas, rota, acao, ambiente)
+            return Atualiza
+
+        # Todos os nomes são localizados antes da primeira substituição
+        localizados = [(nome, Localiza(nome)) for nome in dict.fromkeys(list(CONTAGENS) + list(FASES))]
+
+        for nome, (dono, atributo, original) in localizados:
+            funcao = original
+            if (nome == "nucleo.BufferRotas.Atualiza"):
+                funcao = PassoContado(funcao)
+            elif nome in CONTAGENS:
+                funcao = Contada(funcao, CONTAGENS[nome])
+            if nome in FASES:
+                funcao = self.Cronometra(FASES[nome], funcao)
+
+            if isinstance(dono, type):
+                self.Substitui(dono, atributo, funcao)
+            else:
+                for modulo in MODULOS.values():
+                    if (modulo.__dict__.get(atributo) is original):
+                        self.Substitui(modulo, atributo, funcao)
+
+    def Conta(self):
+        """
+        Contadores da política a partir das chamadas contadas: toda chamada de Politica que não sorteia uma ação é um
+        aproveitamento, e no modo candidatos (sem Politica) só os sorteios de colunas são contados
+        """
+        self.Contadores["Passos"] = self.chamadas["Passos"]
+        self.Contadores["Exploracoes"] = self.chamadas["Sorteios"] + self.chamadas["SorteiosColunas"]
+        self.Contadores["Aproveitamentos"] = self.chamadas["Politicas"] - self.chamadas["Sorteios"]
+
+    def Substitui(self, dono, atributo, valor):
+        self.originais.append((dono, atributo, dono.__dict__[atributo]))
+        setattr(dono, atributo, valor)
+
+    def Restaura(self):
+        """
+        Restaura as funções e métodos originais
+        """
+        while (self.originais):
+            dono, atributo, original = self.originais.pop()
+            setattr(dono, atributo, original)
+
+    # Coletor das distâncias por época (ver resultados.py)
+    def append(self, distancia):
+        self.Contadores["Epocas"] += 1
+        if (distancia == float('inf')):
+            self.Contadores["EpocasInvalidas"] += 1
+        if (distancia < self.menorDistancia):
+            self.menorDistancia = distancia
+            self.Contadores["NovasMenores"] += 1
+        self.resultados.append(distancia)
+
+    def extend(self, distancias):
+        for distancia in distancias:
+            self.append(distancia)
+
+    def Pilhas(self):
+        """
+        Retorno:
+            Lista de (pilha de fases, chamadas, tempo total, tempo próprio), com a sobrecarga das chamadas internas
+            descontada do tempo próprio
+        """
+        pilhas = []
+        pendentes = [((self.raiz.nome,), self.raiz)]
+        while (pendentes):
+            pilha, no = pendentes.pop()
+            internas = sum(filho.tempo for filho in no.filhos.values())
+            chamadasInternas = sum(filho.chamadas for filho in no.filhos.values())
+            proprio = max(0.0, no.tempo - internas - chamadasInternas*self.Sobrecarga)
+            pilhas.append((pilha, no.chamadas, no.tempo, proprio))
+            pendentes.extend((pilha + (nome,), filho) for nome, filho in no.filhos.items())
+
+        return pilhas
+
+    def Dicionario(self):
+        """
+        Retorno:
+            Perfil em um dicionário serializável em JSON, com as fases da mais para a menos demorada (tempo próprio)
+        """
+        fases = {}
+        for pilha, chamadas, total, proprio in self.Pilhas():
+            fase = fases.setdefault(pilha[-1], [0, 0.0, 0.0])
+            fase[0] += chamadas
+            fase[1] += total if pilha[-1] not in pilha[:-1] else 0.0
+            fase[2] += proprio
+        chamadasCronometradas = sum(fase[0] for fase in fases.values()) - 1
+
+        return {"Metodo": self.Metodo, "Tempo": self.Tempo, "Sobrecarga": chamadasCronometradas*self.Sobrecarga,
+                "Contadores": dict(self.Contadores),
+                "Fases": {nome: {"Chamadas": chamadas, "Tempo": total, "TempoProprio": proprio, "Fracao": proprio/self.Tempo if self.Tempo else 0.0}
+                          for nome, (chamadas, total, proprio) in sorted(fases.items(), key=lambda item: item[1][2], reverse=True)}}
+
+    def GravaJSON(self, caminho):
+        with open(caminho, 'w') as fh:
+            json.dump(self.Dicionario(), fh, indent=2)
+
+    def GravaFlamegraph(self, caminho):
+        """
+        Grava as pilhas de fases no formato dobrado ("Metodo;Fase;Subfase microssegundos" por linha, tempo próprio)
+
+        Entrada:
+            caminho: Caminho do arquivo
+        """
+        with open(caminho, 'w') as fh:
+            for pilha, _, _, proprio in sorted(self.Pilhas()):
+                fh.write("%s %d\n" % (";".join(pilha), round(proprio*1e6)))
+
+    def Exibe(self):
+        """
+        Exibe o tempo próprio de cada fase e os contadores
+        """
+        dicionario = self.Dicionario()
+        print("Perfil: ", self.Metodo, " Tempo: ", round(self.Tempo, 3), " Sobrecarga estimada: ", round(dicionario["Sobrecarga"], 3))
+        for nome, fase in dicionario["Fases"].items():
+            print("  %-32s %10d chamadas %9.3f s %6.1f%%" % (nome, fase["Chamadas"], fase["TempoProprio"], 100*fase["Fracao"]))
+        print("  " + ", ".join("%s: %d" % item for item in self.Contadores.items()))
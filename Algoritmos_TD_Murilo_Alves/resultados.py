@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Coletores dos resultados por época
+
+@author: Murilo Alves
+"""
+
+import os
+
+import numpy
+
+class EstatisticasOnline:
+    """
+    Coletor das distâncias por época com agregados online, sem guardar todos os valores: mínimo, média e variância
+    (Welford) das épocas válidas, curva da melhor distância (somente nas melhorias) e uma série amostrada com no máximo
+    tamanhoSerie pontos (o passo dobra quando a série enche).
+    
+    Atributos:
+        Epocas: Quantidade de épocas coletadas
+        Invalidas: Quantidade de épocas com distância infinita (inválidas)
+        Minimo: Menor distância
+        Media: Média das distâncias válidas
+        MelhorCurva: Lista de (época, distância) em que a menor distância melhorou
+        Serie: Distâncias das épocas 0, PassoSerie, 2*PassoSerie, ...
+        PassoSerie: Intervalo de épocas entre os pontos da série
+    """
+    __slots__ = ("Epocas", "Invalidas", "Minimo", "Media", "m2", "MelhorCurva", "Serie", "PassoSerie", "tamanhoSerie")
+    
+    def __init__(self, tamanhoSerie = 1024):
+        """
+        Entrada:
+            tamanhoSerie: Quantidade máxima de pontos da série amostrada
+        """
+        self.Epocas = 0
+        self.Invalidas = 0
+        self.Minimo = float('inf')
+        self.Media = 0.0
+        self.m2 = 0.0
+        self.MelhorCurva = []
+        self.Serie = []
+        self.PassoSerie = 1
+        self.tamanhoSerie = tamanhoSerie
+    
+    def append(self, distancia):
+        """
+        Entrada:
+            distancia: Distância total da época
+        """
+        if (self.Epocas % self.PassoSerie == 0):
+            self.Serie.append(distancia)
+            if (len(self.Serie) == self.tamanhoSerie):
+                del self.Serie[1::2]
+                self.PassoSerie = self.PassoSerie*2
+        
+        if (distancia < self.Minimo or self.Epocas == 0):
+            self.Minimo = distancia
+            self.MelhorCurva.append((self.Epocas, distancia))
+        
+        if (distancia == float('inf')):
+            self.Invalidas += 1
+        else:
+            validas = self.Epocas - self.Invalidas + 1
+            delta = distancia - self.Media
+            self.Media = self.Media + delta/validas
+            self.m2 = self.m2 + delta*(distancia - self.Media)
+        
+        self.Epocas += 1
+    
+    def extend(self, distancias):
+        for distancia in distancias:
+            self.append(distancia)
+    
+    @property
+    def Variancia(self):
+        """
+        Variância populacional das distâncias válidas
+        """
+        validas = self.Epocas - self.Invalidas
+        
+        return self.m2/validas if validas > 0 else float('nan')
+    
+    def EpocasSerie(self):
+        """
+        Retorno:
+            Épocas correspondentes aos pontos da série
+        """
+        return list(range(0, len(self.Serie)*self.PassoSerie, self.PassoSerie))
+
+class VetorResultados:
+    """
+    Coletor das distâncias por época em um vetor NumPy pré-alocado
+    
+    Atributos:
+        Valores: Vetor com as distâncias coletadas
+    """
+    __slots__ = ("vetor", "quantidade")
+    
+    def __init__(self, epocas, tipo = numpy.float64):
+        """
+        Entrada:
+            epocas: Quantidade máxima de épocas
+            tipo: Tipo dos elementos (numpy.float32 reduz a memória pela metade)
+        """
+        self.vetor = numpy.empty(epocas, dtype=tipo)
+        self.quantidade = 0
+    
+    def append(self, distancia):
+        self.vetor[self.quantidade] = distancia
+        self.quantidade += 1
+    
+    def extend(self, distancias):
+        distancias = numpy.asarray(distancias)
+        self.vetor[self.quantidade:self.quantidade + len(distancias)] = distancias
+        self.quantidade += len(distancias)
+    
+    def __len__(self):
+        return self.quantidade
+    
+    @property
+    def Valores(self):
+        return self.vetor[:self.quantidade]
+
+class RegistroBinario:
+    """
+    Coletor das distâncias por época em um arquivo binário (float64) somente de anexação, gravado em blocos.
+    
+    O arquivo é aberto somente na primeira gravação. Ao ser serializado (ex.: devolvido por um processo de
+    ExecutaExperimento), o coletor grava as distâncias em memória e fecha o arquivo; a cópia guarda só o caminho e
+    reabre o arquivo se voltar a coletar.
+    
+    O arquivo não marca o início de cada execução, então um caminho deve receber uma única execução. Em
+    ExecutaExperimento, Tarefa acrescenta ao caminho a instância, o método, a taxa de desconto e a semente de cada
+    execução (ex.: "distancias.bin" -> "distancias.A-n32-k5.m1.d0.1.s123.bin").
+    """
+    __slots__ = ("caminho", "arquivo", "buffer", "tamanhoBuffer")
+    
+    def __init__(self, caminho, tamanhoBuffer = 4096):
+        """
+        Entrada:
+            caminho: Caminho do arquivo, as distâncias são anexadas ao final
+            tamanhoBuffer: Quantidade de distâncias mantidas em memória antes de gravar
+        """
+        self.caminho = caminho
+        self.arquivo = None
+        self.buffer = []
+        self.tamanhoBuffer = tamanhoBuffer
+    
+    def Tarefa(self, tarefa):
+        """
+        Acrescenta a tarefa ao caminho, antes da primeira gravação (chamado por ExecutaTarefa)
+        
+        Entrada:
+            tarefa: Tupla (nome da instância, opção do algoritmo, taxa de desconto, semente)
+        """
+        if (self.arquivo is not None or self.buffer):
+            raise RuntimeError("O caminho do registro não pode mudar depois da primeira distância")
+        nome, opcao, taxaDesconto, semente = tarefa
+        raiz, extensao = os.path.splitext(self.caminho)
+        self.caminho = "%s.%s.m%d.d%g.s%d%s" % (raiz, nome, opcao + 1, taxaDesconto, semente, extensao)
+    
+    def append(self, distancia):
+        self.buffer.append(distancia)
+        if (len(self.buffer) >= self.tamanhoBuffer):
+            self.Grava()
+    
+    def extend(self, distancias):
+        self.buffer.extend(distancias)
+        if (len(self.buffer) >= self.tamanhoBuffer):
+            self.Grava()
+    
+    def Grava(self):
+        """
+        Grava as distâncias em memória no arquivo
+        """
+        if (self.arquivo is None):
+            self.arquivo = open(self.caminho, 'ab')
+        numpy.asarray(self.buffer, dtype=numpy.float64).tofile(self.arquivo)
+        self.arquivo.flush()
+        self.buffer = []
+    
+    def close(self):
+        if (self.buffer):
+            self.Grava()
+        if (self.arquivo is not None):
+            self.arquivo.close()
+            self.arquivo = None
+    
+    def __getstate__(self):
+        self.close()
+        return (self.caminho, self.tamanhoBuffer)
+    
+    def __setstate__(self, estado):
+        self.caminho, self.tamanhoBuffer = estado
+        self.arquivo = None
+        self.buffer = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excecao):
+        self.close()
+    
+    @staticmethod
+    def Ler(caminho):
+        """
+        Entrada:
+            caminho: Caminho do arquivo
+            
+        Retorno:
+            Vetor (mapeado em memória) com as distâncias gravadas
+        """
+        return numpy.memmap(caminho, dtype=numpy.float64, mode='r')
+
+class ChamadaPorEpoca:
+    """
+    Coletor que repassa a distância de cada época para uma função, ex.: para acompanhar o treinamento
+    """
+    __slots__ = ("funcao", "Epocas")
+    
+    def __init__(self, funcao):
+        """
+        Entrada:
+            funcao: Função chamada com (época, distância) a cada época
+        """
+        self.funcao = funcao
+        self.Epocas = 0
+    
+    def append(self, distancia):
+        self.funcao(self.Epocas, distancia)
+        self.Epocas += 1
+    
+    def extend(self, distancias):
+        for distancia in distancias:
+            self.append(distancia)
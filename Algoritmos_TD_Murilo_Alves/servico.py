@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço local de roteirização (asyncio): recebe trabalhos (arquivo da instância ou pontos, método 1 a 4 e orçamento de
+tempo), executa-os em um conjunto limitado de processos com uma fila limitada (contrapressão), publica cada nova menor
+distância durante o treinamento e permite cancelar um trabalho na fila ou em execução.
+
+A API é usada dentro de um programa asyncio (ServicoRotas) ou por um servidor HTTP local, em uma porta ou em um socket
+Unix (IniciaServidor):
+
+    POST   /trabalhos       Submete o trabalho (JSON, com Content-Length), 202 com o identificador ou 503 com a fila
+                            cheia; 411 sem Content-Length
+    GET    /trabalhos/<id>  Eventos do trabalho (JSON por linha) até o resultado final
+    DELETE /trabalhos/<id>  Cancela o trabalho
+
+Uso:
+    python -m Algoritmos_TD_Murilo_Alves.servico --porta 8080 --processos 4
+
+@author: Murilo Alves
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from .ambiente import CriaAmbiente, LerArquivo, MatrizDistancias
+from .experimento import SementeTarefa
+from .metodos import Metodos
+from .parada import CriterioParada
+
+# Estados de um trabalho
+FILA = "fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+CANCELADO = "cancelado"
+ERRO = "erro"
+FINAIS = (CONCLUIDO, CANCELADO, ERRO)
+
+def AmbienteTrabalho(definicao, ambientes = None):
+    """
+    Ambiente de um trabalho, lido do arquivo da instância ou montado a partir dos pontos (depósito na posição 0)
+
+    Entrada:
+        definicao: Dicionário com "Arquivo" (caminho .vrp) ou "Pontos" ({"Coordenadas", "Demandas", "Capacidade" e,
+                   opcionalmente, "Veiculos" e "Nome"})
+        ambientes: Dicionário caminho -> ambiente com os arquivos já lidos, opcional
+
+    Retorno:
+        Informações sobre o ambiente
+    """
+    if (definicao.get("Arquivo") is not None):
+        arquivo = definicao["Arquivo"]
+        if (ambientes is None):
+            return LerArquivo(arquivo)
+        if arquivo not in ambientes:
+            ambientes[arquivo] = LerArquivo(arquivo)
+        return ambientes[arquivo]
+
+    pontos = definicao.get("Pontos")
+    if (pontos is None):
+        raise ValueError("O trabalho precisa de 'Arquivo' ou 'Pontos'")
+    coordenadas = numpy.asarray(pontos["Coordenadas"], dtype=numpy.float64)
+    demandas = numpy.asarray(pontos["Demandas"], dtype=numpy.int64)
+    if (coordenadas.ndim != 2 or coordenadas.shape[1] != 2 or len(coordenadas) != len(demandas)):
+        raise ValueError("'Coordenadas' deve ter um par (x, y) para cada demanda")
+
+    return CriaAmbiente({"Nome": pontos.get("Nome", "pontos"), "Capacidade": pontos["Capacidade"], "Veiculos": pontos.get("Veiculos"),
+                         "Coordenadas": coordenadas, "Demandas": demandas, "Depositos": [0], "Distancias": MatrizDistancias(coordenadas)})
+
+class ParadaServico:
+    """
+    Critérios de parada de um trabalho do serviço: a cada época, publica a menor distância quando ela melhora e para
+    quando o trabalho é cancelado ou quando o critério do trabalho (ex.: orçamento de tempo) é atendido
+
+    Atributos:
+        Motivo: Motivo da parada (ver CriterioParada), CANCELADO quando o trabalho foi cancelado
+        Epocas: Quantidade de épocas executadas
+    """
+    __slots__ = ("criterio", "identificador", "cancelamentos", "posicao", "progresso", "inicio", "menorPublicada", "Motivo", "Epocas")
+
+    def __init__(self, identificador, cancelamentos, posicao, progresso, criterio = None):
+        """
+        Entrada:
+            identificador: Identificador do trabalho
+            cancelamentos: Avisos de cancelamento (multiprocessing.Array), lidos a cada época
+            posicao: Posição do aviso de cancelamento do trabalho
+            progresso: Fila das menores distâncias publicadas (multiprocessing.Queue), None para não publicar
+            criterio: Critérios de parada do trabalho (ex.: CriterioParada), None para somente as épocas
+        """
+        self.criterio = criterio
+        self.identificador = identificador
+        self.cancelamentos = cancelamentos
+        self.posicao = posicao
+        self.progresso = progresso
+        self.Motivo = None
+        self.Epocas = 0
+
+    def Inicia(self, ambiente, *matrizes, epocaInicial = 0):
+        self.Motivo = CriterioParada.EPOCAS
+        self.Epocas = epocaInicial
+        self.inicio = time.perf_counter()
+        self.menorPublicada = float('inf')
+        if (self.criterio is not None):
+            self.criterio.Inicia(ambiente, *matrizes, epocaInicial=epocaInicial)
+
+    def Para(self, epocas, menorDistancia):
+        self.Epocas = epocas
+
+        # Nova menor distância
+        if (menorDistancia < self.menorPublicada):
+            self.menorPublicada = menorDistancia
+            if (self.progresso is not None):
+                self.progresso.put((self.identificador, epocas, menorDistancia, time.perf_counter() - self.inicio))
+
+        if (self.cancelamentos[self.posicao]):
+            self.Motivo = CANCELADO
+            return True
+        if (self.criterio is not None and self.criterio.Para(epocas, menorDistancia)):
+            self.Motivo = self.criterio.Motivo
+            return True
+
+        return False
+
+# Filas, avisos de cancelamento (um por trabalho em execução) e arquivos lidos de cada processo do executor
+_progressoServico = None
+_cancelamentosServico = None
+_ambientesServico = {}
+
+def _IniciaProcessoServico(progresso, cancelamentos):
+    global _progressoServico, _cancelamentosServico
+    _progressoServico = progresso
+    _cancelamentosServico = cancelamentos
+
+def ExecutaTrabalho(tarefa):
+    """
+    Executa um trabalho em um processo do executor
+
+    Entrada:
+        tarefa: Tupla (identificador, posição do aviso de cancelamento, definição do trabalho, semente, tempo máximo)
+
+    Retorno:
+        Dicionário com a menor distância, as menores rotas, o tempo de execução, o motivo da parada e as épocas
+        executadas
+    """
+    identificador, posicao, definicao, semente, tempoMaximo = tarefa
+
+    inicio = time.perf_counter()
+    ambiente = AmbienteTrabalho(definicao, _ambientesServico)
+    criterio = CriterioParada(tempoMaximo=tempoMaximo) if tempoMaximo is not None else None
+    parada = ParadaServico(identificador, _cancelamentosServico, posicao, _progressoServico, criterio)
+    metodo = Metodos()[definicao.get("Metodo", 1) - 1]
+    menorDistancia, menorRotas, _ = metodo(ambiente, definicao.get("TaxaDesconto", 0.1), epocas=definicao.get("Epocas", 10**6),
+                                           semente=semente, parada=parada, **definicao.get("Opcoes", {}))
+    tempo = time.perf_counter() - inicio
+
+    return {"MenorDistancia": menorDistancia, "MenorRotas": menorRotas, "Tempo": tempo, "Motivo": parada.Motivo,
+            "Epocas": parada.Epocas}
+
+class Trabalho:
+    """
+    Trabalho submetido ao serviço
+
+    Atributos:
+        Identificador: Identificador do trabalho
+        Definicao: Definição do trabalho (ver ServicoRotas.Submete)
+        Estado: FILA, EXECUTANDO, CONCLUIDO, CANCELADO ou ERRO
+        MenorDistancia: Menor distância publicada até o momento
+        Resultado: Dicionário do resultado (ExecutaTrabalho) ao terminar, com "Erro" em caso de erro
+        Eventos: Eventos publicados: {"Evento": "progresso", "Epocas", "MenorDistancia", "Tempo"} a cada nova menor
+                 distância e, por último, {"Evento": estado final, ...resultado}
+    """
+    __slots__ = ("Identificador", "Definicao", "Estado", "MenorDistancia", "Resultado", "Eventos", "servico", "posicao",
+                 "submissao", "novidade")
+
+    def __init__(self, servico, identificador, definicao):
+        self.Identificador = identificador
+        self.Definicao = definicao
+        self.Estado = FILA
+        self.MenorDistancia = float('inf')
+        self.Resultado = None
+        self.Eventos = []
+        self.servico = servico
+        self.posicao = None
+        self.submissao = time.monotonic()
+        self.novidade = asyncio.Event()
+
+    def Publica(self, evento):
+        self.Eventos.append(evento)
+        self.novidade.set()
+        self.novidade = asyncio.Event()
+
+    def Finaliza(self, estado, resultado):
+        if self.Estado in FINAIS:
+            return
+        self.Estado = estado
+        self.Resultado = resultado
+        if (resultado.get("MenorDistancia") is not None):
+            self.MenorDistancia = resultado["MenorDistancia"]
+        self.Publica(dict(resultado, Evento=estado))
+
+    async def Progresso(self):
+        """
+        Iterador assíncrono dos eventos do trabalho, desde o primeiro, até o evento final. Cada chamada tem o seu
+        próprio iterador, então vários consumidores podem acompanhar o mesmo trabalho.
+        """
+        lidos = 0
+        while True:
+            novidade = self.novidade
+            while (lidos < len(self.Eventos)):
+                lidos += 1
+                yield self.Eventos[lidos - 1]
+            if self.Estado in FINAIS:
+                return
+            await novidade.wait()
+
+    async def Espera(self):
+        """
+        Retorno:
+            Resultado do trabalho ao terminar
+        """
+        async for _ in self.Progresso():
+            pass
+        return self.Resultado
+
+    def Cancela(self):
+        """
+        Cancela o trabalho: na fila, ele não chega a ser executado; em execução, ele para ao fim da época atual com as
+        menores rotas encontradas até então
+        """
+        self.servico.Cancela(self.Identificador)
+
+class ServicoRotas:
+    """
+    Serviço de roteirização com 'processos' trabalhos em execução ao mesmo tempo e no máximo 'tamanhoFila' trabalhos
+    esperando. Com a fila cheia, Submete espera uma vaga (ou falha com asyncio.QueueFull, sem espera). Os trabalhos
+    terminados continuam consultáveis em Trabalhos até serem os mais antigos além de 'historico'.
+
+    Uso:
+        async with ServicoRotas(processos=4) as servico:
+            trabalho = await servico.Submete({"Arquivo": "A-n32-k5.vrp", "Metodo": 1, "Orcamento": 2.0})
+            async for evento in trabalho.Progresso():
+                print(evento)
+    """
+    def __init__(self, processos = None, tamanhoFila = 16, sementeBase = 0, historico = 256):
+        """
+        Entrada:
+            processos: Quantidade de processos (trabalhos em execução), None para a quantidade de núcleos
+            tamanhoFila: Quantidade máxima de trabalhos esperando um processo
+            sementeBase: Semente dos trabalhos sem "Semente"
+            historico: Quantidade de trabalhos terminados mantidos em Trabalhos
+        """
+        self.processos = processos if processos is not None else os.cpu_count()
+        self.tamanhoFila = tamanhoFila
+        self.sementeBase = sementeBase
+        self.Trabalhos = {}
+        self.terminados = collections.deque()
+        self.historico = historico
+        self.identificadores = itertools.count(1)
+        self.executor = None
+
+    async def __aenter__(self):
+        await self.Inicia()
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self.Encerra()
+
+    async def Inicia(self):
+        """
+        Cria os processos, a fila dos trabalhos e a leitura das menores distâncias publicadas pelos processos
+        """
+        self.laco = asyncio.get_running_loop()
+        self.fila = asyncio.Queue(self.tamanhoFila)
+
+        # Processos sem cópia dos descritores do servidor: com fork, um processo criado durante uma requisição herdaria
+        # a conexão, e o cliente só receberia o fim da resposta quando o processo terminasse
+        contexto = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        self.progresso = contexto.Queue()
+        self.cancelamentos = contexto.Array('b', self.processos, lock=False)
+        self.executor = ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto, initializer=_IniciaProcessoServico,
+                                            initargs=(self.progresso, self.cancelamentos))
+        self.leitor = threading.Thread(target=self.LeProgresso, daemon=True)
+        self.leitor.start()
+        self.trabalhadores = [asyncio.create_task(self.Trabalhador(posicao)) for posicao in range(self.processos)]
+
+    async def Encerra(self, cancelar = True):
+        """
+        Encerra o serviço
+
+        Entrada:
+            cancelar: Cancela os trabalhos na fila e em execução, False para esperar que terminem
+        """
+        if (cancelar):
+            for identificador in list(self.Trabalhos):
+                self.Cancela(identificador)
+        for _ in self.trabalhadores:
+            await self.fila.put(None)
+        await asyncio.gather(*self.trabalhadores)
+        self.executor.shutdown()
+        self.progresso.put(None)
+        await self.laco.run_in_executor(None, self.leitor.join)
+        self.progresso.close()
+
+    async def Submete(self, definicao, espera = True):
+        """
+        Submete um trabalho, esperando uma vaga na fila se ela estiver cheia (contrapressão)
+
+        Entrada:
+            definicao: Dicionário com:
+                "Arquivo" ou "Pontos": Instância (ver AmbienteTrabalho)
+                "Metodo": Método de 1 a 4 (padrão 1)
+                "Orcamento": Tempo máximo em segundos desde a submissão, incluindo a espera na fila (opcional)
+                "Epocas": Quantidade máxima de épocas (padrão 10**6, o orçamento decide a duração)
+                "TaxaDesconto": Taxa de desconto (padrão 0.1)
+                "Semente": Semente (padrão: a partir de 'sementeBase' e do identificador)
+                "Opcoes": Demais argumentos do método (ex.: {"candidatos": 16, "buscaLocal": true})
+            espera: False para falhar com asyncio.QueueFull com a fila cheia, em vez de esperar
+
+        Retorno:
+            Trabalho
+        """
+        if definicao.get("Metodo", 1) not in (1, 2, 3, 4):
+            raise ValueError("Método %r inválido, esperado de 1 a 4" % (definicao.get("Metodo"),))
+        if (definicao.get("Arquivo") is None and definicao.get("Pontos") is None):
+            raise ValueError("O trabalho precisa de 'Arquivo' ou 'Pontos'")
+
+        trabalho = Trabalho(self, next(self.identificadores), definicao)
+        self.Trabalhos[trabalho.Identificador] = trabalho
+        try:
+            if (espera):
+                await self.fila.put(trabalho)
+            else:
+                self.fila.put_nowait(trabalho)
+        except Exception:
+            del self.Trabalhos[trabalho.Identificador]
+            raise
+
+        return trabalho
+
+    def Cancela(self, identificador):
+        """
+        Entrada:
+            identificador: Identificador do trabalho
+
+        Retorno:
+            True se o trabalho estava na fila ou em execução
+        """
+        trabalho = self.Trabalhos.get(identificador)
+        if (trabalho is None or trabalho.Estado in FINAIS):
+            return False
+
+        if (trabalho.Estado == FILA):
+            trabalho.Finaliza(CANCELADO, {"MenorDistancia": float('inf'), "MenorRotas": [], "Motivo": CANCELADO})
+            self.Termina(trabalho)
+        else: # Lido pelo processo ao fim da época
+            self.cancelamentos[trabalho.posicao] = 1
+
+        return True
+
+    async def Trabalhador(self, posicao):
+        """
+        Executa os trabalhos da fila, um por vez, em um processo do executor
+
+        Entrada:
+            posicao: Posição do aviso de cancelamento dos trabalhos deste trabalhador
+        """
+        while True:
+            trabalho = await self.fila.get()
+            if (trabalho is None):
+                return
+            if (trabalho.Estado != FILA): # Cancelado na fila
+                continue
+
+            # Orçamento restante após a espera na fila
+            tempoMaximo = None
+            if (trabalho.Definicao.get("Orcamento") is not None):
+                tempoMaximo = max(0.0, trabalho.Definicao["Orcamento"] - (time.monotonic() - trabalho.submissao))
+            semente = trabalho.Definicao.get("Semente")
+            if (semente is None):
+                semente = SementeTarefa(self.sementeBase, "servico", 0, trabalho.Identificador)
+
+            trabalho.Estado = EXECUTANDO
+            trabalho.posicao = posicao
+            self.cancelamentos[posicao] = 0
+            try:
+                resultado = await self.laco.run_in_executor(self.executor, ExecutaTrabalho,
+                                                            (trabalho.Identificador, posicao, trabalho.Definicao, semente, tempoMaximo))
+            except Exception as erro:
+                trabalho.Finaliza(ERRO, {"Erro": "%s: %s" % (type(erro).__name__, erro)})
+            else:
+                trabalho.Finaliza(CANCELADO if resultado["Motivo"] == CANCELADO else CONCLUIDO, resultado)
+            self.Termina(trabalho)
+
+    def Termina(self, trabalho):
+        """
+        Guarda o trabalho terminado, descartando os terminados mais antigos além de 'historico'
+        """
+        self.terminados.append(trabalho.Identificador)
+        while (len(self.terminados) > self.historico):
+            self.Trabalhos.pop(self.terminados.popleft(), None)
+
+    def LeProgresso(self):
+        """
+        Lê as menores distâncias publicadas pelos processos (em uma thread) e as entrega aos trabalhos no laço asyncio
+        """
+        while True:
+            mensagem = self.progresso.get()
+            if (mensagem is None):
+                return
+            self.laco.call_soon_threadsafe(self.PublicaProgresso, mensagem)
+
+    def PublicaProgresso(self, mensagem):
+        identificador, epocas, menorDistancia, tempo = mensagem
+        trabalho = self.Trabalhos.get(identificador)
+        if (trabalho is None or trabalho.Estado in FINAIS): # Publicação atrasada de um trabalho já terminado
+            return
+
+        trabalho.MenorDistancia = menorDistancia
+        trabalho.Publica({"Evento": "progresso", "Epocas": epocas, "MenorDistancia": menorDistancia, "Tempo": tempo})
+
+def _Codifica(corpo):
+    # JSON padrão, sem Infinity: a distância infinita (rotas inválidas) vira null
+    if (corpo.get("MenorDistancia") == float('inf')):
+        corpo = dict(corpo, MenorDistancia=None)
+    return json.dumps(corpo).encode()
+
+async def _Responde(escritor, status, corpo):
+    conteudo = _Codifica(corpo)
+    escritor.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                   % (status, {200: b"OK", 202: b"Accepted", 400: b"Bad Request", 404: b"Not Found", 411: b"Length Required",
+                                 500: b"Internal Server Error", 503: b"Service Unavailable"}[status],
+                      len(conteudo)))
+    escritor.write(conteudo)
+    await escritor.drain()
+
+async def AtendeRequisicao(servico, leitor, escritor):
+    """
+    Atende uma requisição HTTP do servidor local (ver o início do módulo), uma por conexão. Um erro inesperado é
+    respondido com 500 (ou encerra a conexão, se a resposta já começou) e escrito em stderr.
+    """
+    iniciada = False
+    try:
+        linha = (await leitor.readline()).decode("latin-1").split()
+        cabecalhos = {}
+        while True:
+            cabecalho = (await leitor.readline()).decode("latin-1").strip()
+            if not cabecalho:
+                break
+            nome, _, valor = cabecalho.partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        if (len(linha) < 2):
+            return await _Responde(escritor, 400, {"Erro": "requisição inválida"})
+
+        # Corpo com o tamanho do Content-Length, obrigatório somente na submissão
+        comprimento = cabecalhos.get("content-length")
+        if (comprimento is None and linha[0] == "POST"):
+            return await _Responde(escritor, 411, {"Erro": "Content-Length ausente"})
+        if (comprimento is not None and not comprimento.isdecimal()):
+            return await _Responde(escritor, 400, {"Erro": "Content-Length inválido"})
+        corpo = await leitor.readexactly(int(comprimento or 0))
+
+        metodo, caminho = linha[0], linha[1].rstrip("/").split("/")[1:]
+        if (caminho[:1] != ["trabalhos"] or len(caminho) > 2):
+            return await _Responde(escritor, 404, {"Erro": "caminho inválido"})
+
+        if (metodo == "POST" and len(caminho) == 1):
+            try:
+                trabalho = await servico.Submete(json.loads(corpo or b"{}"), espera=False)
+            except asyncio.QueueFull:
+                return await _Responde(escritor, 503, {"Erro": "fila cheia"})
+            except (ValueError, TypeError, AttributeError) as erro:
+                return await _Responde(escritor, 400, {"Erro": str(erro)})
+            return await _Responde(escritor, 202, {"Identificador": trabalho.Identificador})
+
+        trabalho = servico.Trabalhos.get(int(caminho[1])) if len(caminho) == 2 and caminho[1].isdigit() else None
+        if (trabalho is None):
+            return await _Responde(escritor, 404, {"Erro": "trabalho inexistente"})
+
+        if (metodo == "DELETE"):
+            return await _Responde(escritor, 200, {"Cancelado": servico.Cancela(trabalho.Identificador)})
+        if (metodo == "GET"): # Eventos em JSON por linha, até o evento final
+            iniciada = True
+            escritor.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+            async for evento in trabalho.Progresso():
+                escritor.write(_Codifica(evento) + b"\n")
+                await escritor.drain()
+            return
+
+        return await _Responde(escritor, 404, {"Erro": "método inválido"})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except Exception as erro:
+        traceback.print_exc()
+        if (not iniciada):
+            try:
+                await _Responde(escritor, 500, {"Erro": "erro interno: %s" % erro})
+            except ConnectionError:
+                pass
+    finally:
+        escritor.close()
+
+async def IniciaServidor(servico, host = "127.0.0.1", porta = 8080, caminho = None):
+    """
+    Inicia o servidor HTTP local do serviço
+
+    Entrada:
+        servico: Serviço iniciado (ServicoRotas)
+        host, porta: Endereço do servidor TCP
+        caminho: Caminho do socket Unix, em vez do servidor TCP
+
+    Retorno:
+        Servidor asyncio (asyncio.Server)
+    """
+    def Atende(leitor, escritor):
+        return AtendeRequisicao(servico, leitor, escritor)
+
+    if (caminho is not None):
+        return await asyncio.start_unix_server(Atende, path=caminho)
+
+    return await asyncio.start_server(Atende, host, porta)
+
+async def _Serve(argumentos):
+    async with ServicoRotas(argumentos.processos, argumentos.fila, argumentos.semente) as servico:
+        servidor = await IniciaServidor(servico, argumentos.host, argumentos.porta, argumentos.socket)
+        async with servidor:
+            await servidor.serve_forever()
+
+def Principal(argumentos = None):
+    parser = argparse.ArgumentParser(description="Serviço local de roteirização (HTTP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--socket", default=None, help="Caminho do socket Unix, em vez da porta")
+    parser.add_argument("--processos", type=int, default=None, help="Trabalhos em execução ao mesmo tempo (padrão: núcleos)")
+    parser.add_argument("--fila", type=int, default=16, help="Trabalhos esperando um processo")
+    parser.add_argument("--semente", type=int, default=0)
+    argumentos = parser.parse_args(argumentos)
+
+    try:
+        asyncio.run(_Serve(argumentos))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Principal())
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Varredura de hiperparâmetros (taxa de desconto, epsilon constante ou programado e taxa de aprendizagem) por successive
+halving: todas as configurações treinam por poucas épocas, a melhor fração 1/reducao continua até o próximo nível e
+assim por diante até as épocas máximas. Cada tentativa continua do ponto de controle do nível anterior, e os resultados
+de cada nível são gravados para que uma varredura repetida pule as tentativas já concluídas.
+
+@author: Murilo Alves
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .continuacao import CarregaEstado, PontoControle
+from .experimento import SementeTarefa
+from .metodos import Metodos
+from .nucleo import EpsilonExponencial, EpsilonLinear, TaxaAprendizagem, TaxaPolinomial
+
+# Arquivo com os resultados de cada tentativa e nível (uma linha JSON por resultado)
+ARQUIVO_RESULTADOS = "varredura.jsonl"
+
+def EspacoBusca(metodos = (0,), descontos = (0.1, 0.01), epsilons = (0.9,), expoentes = (1.0,)):
+    """
+    Configurações do produto cartesiano dos valores, no formato JSON usado para identificar as tentativas
+
+    Entrada:
+        metodos: Opções de algoritmo (Metodos)
+        descontos: Taxas de desconto
+        epsilons: Epsilon constante ou programação: ["linear", inicio, fim, epocas] (EpsilonLinear) ou
+                  ["exponencial", inicio, fim, meiaVida] (EpsilonExponencial)
+        expoentes: Expoentes da taxa de aprendizagem 1/(1 + visitas)^expoente (TaxaPolinomial)
+
+    Retorno:
+        Lista de configurações (dicionários)
+    """
+    return [{"Metodo": metodo, "Desconto": desconto, "Epsilon": epsilon, "Expoente": expoente}
+            for metodo, desconto, epsilon, expoente in itertools.product(metodos, descontos, epsilons, expoentes)]
+
+def Parametros(configuracao):
+    """
+    Entrada:
+        configuracao: Configuração de EspacoBusca
+
+    Retorno:
+        Argumentos dos métodos (taxaDesconto, epsilon e taxaAprendizagem)
+    """
+    epsilon = configuracao["Epsilon"]
+    if isinstance(epsilon, (list, tuple)):
+        programacoes = {"linear": EpsilonLinear, "exponencial": EpsilonExponencial}
+        if epsilon[0] not in programacoes:
+            raise ValueError("Programação de epsilon desconhecida: %s" % epsilon[0])
+        epsilon = programacoes[epsilon[0]](*epsilon[1:])
+
+    expoente = configuracao["Expoente"]
+    taxaAprendizagem = TaxaAprendizagem if expoente == 1 else TaxaPolinomial(expoente)
+
+    return {"taxaDesconto": configuracao["Desconto"], "epsilon": epsilon, "taxaAprendizagem": taxaAprendizagem}
+
+def ChaveTentativa(configuracao, nome, semente):
+    """
+    Entrada:
+        configuracao: Configuração de EspacoBusca
+        nome: Nome da instância
+        semente: Semente da tentativa
+
+    Retorno:
+        Identificador da tentativa, o mesmo entre varreduras
+    """
+    texto = json.dumps([configuracao, nome, semente], sort_keys=True)
+
+    return hashlib.sha1(texto.encode()).hexdigest()[:16]
+
+# Ambientes e diretório enviados uma única vez para cada processo do executor
+_ambientesVarredura = {}
+_diretorioVarredura = None
+
+def _IniciaProcessoVarredura(ambientes, diretorio):
+    global _ambientesVarredura, _diretorioVarredura
+    _ambientesVarredura = ambientes
+    _diretorioVarredura = diretorio
+
+def ExecutaTentativa(tentativa):
+    """
+    Treina uma tentativa até as épocas do nível, continuando do seu ponto de controle (nível anterior), se houver
+
+    Entrada:
+        tentativa: Tupla (chave, configuração, nome da instância, semente, épocas)
+
+    Retorno:
+        Dicionário com a tentativa, a menor distância e o tempo de execução do nível
+    """
+    chave, configuracao, nome, semente, epocas = tentativa
+
+    # Um ponto de controle além das épocas do nível (varredura anterior com outros níveis) não é retomado
+    caminho = os.path.join(_diretorioVarredura, chave + ".estado")
+    retoma = not os.path.exists(caminho) or CarregaEstado(caminho)["Epocas"] <= epocas
+    controle = PontoControle(caminho, intervalo=epocas, retoma=retoma)
+
+    inicio = time.perf_counter()
+    menorDistancia, _, _ = Metodos()[configuracao["Metodo"]](_ambientesVarredura[nome], semente=semente, epocas=epocas,
+                                                             controle=controle, **Parametros(configuracao))
+    tempo = time.perf_counter() - inicio
+
+    return {"Chave": chave, "Configuracao": configuracao, "Instancia": nome, "Semente": semente, "Epocas": epocas,
+            "MenorDistancia": menorDistancia, "Tempo": tempo}
+
+def Niveis(epocasMinimas, epocasMaximas, reducao):
+    """
+    Retorno:
+        Épocas de cada nível: epocasMinimas multiplicadas por 'reducao' até epocasMaximas
+    """
+    niveis = []
+    epocas = epocasMinimas
+    while (epocas < epocasMaximas):
+        niveis.append(epocas)
+        epocas *= reducao
+    niveis.append(epocasMaximas)
+
+    return niveis
+
+def Pontuacoes(distancias, configuracoes, nomes):
+    """
+    Pontuação de cada configuração: média, entre as instâncias, da razão entre sua distância média e a melhor distância
+    média das configurações na instância (1 é a melhor em todas, infinita se alguma execução for inválida)
+
+    Entrada:
+        distancias: Dicionário (configuração, instância) -> distância média
+        configuracoes: Posições das configurações comparadas
+        nomes: Nomes das instâncias
+
+    Retorno:
+        Dicionário configuração -> pontuação
+    """
+    pontuacoes = {configuracao: 0.0 for configuracao in configuracoes}
+    for nome in nomes:
+        melhor = min(distancias[(configuracao, nome)] for configuracao in configuracoes)
+        for configuracao in configuracoes:
+            distancia = distancias[(configuracao, nome)]
+            pontuacoes[configuracao] += 1.0 if melhor == float('inf') else distancia/melhor
+
+    return {configuracao: pontuacao/len(nomes) for configuracao, pontuacao in pontuacoes.items()}
+
+def Varredura(ambientes, configuracoes, epocasMinimas = 100, epocasMaximas = 1000, reducao = 3, repeticoes = 1,
+              processos = None, diretorio = None, sementeBase = 0):
+    """
+    Varredura por successive halving, com as tentativas de cada nível executadas em paralelo (um processo por núcleo).
+    Todas as configurações usam as mesmas sementes em cada instância e repetição, para que as diferenças venham dos
+    hiperparâmetros.
+
+    Entrada:
+        ambientes: Lista com as informações dos ambientes
+        configuracoes: Lista de configurações (EspacoBusca)
+        epocasMinimas: Épocas do primeiro nível
+        epocasMaximas: Épocas do último nível
+        reducao: Fator de redução das configurações (e de aumento das épocas) entre os níveis
+        repeticoes: Execuções independentes por configuração e instância
+        processos: Quantidade de processos, None para a quantidade de núcleos
+        diretorio: Diretório dos pontos de controle e dos resultados (ARQUIVO_RESULTADOS), reutilizados por uma varredura
+                   repetida; None para um diretório temporário
+        sementeBase: Semente da varredura
+
+    Retorno:
+        Lista com a configuração, as épocas do último nível alcançado, a pontuação nesse nível e a distância média por
+        instância, da melhor para a pior configuração
+    """
+    ambientesPorNome = {ambiente["Nome"]: ambiente for ambiente in ambientes}
+    nomes = list(ambientesPorNome)
+
+    temporario = tempfile.TemporaryDirectory() if diretorio is None else None
+    diretorio = temporario.name if temporario is not None else diretorio
+    os.makedirs(diretorio, exist_ok=True)
+
+    # Resultados de varreduras anteriores, por (chave, épocas)
+    caminhoResultados = os.path.join(diretorio, ARQUIVO_RESULTADOS)
+    concluidas = {}
+    if os.path.exists(caminhoResultados):
+        with open(caminhoResultados) as fh:
+            for linha in fh:
+                resultado = json.loads(linha)
+                concluidas[(resultado["Chave"], resultado["Epocas"])] = resultado
+
+    # Tentativas de cada configuração, instâncias maiores primeiro para equilibrar a carga entre os processos
+    tentativas = {}
+    for configuracao in range(len(configuracoes)):
+        tentativas[configuracao] = []
+        for nome in sorted(nomes, key=lambda nome: len(ambientesPorNome[nome]["Estados"]), reverse=True):
+            for repeticao in range(repeticoes):
+                semente = SementeTarefa(sementeBase, nome, configuracoes[configuracao]["Metodo"], repeticao)
+                tentativas[configuracao].append((ChaveTentativa(configuracoes[configuracao], nome, semente), nome, semente))
+
+    classificacao = {}
+    vivas = list(range(len(configuracoes)))
+    try:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_IniciaProcessoVarredura, initargs=(ambientesPorNome, diretorio)) as executor, \
+             open(caminhoResultados, 'a') as registro:
+            for nivel, epocas in enumerate(Niveis(epocasMinimas, epocasMaximas, reducao)):
+                pendentes = [(chave, configuracoes[configuracao], nome, semente, epocas)
+                             for configuracao in vivas for chave, nome, semente in tentativas[configuracao]
+                             if (chave, epocas) not in concluidas]
+                for resultado in executor.map(ExecutaTentativa, pendentes):
+                    concluidas[(resultado["Chave"], epocas)] = resultado
+                    registro.write(json.dumps(resultado) + "\n")
+                    registro.flush()
+
+                # Distância média de cada configuração viva por instância
+                distancias = {}
+                for configuracao in vivas:
+                    for nome in nomes:
+                        distancias[(configuracao, nome)] = statistics.mean(
+                            concluidas[(chave, epocas)]["MenorDistancia"] for chave, nomeTentativa, _ in tentativas[configuracao] if nomeTentativa == nome)
+
+                pontuacoes = Pontuacoes(distancias, vivas, nomes)
+                for configuracao in vivas:
+                    classificacao[configuracao] = {"Configuracao": configuracoes[configuracao], "Epocas": epocas, "Nivel": nivel,
+                                                   "Pontuacao": pontuacoes[configuracao],
+                                                   "Distancias": {nome: distancias[(configuracao, nome)] for nome in nomes}}
+
+                # Somente a melhor fração das configurações segue para o próximo nível
+                vivas = sorted(vivas, key=pontuacoes.__getitem__)[:max(1, len(vivas)//reducao)]
+    finally:
+        if temporario is not None:
+            temporario.cleanup()
+
+    return sorted(classificacao.values(), key=lambda item: (-item["Nivel"], item["Pontuacao"]))
+
+def ExibeVarredura(classificacao, quantidade = 10):
+    """
+    Exibe as melhores configurações de uma varredura
+
+    Entrada:
+        classificacao: Retorno de Varredura
+        quantidade: Quantidade de configurações exibidas
+    """
+    for item in classificacao[:quantidade]:
+        configuracao = item["Configuracao"]
+        print("Método: ", configuracao["Metodo"] + 1, " Desconto: ", configuracao["Desconto"], " Epsilon: ", configuracao["Epsilon"],
+              " Expoente: ", configuracao["Expoente"], " Épocas: ", item["Epocas"], " Pontuação: ", round(item["Pontuacao"], 4))
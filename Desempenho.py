@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark reprodutível dos métodos sobre as instâncias de Benchmark/, com métricas de vazão e de qualidade
+
+Uso:
+    python Desempenho.py executa --saida atual.json --csv atual.csv
+    python Desempenho.py compara base.json atual.json
+    python Desempenho.py equivalencia --sementes 1 2
+    python Desempenho.py escalonamento --processos 1 2 4 8 --gap 5
+
+@author: Murilo Alves
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+import Algoritmos_TD_Murilo_Alves as algoritmos
+
+# Diretório do módulo, para localizar as instâncias da Biblioteca fora do diretório atual
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+def Caminho(cpvlib):
+    """
+    Caminho da instância, relativo ao diretório atual ou ao diretório do módulo
+    """
+    if os.path.exists(cpvlib):
+        return cpvlib
+
+    return os.path.join(DIRETORIO, cpvlib)
+
+def Gap(distancia, otimo):
+    """
+    Distância relativa (%) ao valor ótimo, None se a distância for inválida ou o ótimo desconhecido
+    """
+    if otimo is None or distancia == float('inf'):
+        return None
+
+    return 100*(distancia - otimo)/otimo
+
+def ExecutaCaso(caso):
+    """
+    Executa um caso (instância, método, repetição) e mede tempo, vazão, memória e qualidade.
+    É executado em um processo novo para que o pico de memória (ru_maxrss) seja o do caso, os passos
+    por segundo contam as visitas a consumidores (épocas x consumidores).
+
+    Entrada:
+        caso: Dicionário com Arquivo, Opcao, Repeticao, Semente, Epocas, Desconto e Otimo
+
+    Retorno:
+        Dicionário com as métricas do caso
+    """
+    ambiente = algoritmos.LerArquivo(Caminho(caso["Arquivo"]))
+    consumidores = len(ambiente["Estados"]) - 1
+    estatisticas = algoritmos.EstatisticasOnline()
+    memoriaInicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    inicio = time.perf_counter()
+    menorDistancia, _, _ = algoritmos.Metodos()[caso["Opcao"]](ambiente, caso["Desconto"], epocas=caso["Epocas"], semente=caso["Semente"], resultados=estatisticas)
+    tempo = time.perf_counter() - inicio
+    memoriaPico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {"Instancia": ambiente["Nome"], "Metodo": caso["Opcao"] + 1, "Repeticao": caso["Repeticao"], "Semente": caso["Semente"],
+            "Epocas": caso["Epocas"], "Desconto": caso["Desconto"], "Tempo": tempo,
+            "EpisodiosPorSegundo": caso["Epocas"]/tempo, "PassosPorSegundo": caso["Epocas"]*consumidores/tempo,
+            "MemoriaPicoKB": memoriaPico, "MemoriaTreinoKB": memoriaPico - memoriaInicial,
+            "MenorDistancia": menorDistancia if menorDistancia != float('inf') else None,
+            "Gap": Gap(menorDistancia, caso["Otimo"]), "EpocasInvalidas": estatisticas.Invalidas}
+
+def Resumo(registros):
+    """
+    Agrega os registros por (instância, método): tempo médio, vazão média, pico de memória e gaps melhor/médio
+
+    Entrada:
+        registros: Lista de registros de ExecutaCaso
+
+    Retorno:
+        Dicionário "instância/método" -> métricas agregadas
+    """
+    grupos = {}
+    for registro in registros:
+        grupos.setdefault("%s/%d" % (registro["Instancia"], registro["Metodo"]), []).append(registro)
+
+    resumo = {}
+    for chave, grupo in grupos.items():
+        gaps = [registro["Gap"] for registro in grupo if registro["Gap"] is not None]
+        resumo[chave] = {"Tempo": statistics.mean(registro["Tempo"] for registro in grupo),
+                         "EpisodiosPorSegundo": statistics.mean(registro["EpisodiosPorSegundo"] for registro in grupo),
+                         "PassosPorSegundo": statistics.mean(registro["PassosPorSegundo"] for registro in grupo),
+                         "MemoriaPicoKB": max(registro["MemoriaPicoKB"] for registro in grupo),
+                         "MemoriaTreinoKB": max(registro["MemoriaTreinoKB"] for registro in grupo),
+                         "MelhorGap": min(gaps) if gaps else None,
+                         "GapMedio": statistics.mean(gaps) if gaps else None,
+                         "Validas": len(gaps), "Execucoes": len(grupo)}
+
+    return resumo
+
+def Executa(arquivos, opcoes, epocas = 1000, repeticoes = 3, desconto = 0.1, sementeBase = 0):
+    """
+    Executa todos os casos, um por vez e cada um em um processo novo, com sementes fixas
+
+    Entrada:
+        arquivos: Caminhos das instâncias
+        opcoes: Opções de algoritmo (0 a 3)
+        epocas: Quantidade de épocas por execução
+        repeticoes: Quantidade de execuções por instância e método
+        desconto: Taxa de desconto
+        sementeBase: Semente do benchmark
+
+    Retorno:
+        Dicionário com a configuração, o ambiente de execução, os registros e o resumo
+    """
+    otimos = algoritmos.Otimos()
+    casos = []
+    for arquivo in arquivos:
+        nome = os.path.splitext(os.path.basename(arquivo))[0]
+        for opcao in opcoes:
+            for repeticao in range(repeticoes):
+                casos.append({"Arquivo": arquivo, "Opcao": opcao, "Repeticao": repeticao, "Epocas": epocas, "Desconto": desconto,
+                              "Semente": algoritmos.SementeTarefa(sementeBase, nome, opcao, repeticao), "Otimo": otimos.get(nome)})
+
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        registros = list(executor.map(ExecutaCaso, casos))
+
+    return {"Configuracao": {"Epocas": epocas, "Repeticoes": repeticoes, "Desconto": desconto, "SementeBase": sementeBase},
+            "Sistema": {"Python": platform.python_version(), "Numpy": numpy.__version__, "Plataforma": platform.platform(),
+                        "Processador": platform.processor(), "Nucleos": os.cpu_count(), "Data": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "Registros": registros, "Resumo": Resumo(registros)}
+
+def GravaCSV(registros, caminho):
+    """
+    Grava os registros em CSV, uma linha por execução
+    """
+    with open(caminho, 'w', newline='') as fh:
+        escritor = csv.DictWriter(fh, fieldnames=list(registros[0].keys()))
+        escritor.writeheader()
+        escritor.writerows(registros)
+
+def Compara(base, atual, toleranciaTempo = 0.10, toleranciaGap = 1.0):
+    """
+    Compara dois benchmarks pelo resumo, apontando regressões de tempo (relativa) ou de gap médio (pontos percentuais)
+
+    Entrada:
+        base: Benchmark de referência
+        atual: Benchmark a ser comparado
+        toleranciaTempo: Aumento relativo de tempo tolerado
+        toleranciaGap: Aumento do gap médio tolerado
+
+    Retorno:
+        Lista de linhas da comparação e lista de regressões
+    """
+    linhas = []
+    regressoes = []
+
+    for chave in sorted(set(base["Resumo"]) & set(atual["Resumo"])):
+        antes = base["Resumo"][chave]
+        depois = atual["Resumo"][chave]
+        razao = depois["Tempo"]/antes["Tempo"]
+        linhas.append("%-16s tempo %8.3fs -> %8.3fs (%+6.1f%%)  gap médio %s -> %s" % (chave, antes["Tempo"], depois["Tempo"], 100*(razao - 1),
+                      "-" if antes["GapMedio"] is None else "%.1f%%" % antes["GapMedio"],
+                      "-" if depois["GapMedio"] is None else "%.1f%%" % depois["GapMedio"]))
+
+        if razao > 1 + toleranciaTempo:
+            regressoes.append("%s: tempo %+.1f%%" % (chave, 100*(razao - 1)))
+        if depois["Validas"] < antes["Validas"]:
+            regressoes.append("%s: execuções válidas %d -> %d" % (chave, antes["Validas"], depois["Validas"]))
+        elif antes["GapMedio"] is not None and depois["GapMedio"] is not None and depois["GapMedio"] > antes["GapMedio"] + toleranciaGap:
+            regressoes.append("%s: gap médio %+.1f p.p." % (chave, depois["GapMedio"] - antes["GapMedio"]))
+
+    return linhas, regressoes
+
+def Equivalencia(arquivos, sementes = (1, 2), epocas = 300, desconto = 0.1):
+    """
+    Confere se o núcleo compilado do Método 1 reproduz a implementação em Python com a mesma semente: a distância de
+    cada época, a menor distância e as menores rotas devem ser idênticas
+
+    Entrada:
+        arquivos: Caminhos das instâncias
+        sementes: Sementes conferidas em cada instância
+        epocas: Quantidade de épocas por execução
+        desconto: Taxa de desconto
+
+    Retorno:
+        Lista de divergências ("instância/semente: o que diverge"), vazia se equivalentes
+    """
+    divergencias = []
+    for arquivo in arquivos:
+        ambiente = algoritmos.LerArquivo(Caminho(arquivo))
+        for semente in sementes:
+            referencia = algoritmos.Q_Learning_VeiculosFixos(ambiente, desconto, epocas=epocas, semente=semente)
+            compilado = algoritmos.Q_Learning_VeiculosFixos(ambiente, desconto, epocas=epocas, semente=semente, compilado=True)
+            for posicao, nome in enumerate(("menor distância", "menores rotas", "distâncias por época")):
+                if referencia[posicao] != compilado[posicao]:
+                    divergencias.append("%s/%d: %s" % (ambiente["Nome"], semente, nome))
+
+    return divergencias
+
+def Escalonamento(arquivo, processos = (1, 2, 4, 8), gapAlvo = 5.0, epocas = 100000, tempoMaximo = 60.0, repeticoes = 3,
+                  metodo = 3, desconto = 0.1, sementeBase = 0):
+    """
+    Mede o tempo do treinamento compartilhado (TreinamentoCompartilhado) até o gap alvo com cada quantidade de processos,
+    e o do método sem compartilhamento (um processo, sem memória compartilhada nem executor) como referência
+
+    Entrada:
+        arquivo: Caminho da instância (com ótimo conhecido)
+        processos: Quantidades de processos medidas
+        gapAlvo: Gap (%) que encerra o treinamento
+        epocas: Total de épocas, limite caso o gap não seja atingido
+        tempoMaximo: Tempo máximo de cada treinamento em segundos
+        repeticoes: Execuções (sementes) por configuração
+        metodo: Método 3 ou 4
+        desconto: Taxa de desconto
+        sementeBase: Semente da primeira repetição
+
+    Retorno:
+        Lista de dicionários por configuração (Processos, 0 para o método sem compartilhamento), com o tempo médio, os
+        atingimentos do gap, as épocas médias (soma dos processos) e o gap médio
+    """
+    ambiente = algoritmos.LerArquivo(Caminho(arquivo))
+    otimo = algoritmos.Otimos().get(ambiente["Nome"])
+    if otimo is None:
+        raise ValueError("A instância %s não tem ótimo conhecido" % ambiente["Nome"])
+    funcao = algoritmos.Metodos()[metodo - 1]
+    parada = functools.partial(algoritmos.CriterioParada, gapAlvo=gapAlvo, tempoMaximo=tempoMaximo)
+
+    linhas = []
+    for quantidade in (0,) + tuple(processos):
+        tempos, gaps, epocasExecutadas = [], [], []
+        for repeticao in range(repeticoes):
+            semente = sementeBase + repeticao
+            inicio = time.perf_counter()
+            if quantidade == 0:
+                criterio = parada()
+                distancia, _, _ = funcao(ambiente, desconto, epocas=epocas, semente=semente, parada=criterio)
+                epocasExecutadas.append(criterio.Epocas)
+            else:
+                distancia, _, trabalhadores = algoritmos.TreinamentoCompartilhado(ambiente, funcao, desconto, epocas=epocas,
+                                                                                  processos=quantidade, semente=semente, parada=parada)
+                epocasExecutadas.append(sum(trabalhador["Epocas"] for trabalhador in trabalhadores))
+            tempos.append(time.perf_counter() - inicio)
+            gaps.append(Gap(distancia, otimo))
+
+        validos = [gap for gap in gaps if gap is not None]
+        linhas.append({"Processos": quantidade, "Tempo": statistics.mean(tempos),
+                       "Atingidos": sum(gap is not None and gap <= gapAlvo for gap in gaps), "Repeticoes": repeticoes,
+                       "Epocas": statistics.mean(epocasExecutadas), "Gap": statistics.mean(validos) if validos else None})
+
+    return linhas
+
+def Principal(argumentos = None):
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos de aprendizagem por reforço para o CVRP")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    executa = comandos.add_parser("executa", help="Executa o benchmark")
+    executa.add_argument("--instancias", nargs="+", default=algoritmos.Biblioteca(), help="Arquivos .vrp (padrão: Biblioteca)")
+    executa.add_argument("--metodos", nargs="+", type=int, choices=[1, 2, 3, 4], default=[1, 2, 3, 4])
+    executa.add_argument("--epocas", type=int, default=1000)
+    executa.add_argument("--repeticoes", type=int, default=3)
+    executa.add_argument("--desconto", type=float, default=0.1)
+    executa.add_argument("--semente", type=int, default=0)
+    executa.add_argument("--saida", default="desempenho.json", help="Arquivo JSON com os resultados")
+    executa.add_argument("--csv", help="Arquivo CSV opcional com uma linha por execução")
+
+    compara = comandos.add_parser("compara", help="Compara dois resultados e falha (código 1) em caso de regressão")
+    compara.add_argument("base")
+    compara.add_argument("atual")
+    compara.add_argument("--tolerancia-tempo", type=float, default=0.10, help="Aumento relativo de tempo tolerado (padrão 0.10)")
+    compara.add_argument("--tolerancia-gap", type=float, default=1.0, help="Aumento do gap médio tolerado, em p.p. (padrão 1.0)")
+
+    equivalencia = comandos.add_parser("equivalencia", help="Confere o núcleo compilado contra a implementação em Python "
+                                                            "com sementes fixas e falha (código 1) se houver divergência")
+    equivalencia.add_argument("--instancias", nargs="+", default=["Benchmark/A-n32-k5.vrp"], help="Arquivos .vrp")
+    equivalencia.add_argument("--sementes", nargs="+", type=int, default=[1, 2])
+    equivalencia.add_argument("--epocas", type=int, default=300)
+
+    escalonamento = comandos.add_parser("escalonamento", help="Tempo do treinamento compartilhado até o gap alvo por "
+                                                              "quantidade de processos")
+    escalonamento.add_argument("--instancia", default="Benchmark/A-n32-k5.vrp", help="Arquivo .vrp com ótimo conhecido")
+    escalonamento.add_argument("--processos", nargs="+", type=int, default=[1, 2, 4, 8])
+    escalonamento.add_argument("--gap", type=float, default=5.0, help="Gap alvo (%%)")
+    escalonamento.add_argument("--epocas", type=int, default=100000)
+    escalonamento.add_argument("--tempo-maximo", type=float, default=60.0)
+    escalonamento.add_argument("--repeticoes", type=int, default=3)
+    escalonamento.add_argument("--metodo", type=int, choices=[3, 4], default=3)
+    escalonamento.add_argument("--semente", type=int, default=0)
+
+    argumentos = parser.parse_args(argumentos)
+
+    if argumentos.comando == "escalonamento":
+        linhas = Escalonamento(argumentos.instancia, argumentos.processos, argumentos.gap, argumentos.epocas,
+                               argumentos.tempo_maximo, argumentos.repeticoes, argumentos.metodo, sementeBase=argumentos.semente)
+        print("Núcleos disponíveis: %d" % os.cpu_count())
+        referencia = linhas[0]["Tempo"]
+        for linha in linhas:
+            print("%-20s %8.2fs (%.2fx)  gap atingido %d/%d  épocas %9.0f  gap médio %s" % (
+                  "sem compartilhamento" if linha["Processos"] == 0 else "%d processo(s)" % linha["Processos"],
+                  linha["Tempo"], referencia/linha["Tempo"], linha["Atingidos"], linha["Repeticoes"], linha["Epocas"],
+                  "-" if linha["Gap"] is None else "%.1f%%" % linha["Gap"]))
+        return 0
+
+    if argumentos.comando == "equivalencia":
+        if algoritmos.NucleoCompilado() is None:
+            print("Numba não está instalado, o núcleo compilado não pode ser conferido")
+            return 1
+        divergencias = Equivalencia(argumentos.instancias, argumentos.sementes, argumentos.epocas)
+        for divergencia in divergencias:
+            print("DIVERGÊNCIA:", divergencia)
+        if not divergencias:
+            print("Núcleo compilado equivalente à implementação em Python (%d instância(s), sementes %s)"
+                  % (len(argumentos.instancias), " ".join(map(str, argumentos.sementes))))
+        return 1 if divergencias else 0
+
+    if argumentos.comando == "executa":
+        resultado = Executa(argumentos.instancias, [metodo - 1 for metodo in argumentos.metodos], argumentos.epocas,
+                            argumentos.repeticoes, argumentos.desconto, argumentos.semente)
+        with open(argumentos.saida, 'w') as fh:
+            json.dump(resultado, fh, indent=2)
+        if argumentos.csv:
+            GravaCSV(resultado["Registros"], argumentos.csv)
+
+        for chave, metricas in resultado["Resumo"].items():
+            print("%-16s %8.3fs %10.0f episódios/s %12.0f passos/s %8d KB (+%d KB)  gap melhor %s médio %s" % (chave, metricas["Tempo"],
+                  metricas["EpisodiosPorSegundo"], metricas["PassosPorSegundo"], metricas["MemoriaPicoKB"], metricas["MemoriaTreinoKB"],
+                  "-" if metricas["MelhorGap"] is None else "%.1f%%" % metricas["MelhorGap"],
+                  "-" if metricas["GapMedio"] is None else "%.1f%%" % metricas["GapMedio"]))
+        return 0
+
+    with open(argumentos.base) as fh:
+        base = json.load(fh)
+    with open(argumentos.atual) as fh:
+        atual = json.load(fh)
+
+    linhas, regressoes = Compara(base, atual, argumentos.tolerancia_tempo, argumentos.tolerancia_gap)
+    for linha in linhas:
+        print(linha)
+    for regressao in regressoes:
+        print("REGRESSÃO:", regressao)
+
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(Principal())